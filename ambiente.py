@@ -0,0 +1,36 @@
+# ambiente.py 🔰 CharlieCore Ambiente — carga explícita de configuração no início do processo
+import os
+import threading
+
+# Ordem de precedência: variáveis já exportadas (ex.: env_file do docker-compose) > config/keys.env > .env
+ARQUIVOS_ENV = ("config/keys.env", ".env")
+
+_carregado = False
+_lock = threading.Lock()
+
+
+def carregar_ambiente(arquivos=ARQUIVOS_ENV):
+    """
+    Carrega os arquivos .env uma única vez. Chamado pelos pontos de entrada (sentinel, scripts)
+    em vez de no import dos módulos, para que importar não tenha efeitos colaterais.
+    Retorna True se algum arquivo foi encontrado.
+    """
+    global _carregado
+    with _lock:
+        if _carregado:
+            return True
+        from dotenv import load_dotenv
+
+        encontrados = [load_dotenv(dotenv_path=caminho) for caminho in arquivos if os.path.exists(caminho)]
+        _carregado = True
+        return any(encontrados)
+
+
+def iniciar():
+    """Bootstrap dos processos de longa duração: ambiente carregado e gateway Binance construído."""
+    from gateway import criar_gateway, definir_gateway
+
+    carregar_ambiente()
+    gateway = criar_gateway()
+    definir_gateway(gateway)
+    return gateway
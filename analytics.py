@@ -0,0 +1,191 @@
+# analytics.py 🔗 CharlieCore Analytics — correlação, beta e força relativa do universo contra o BTC
+"""
+Tudo é calculado sobre uma matriz (símbolos × candles) de fechamentos alinhados pelo open time:
+uma única passada vetorizada serve 7 ou 700 pares, sem loop Python por símbolo.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+BENCHMARK = "BTCUSDT"
+JANELA_PADRAO = 48               # candles da janela móvel (48 × 1h = 2 dias)
+LIMIAR_DESACOPLAMENTO = 0.5      # correlação abaixo disso = movimento próprio
+
+# Fechamentos alinhados: `close[i, t]` é o fechamento de `simbolos[i]` no candle `open_time[t]`
+Universo = namedtuple("Universo", ["simbolos", "open_time", "close"])
+
+# Todas as matrizes têm o formato (len(simbolos), len(open_time)); NaN onde a janela não fecha
+AnaliseUniverso = namedtuple(
+    "AnaliseUniverso",
+    ["simbolos", "open_time", "retorno", "correlacao", "beta", "forca_relativa", "benchmark", "janela"],
+)
+
+
+def alinhar_closes(series):
+    """
+    `{symbol: Candles}` → `Universo`. A grade de tempo é a união dos open times; lacunas de um
+    símbolo repetem o último fechamento conhecido e o período antes da listagem fica NaN.
+    """
+    simbolos = list(series)
+    if not simbolos:
+        return Universo([], np.empty(0, dtype=np.int64), np.empty((0, 0)))
+
+    tempos = [np.asarray(series[s].open_time, dtype=np.int64) for s in simbolos]
+    closes = [np.asarray(series[s].close, dtype=np.float64) for s in simbolos]
+    tamanhos = np.array([len(t) for t in tempos])
+
+    open_time, coluna = np.unique(np.concatenate(tempos), return_inverse=True)
+    linha = np.repeat(np.arange(len(simbolos)), tamanhos)
+    matriz = np.full((len(simbolos), len(open_time)), np.nan)
+    matriz[linha, coluna] = np.concatenate(closes)
+    return Universo(simbolos, open_time, _preencher_adiante(matriz))
+
+
+def _preencher_adiante(matriz):
+    if not matriz.size:
+        return matriz
+    posicoes = np.where(np.isfinite(matriz), np.arange(matriz.shape[1]), 0)
+    np.maximum.accumulate(posicoes, axis=1, out=posicoes)
+    return matriz[np.arange(matriz.shape[0])[:, None], posicoes]
+
+
+def retornos_log(close):
+    """Log-retorno candle a candle; a primeira coluna é NaN para manter o formato da entrada."""
+    retornos = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        retornos[:, 1:] = np.diff(np.log(close), axis=1)
+    return retornos
+
+
+def retorno_janela(close, janela=JANELA_PADRAO):
+    """Retorno simples acumulado nos últimos `janela` candles (close[t] / close[t - janela] - 1)."""
+    retorno = np.full(close.shape, np.nan)
+    if close.shape[1] > janela:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            retorno[:, janela:] = close[:, janela:] / close[:, :-janela] - 1
+    return retorno
+
+
+def _soma_movel(valores, janela):
+    """Soma dos últimos `janela` valores ao longo das colunas, via soma acumulada (NaN antes da janela)."""
+    acumulado = np.zeros((valores.shape[0], valores.shape[1] + 1))
+    np.cumsum(valores, axis=1, out=acumulado[:, 1:])
+    soma = np.full(valores.shape, np.nan)
+    if valores.shape[1] >= janela:
+        soma[:, janela - 1:] = acumulado[:, janela:] - acumulado[:, :-janela]
+    return soma
+
+
+def correlacao_beta(retornos, referencia, janela=JANELA_PADRAO):
+    """
+    Correlação e beta móveis de cada linha de `retornos` contra o vetor `referencia`.
+    Só janelas com os `janela` pares de retornos válidos produzem valor.
+    """
+    referencia = np.broadcast_to(referencia, retornos.shape)
+    validos = np.isfinite(retornos) & np.isfinite(referencia)
+    x = np.where(validos, retornos, 0.0)
+    y = np.where(validos, referencia, 0.0)
+
+    n = _soma_movel(validos.astype(np.float64), janela)
+    sx, sy = _soma_movel(x, janela), _soma_movel(y, janela)
+    sxy, sxx, syy = _soma_movel(x * y, janela), _soma_movel(x * x, janela), _soma_movel(y * y, janela)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy / n - sx * sy / n ** 2
+        var_x = np.maximum(sxx / n - (sx / n) ** 2, 0.0)
+        var_y = np.maximum(syy / n - (sy / n) ** 2, 0.0)
+        correlacao = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        beta = cov / var_y
+
+    completas = n == janela
+    correlacao[~completas | ~np.isfinite(correlacao)] = np.nan
+    beta[~completas | ~np.isfinite(beta)] = np.nan
+    return correlacao, beta
+
+
+def ranquear(valores):
+    """
+    Percentil de cada símbolo entre os válidos da mesma coluna: 1.0 = o maior, 0.0 = o menor.
+    NaN onde o valor é NaN ou a coluna tem menos de dois símbolos válidos.
+    """
+    validos = np.isfinite(valores)
+    ordem = np.argsort(np.where(validos, valores, -np.inf), axis=0, kind="stable")
+    posicao = np.empty_like(ordem)
+    np.put_along_axis(posicao, ordem, np.arange(valores.shape[0])[:, None], axis=0)
+
+    quantidade = validos.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentil = (posicao - (valores.shape[0] - quantidade)) / (quantidade - 1)
+    percentil[~validos | (quantidade < 2)] = np.nan
+    return percentil
+
+
+def analisar_universo(series, benchmark=BENCHMARK, janela=JANELA_PADRAO):
+    """
+    Retorno da janela, correlação/beta contra `benchmark` e força relativa (percentil do
+    retorno da janela no universo) para todos os símbolos e candles em uma passada.
+    `series` é `{symbol: Candles}` ou um `Universo` já alinhado.
+    """
+    universo = series if isinstance(series, Universo) else alinhar_closes(series)
+    if benchmark not in universo.simbolos:
+        raise ValueError(f"{benchmark} precisa estar no universo analisado.")
+
+    retornos = retornos_log(universo.close)
+    referencia = retornos[universo.simbolos.index(benchmark)]
+    retorno = retorno_janela(universo.close, janela)
+    correlacao, beta = correlacao_beta(retornos, referencia, janela)
+    return AnaliseUniverso(universo.simbolos, universo.open_time, retorno, correlacao, beta,
+                           ranquear(retorno), benchmark, janela)
+
+
+def resumo(analise, symbol, posicao=-1):
+    """Valores de um símbolo em um candle (o mais recente por padrão), com a leitura de desacoplamento."""
+    i = analise.simbolos.index(symbol)
+    saida = {
+        'retorno': float(analise.retorno[i, posicao]),
+        'correlacao': float(analise.correlacao[i, posicao]),
+        'beta': float(analise.beta[i, posicao]),
+        'forca_relativa': float(analise.forca_relativa[i, posicao]),
+    }
+    saida['desacoplado'] = bool(saida['correlacao'] < LIMIAR_DESACOPLAMENTO)
+    return saida
+
+
+def linha_relatorio(symbol, dados, benchmark=BENCHMARK, janela=JANELA_PADRAO, interval=None):
+    """Linha do relatório do Sentinel para um símbolo a partir de `resumo`."""
+    base = benchmark.replace("USDT", "")
+    quando = f" ({interval})" if interval else ""
+    if dados is None or np.isnan(dados['correlacao']):
+        return f"   🔄 Correlação com {base}{quando}: dados insuficientes para a janela de {janela} candles."
+    estado = f"Desacoplado do {base}" if dados['desacoplado'] else f"Acompanhando o {base}"
+    forca = "" if np.isnan(dados['forca_relativa']) else f" | Força relativa: {dados['forca_relativa']:.0%}"
+    return (
+        f"   {'🔄' if dados['desacoplado'] else '🔗'} {estado}{quando}: "
+        f"corr {dados['correlacao']:+.2f} | beta {dados['beta']:.2f} | "
+        f"retorno {janela}c {dados['retorno']:+.2%}{forca}"
+    )
+
+
+# === 📌 Última análise publicada (consumida pela estratégia e pela IA) === #
+
+_ultimas = {}
+_lock = threading.Lock()
+
+
+def publicar(interval, analise):
+    with _lock:
+        _ultimas[interval] = analise
+
+
+def ultima_analise(interval):
+    with _lock:
+        return _ultimas.get(interval)
+
+
+def contexto_simbolo(symbol, interval):
+    """`resumo` do símbolo na última análise publicada do intervalo, ou None."""
+    analise = ultima_analise(interval)
+    if analise is None or symbol not in analise.simbolos or not len(analise.open_time):
+        return None
+    return resumo(analise, symbol)
@@ -0,0 +1,225 @@
+# backtest.py 📼 CharlieCore Backtest — replay offline de klines históricos com a estratégia real
+import os
+import sys
+import time
+
+import numpy as np
+
+from candles import Candles, CANDLE_DTYPE, CAMPOS
+from estrategia import avaliar_estrategia_vetorizada, direcao_entrada, renderizar_sinal
+from indicators.momentum import rsi_janelado, obv_janelado, inicio_rsi_janelado
+from indicators.supertrend import supertrend_arrays
+
+JANELA_ANALISE = 200     # klines usados por analyze_indicators
+CANDLES_INICIO_RSI = 10  # janela de verificar_inicio_rsi
+TAXA_PADRAO = 0.0004     # taker Binance Futures (0,04%)
+SLIPPAGE_PADRAO = 0.0002 # 2 bps contra nós em cada fill
+VALOR_ORDEM_PADRAO = 1000.0  # USDT por entrada
+
+
+# === 📂 Carga de dados === #
+
+def carregar_candles(caminho):
+    """
+    Carrega klines de CSV, Parquet ou NPY para `Candles`.
+    - CSV/Parquet: colunas open_time|timestamp, open, high, low, close, volume, close_time,
+      ou o dump bruto da Binance (12 colunas, sem cabeçalho).
+    - NPY: array estruturado CANDLE_DTYPE (aberto com mmap) ou matriz (n, 7) na ordem de CAMPOS.
+    - BIN: arquivo do `CandleStore` (registros CANDLE_DTYPE, aberto com mmap).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao == ".bin":
+        n = os.path.getsize(caminho) // CANDLE_DTYPE.itemsize
+        return Candles.from_records(np.memmap(caminho, dtype=CANDLE_DTYPE, mode="r", shape=(n,)))
+
+    if extensao == ".npy":
+        bruto = np.load(caminho, mmap_mode="r")
+        if bruto.dtype == CANDLE_DTYPE:
+            return Candles.from_records(bruto)
+        return _candles_de_matriz(np.asarray(bruto, dtype=np.float64))
+
+    import pandas as pd
+
+    if extensao == ".parquet":
+        df = pd.read_parquet(caminho)
+    elif extensao == ".csv":
+        df = pd.read_csv(caminho)
+        if not any(c in df.columns for c in ("open_time", "timestamp")):
+            df = pd.read_csv(caminho, header=None)
+    else:
+        raise ValueError(f"Formato não suportado para backtest: {caminho}")
+
+    if "timestamp" in df.columns:
+        df = df.rename(columns={"timestamp": "open_time"})
+    if "open_time" in df.columns:
+        matriz = df[list(CAMPOS)].to_numpy(dtype=np.float64)
+    else:
+        matriz = df.iloc[:, :7].to_numpy(dtype=np.float64)
+    return _candles_de_matriz(matriz)
+
+
+def _candles_de_matriz(matriz):
+    data = np.empty(len(matriz), dtype=CANDLE_DTYPE)
+    for idx, campo in enumerate(CAMPOS):
+        data[campo] = matriz[:, idx]
+    return Candles(data)
+
+
+# === 🧮 Pré-cálculo vetorizado === #
+
+def precomputar_indicadores(candles, janela=JANELA_ANALISE):
+    """
+    Calcula de uma vez, para cada candle, os valores que `analyze_indicators` e
+    `verificar_inicio_rsi` produziriam se chamados no fechamento daquele candle.
+    RSI e OBV usam exatamente a janela de 200 klines; o Supertrend usa o histórico
+    completo (a recorrência converge para o mesmo estado após a primeira virada).
+    """
+    close = candles.close
+    return {
+        'rsi': rsi_janelado(close, window=14, janela=janela),
+        'obv': obv_janelado(close, candles.volume, janela=janela),
+        'supertrend': supertrend_arrays(candles.high, candles.low, close, window=10, multiplier=3.0).direction,
+        'inicio_rsi': inicio_rsi_janelado(close, candles=CANDLES_INICIO_RSI, window=14),
+    }
+
+
+# === 💸 Execução simulada === #
+
+class SimuladorExecucao:
+    """
+    Substituto offline de `executor.enviar_ordem`: preenche a ordem a mercado no preço
+    informado com slippage contra a posição e cobra taxa sobre o notional.
+    """
+
+    def __init__(self, taxa=TAXA_PADRAO, slippage=SLIPPAGE_PADRAO):
+        self.taxa = taxa
+        self.slippage = slippage
+        self.ordens = []
+        self.taxas_pagas = 0.0
+
+    def enviar_ordem(self, symbol, lado, quantidade, preco, momento=None):
+        preco_fill = preco * (1 + self.slippage) if lado == "BUY" else preco * (1 - self.slippage)
+        taxa = preco_fill * quantidade * self.taxa
+        self.taxas_pagas += taxa
+        ordem = {
+            'symbol': symbol,
+            'side': lado,
+            'origQty': quantidade,
+            'avgPrice': preco_fill,
+            'status': 'FILLED',
+            'fee': taxa,
+            'time': momento,
+        }
+        self.ordens.append(ordem)
+        return ordem
+
+
+# === 🔁 Replay === #
+
+def executar_backtest(candles, symbol="BTCUSDT", intervalo="5m", valor_ordem=VALOR_ORDEM_PADRAO,
+                      taxa=TAXA_PADRAO, slippage=SLIPPAGE_PADRAO, indicadores=None):
+    """
+    Avalia a estratégia em todos os fechamentos de uma vez (`avaliar_estrategia_vetorizada`)
+    e percorre os candles aplicando as decisões como a sentinela faria. Entrada exige a
+    confirmação de `verificar_inicio_rsi`; a ordem é preenchida na abertura do candle seguinte.
+    A posição é encerrada quando o Supertrend vira contra ela ou surge uma entrada no sentido
+    oposto.
+    """
+    if indicadores is None:
+        indicadores = precomputar_indicadores(candles)
+
+    codigos = avaliar_estrategia_vetorizada(indicadores['rsi'], indicadores['obv'], indicadores['supertrend'], intervalo)
+    sinais = (direcao_entrada(codigos) * indicadores['inicio_rsi']).tolist()
+    codigos = codigos.tolist()
+    supertrend = indicadores['supertrend'].tolist()
+    abertura = candles.open.tolist()
+    tempos = candles.open_time.tolist()
+
+    execucao = SimuladorExecucao(taxa=taxa, slippage=slippage)
+    trades = []
+    posicao = None
+    pnl_realizado = 0.0
+    curva = np.zeros(len(candles))
+
+    fechamento = candles.close.tolist()
+    for i in range(JANELA_ANALISE - 1, len(candles) - 1):
+        sinal = sinais[i]
+        preco = abertura[i + 1]
+        if posicao is not None:
+            virou = supertrend[i] != posicao['lado']
+            if virou or sinal == -posicao['lado']:
+                pnl_realizado += _fechar(execucao, posicao, symbol, preco, tempos[i + 1], trades)
+                posicao = None
+
+        if posicao is None and sinal != 0:
+            quantidade = valor_ordem / preco
+            ordem = execucao.enviar_ordem(symbol, "BUY" if sinal > 0 else "SELL", quantidade, preco, tempos[i + 1])
+            posicao = {'lado': sinal, 'quantidade': quantidade, 'entrada': ordem['avgPrice'],
+                       'taxa': ordem['fee'], 'inicio': tempos[i + 1], 'decisao': renderizar_sinal(codigos[i])}
+
+        aberto = 0.0
+        if posicao is not None:
+            aberto = posicao['lado'] * (fechamento[i + 1] - posicao['entrada']) * posicao['quantidade'] - posicao['taxa']
+        curva[i + 1] = pnl_realizado + aberto
+
+    if posicao is not None:
+        pnl_realizado += _fechar(execucao, posicao, symbol, fechamento[-1], tempos[-1], trades)
+        curva[-1] = pnl_realizado
+
+    return _resumo(symbol, intervalo, trades, curva, execucao)
+
+
+def _fechar(execucao, posicao, symbol, preco, momento, trades):
+    lado_saida = "SELL" if posicao['lado'] > 0 else "BUY"
+    ordem = execucao.enviar_ordem(symbol, lado_saida, posicao['quantidade'], preco, momento)
+    bruto = posicao['lado'] * (ordem['avgPrice'] - posicao['entrada']) * posicao['quantidade']
+    liquido = bruto - posicao['taxa'] - ordem['fee']
+    trades.append({
+        'symbol': symbol,
+        'lado': "LONG" if posicao['lado'] > 0 else "SHORT",
+        'entrada_ms': posicao['inicio'],
+        'saida_ms': momento,
+        'preco_entrada': posicao['entrada'],
+        'preco_saida': ordem['avgPrice'],
+        'pnl': liquido,
+    })
+    return liquido
+
+
+def _resumo(symbol, intervalo, trades, curva, execucao):
+    pnls = np.array([t['pnl'] for t in trades])
+    pico = np.maximum.accumulate(curva) if len(curva) else curva
+    drawdown = float((pico - curva).max()) if len(curva) else 0.0
+    return {
+        'symbol': symbol,
+        'intervalo': intervalo,
+        'pnl': float(pnls.sum()) if len(pnls) else 0.0,
+        'trades': len(trades),
+        'hit_rate': float((pnls > 0).mean()) if len(pnls) else 0.0,
+        'max_drawdown': drawdown,
+        'taxas': execucao.taxas_pagas,
+        'lista_trades': trades,
+        'curva': curva,
+    }
+
+
+def formatar_resultado(res):
+    return (
+        f"📼 {res['symbol']} [{res['intervalo']}] | Trades: {res['trades']} | "
+        f"PnL: {res['pnl']:.2f} USDT | Hit rate: {res['hit_rate'] * 100:.1f}% | "
+        f"Max DD: {res['max_drawdown']:.2f} USDT | Taxas: {res['taxas']:.2f}"
+    )
+
+
+def main(caminhos):
+    for caminho in caminhos:
+        symbol = os.path.basename(caminho).split("_")[0].split(".")[0].upper()
+        inicio = time.perf_counter()
+        candles = carregar_candles(caminho)
+        res = executar_backtest(candles, symbol=symbol)
+        print(formatar_resultado(res) + f" | {len(candles)} candles em {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
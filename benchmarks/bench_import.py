@@ -0,0 +1,65 @@
+# bench_import.py ⏱️ CharlieCore Bench — tempo de cold start dos módulos de entrada
+"""
+Mede o tempo de import a frio de `sentinel` e `indicators.indicators`, cada um num
+interpretador novo, e aponta quais dependências pesadas foram carregadas só pelo import.
+
+    python benchmarks/bench_import.py [--repeticoes 7] [--limite-ms 400]
+
+Sai com código 1 se a mediana passar de `--limite-ms` ou se algum módulo pesado
+(pandas, ta, requests, binance, aiohttp, websockets) for importado por efeito colateral.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS = ["sentinel", "indicators.indicators"]
+PESADOS = ["pandas", "ta", "requests", "binance", "aiohttp", "websockets", "dotenv"]
+
+SONDA = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+decorrido = time.perf_counter() - inicio
+print(json.dumps({{"segundos": decorrido, "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir(modulo, repeticoes=7):
+    """Importa `modulo` em `repeticoes` processos novos. Retorna (tempos em s, pesados carregados)."""
+    tempos = []
+    pesados = set()
+    codigo = SONDA.format(modulo=modulo, pesados=PESADOS)
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+        resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+        tempos.append(resultado["segundos"])
+        pesados.update(resultado["pesados"])
+    return tempos, sorted(pesados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold start dos módulos do CharlieCore")
+    parser.add_argument("--repeticoes", type=int, default=7)
+    parser.add_argument("--limite-ms", type=float, default=None, help="falha se a mediana passar deste valor")
+    args = parser.parse_args(argv)
+
+    falhou = False
+    for modulo in MODULOS:
+        tempos, pesados = medir(modulo, args.repeticoes)
+        mediana = statistics.median(tempos) * 1000
+        print(f"📦 {modulo:<24} mediana {mediana:7.1f} ms | mín {min(tempos) * 1000:7.1f} ms | "
+              f"pesados: {', '.join(pesados) or 'nenhum'}")
+        if pesados or (args.limite_ms is not None and mediana > args.limite_ms):
+            falhou = True
+
+    if falhou:
+        print("❌ Regressão no cold start.")
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
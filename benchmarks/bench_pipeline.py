@@ -0,0 +1,230 @@
+# bench_pipeline.py ⏱️ CharlieCore Bench — indicadores e varredura com fixtures determinísticas
+"""
+Mede tempo (mediana de N repetições), memória alocada e pico (tracemalloc) de:
+Supertrend, RSI/OBV, analyze_indicators, verificar_inicio_rsi e run_analysis completo
+(Binance, Discord e voz substituídos por fontes locais), sobre os 7 símbolos.
+
+    python benchmarks/bench_pipeline.py                       # roda e compara com baseline.json
+    python benchmarks/bench_pipeline.py --tamanhos 200,10000  # sem o caso de 1M candles
+    python benchmarks/bench_pipeline.py --salvar-baseline     # grava a execução como nova referência
+
+Sai com código 1 se algum caso ficar mais lento (ou com pico maior) que a baseline além da tolerância.
+A baseline é específica da máquina: regrave-a ao trocar de hardware.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import SYMBOLS, TAMANHOS, gerar_candles, klines_brutos, impressao_digital  # noqa: E402
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCIA_PADRAO = 0.25
+FOLGA_MS = 0.5  # diferenças absolutas menores que isso são ruído de medição
+
+
+# === 🧪 Casos === #
+
+def casos_indicadores(tamanho):
+    """Um caso por indicador e tamanho; cada execução cobre os 7 símbolos."""
+    from indicators.momentum import rsi_wilder, obv
+    from indicators.supertrend import Supertrend, supertrend_arrays
+
+    series = {symbol: gerar_candles(symbol, tamanho) for symbol in SYMBOLS}
+
+    def supertrend():
+        for c in series.values():
+            supertrend_arrays(c.high, c.low, c.close, window=10, multiplier=3.0)
+
+    def supertrend_df():
+        for c in series.values():
+            Supertrend.from_candles(c).supertrend_direction()
+
+    def rsi_obv():
+        for c in series.values():
+            rsi_wilder(c.close, window=14)
+            obv(c.close, c.volume)
+
+    casos = {f"supertrend[{tamanho}]": supertrend, f"rsi_obv[{tamanho}]": rsi_obv}
+    if tamanho <= 10_000:
+        casos[f"Supertrend.df[{tamanho}]"] = supertrend_df
+    return casos, impressao_digital(series[SYMBOLS[0]])
+
+
+class _CacheNulo:
+    def set_max_len(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def fonte_local(tamanho=10_000):
+    """Substitui a Binance, o Discord, a voz e o registro de eventos por fontes locais durante o bloco."""
+    import indicators.indicators as ind
+    import sentinel
+
+    brutos = {symbol: klines_brutos(gerar_candles(symbol, tamanho)) for symbol in SYMBOLS}
+
+    def get_klines(symbol="BTCUSDT", interval="15m", limit=200, apos=None):
+        klines = brutos[symbol][-limit:]
+        if apos is not None:
+            klines = [k for k in klines[:-1] if k[0] > apos] + klines[-1:]   # o último segue em formação
+        return klines
+
+    originais = {
+        (ind, "get_klines"): ind.get_klines,
+        (ind, "kline_cache"): ind.kline_cache,
+        (ind, "series_multi"): ind.series_multi,
+        (sentinel, "falar"): sentinel.falar,
+        (sentinel, "enviar_alerta_entrada"): sentinel.enviar_alerta_entrada,
+        (sentinel, "registrar_evento"): sentinel.registrar_evento,
+    }
+    ind.get_klines = get_klines
+    ind.kline_cache = _CacheNulo()
+    ind.series_multi = {}
+    sentinel.falar = lambda *a, **k: None
+    sentinel.enviar_alerta_entrada = lambda *a, **k: None
+    sentinel.registrar_evento = lambda *a, **k: None
+    try:
+        yield
+    finally:
+        for (modulo, nome), valor in originais.items():
+            setattr(modulo, nome, valor)
+
+
+def casos_varredura():
+    import indicators.indicators as ind
+    import sentinel
+
+    def analyze():
+        for symbol in SYMBOLS:
+            for interval in sentinel.INTERVALS:
+                ind.analyze_indicators(symbol, interval)
+
+    def inicio_rsi():
+        for symbol in SYMBOLS:
+            ind.verificar_inicio_rsi(symbol)
+
+    def varredura(concorrente, reamostrar):
+        def executar():
+            with contextlib.redirect_stdout(io.StringIO()):
+                sentinel.run_analysis(concorrente=concorrente, reamostrar=reamostrar)
+        return executar
+
+    return {
+        "analyze_indicators[7x3]": analyze,
+        "verificar_inicio_rsi[7]": inicio_rsi,
+        "run_analysis[serial]": varredura(False, False),
+        "run_analysis[concorrente+reamostragem]": varredura(True, True),
+    }
+
+
+# === 📏 Medição === #
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento: imports sob demanda e caches de primeira chamada ficam fora da medida
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    funcao()
+    alocado, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'mediana_ms': round(statistics.median(tempos) * 1000, 3),
+        'min_ms': round(min(tempos) * 1000, 3),
+        'alocado_kb': round(alocado / 1024, 1),
+        'pico_kb': round(pico / 1024, 1),
+    }
+
+
+def comparar(resultados, baseline, tolerancia):
+    """
+    Lista de regressões (caso, métrica, atual, referência) acima da tolerância.
+    O tempo comparado é o mínimo das repetições, menos sensível a ruído que a mediana.
+    """
+    regressoes = []
+    for caso, atual in resultados.items():
+        referencia = baseline.get('casos', {}).get(caso)
+        if not referencia:
+            continue
+        if atual['min_ms'] > referencia['min_ms'] * (1 + tolerancia) + FOLGA_MS:
+            regressoes.append((caso, 'min_ms', atual['min_ms'], referencia['min_ms']))
+        if referencia['pico_kb'] > 0 and atual['pico_kb'] > referencia['pico_kb'] * (1 + tolerancia):
+            regressoes.append((caso, 'pico_kb', atual['pico_kb'], referencia['pico_kb']))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks reproduzíveis do CharlieCore")
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS))
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--casos", default=None, help="regex para filtrar casos pelo nome")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    parser.add_argument("--salvar-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    filtro = re.compile(args.casos) if args.casos else None
+    resultados = {}
+    digitais = {}
+
+    def rodar(nome, funcao, repeticoes):
+        if filtro and not filtro.search(nome):
+            return
+        resultados[nome] = medir(funcao, repeticoes)
+        r = resultados[nome]
+        print(f"⏱ {nome:<42} {r['mediana_ms']:>10.2f} ms (mín {r['min_ms']:.2f}) | "
+              f"alocado {r['alocado_kb']:>9.1f} KB | pico {r['pico_kb']:>10.1f} KB")
+
+    for tamanho in (int(t) for t in args.tamanhos.split(",") if t):
+        casos, digitais[str(tamanho)] = casos_indicadores(tamanho)
+        repeticoes = max(1, args.repeticoes if tamanho < 1_000_000 else args.repeticoes // 5)
+        for nome, funcao in casos.items():
+            rodar(nome, funcao, repeticoes)
+
+    with fonte_local():
+        for nome, funcao in casos_varredura().items():
+            rodar(nome, funcao, args.repeticoes)
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({'python': sys.version.split()[0], 'fixtures': digitais, 'casos': resultados}, f, indent=2)
+        print(f"💾 Baseline gravada em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("⚠️ Sem baseline para comparar (use --salvar-baseline).")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    for tamanho, digital in digitais.items():
+        if baseline.get('fixtures', {}).get(tamanho) not in (None, digital):
+            print(f"⚠️ Fixtures de {tamanho} candles mudaram desde a baseline: comparação não é válida.")
+
+    regressoes = comparar(resultados, baseline, args.tolerancia)
+    for caso, metrica, atual, referencia in regressoes:
+        print(f"❌ {caso}: {metrica} {atual:.1f} vs baseline {referencia:.1f} (+{(atual / referencia - 1) * 100:.0f}%)")
+    if not regressoes:
+        print(f"✅ Nenhuma regressão acima de {args.tolerancia:.0%} em relação à baseline.")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
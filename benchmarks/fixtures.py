@@ -0,0 +1,55 @@
+# fixtures.py 🧬 CharlieCore Bench — klines sintéticos determinísticos por símbolo
+"""
+Séries 5m geradas a partir de uma semente fixa por (símbolo, tamanho): o mesmo comando
+produz os mesmos candles em qualquer máquina, sem depender da Binance.
+"""
+import hashlib
+import zlib
+
+import numpy as np
+
+from candles import Candles, CANDLE_DTYPE
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "SUIUSDT", "XRPUSDT", "DOGEUSDT", "PEPEUSDT", "SOLUSDT"]
+TAMANHOS = [200, 10_000, 1_000_000]
+INICIO_MS = 1_704_067_200_000  # 2024-01-01 00:00 UTC, alinhado aos buckets de 4h
+CINCO_MIN = 300_000
+
+# Ordem de grandeza do preço, para que OBV/ATR tenham escalas realistas
+PRECO_BASE = {
+    "BTCUSDT": 42_000.0, "ETHUSDT": 2_300.0, "SUIUSDT": 0.8, "XRPUSDT": 0.6,
+    "DOGEUSDT": 0.09, "PEPEUSDT": 0.0000012, "SOLUSDT": 100.0,
+}
+
+
+def gerar_candles(symbol, n):
+    """Passeio aleatório com ciclos (para o RSI cruzar 30/70) e volume log-normal."""
+    rng = np.random.default_rng(zlib.crc32(f"{symbol}:{n}".encode()))
+    retornos = rng.normal(0, 0.002, n) + np.sin(np.arange(n) / 40) * 0.0015
+    close = PRECO_BASE[symbol] * np.exp(np.cumsum(retornos))
+    abertura = np.concatenate(([close[0]], close[:-1]))
+    pavio = np.abs(rng.normal(0, 0.001, n)) * close
+
+    data = np.empty(n, dtype=CANDLE_DTYPE)
+    data['open_time'] = INICIO_MS + np.arange(n, dtype=np.int64) * CINCO_MIN
+    data['close_time'] = data['open_time'] + CINCO_MIN - 1
+    data['open'] = abertura
+    data['close'] = close
+    data['high'] = np.maximum(abertura, close) + pavio
+    data['low'] = np.minimum(abertura, close) - pavio
+    data['volume'] = rng.lognormal(8, 1, n)
+    return Candles(data)
+
+
+def klines_brutos(candles):
+    """Payload no formato da API da Binance (12 campos, números como string)."""
+    return [
+        [int(r['open_time']), repr(float(r['open'])), repr(float(r['high'])), repr(float(r['low'])),
+         repr(float(r['close'])), repr(float(r['volume'])), int(r['close_time']), "0", 0, "0", "0", "0"]
+        for r in candles.data
+    ]
+
+
+def impressao_digital(candles):
+    """Hash curto dos bytes da série: detecta se o gerador mudou entre baseline e execução."""
+    return hashlib.sha256(np.ascontiguousarray(candles.data).tobytes()).hexdigest()[:16]
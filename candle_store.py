@@ -0,0 +1,164 @@
+# candle_store.py 💾 CharlieCore Candle Store — candles fechados em disco, append-only e lidos via mmap
+import os
+import threading
+
+import numpy as np
+
+from candles import Candles, CANDLE_DTYPE
+
+PASTA_PADRAO = os.getenv("CHARLIE_CANDLES_DIR", "dados/candles")
+TAMANHO_REGISTRO = CANDLE_DTYPE.itemsize  # 56 bytes, sem cabeçalho: o arquivo é só o array
+
+
+class CandleStore:
+    """
+    Um arquivo `.bin` por (symbol, interval) com registros fixos de `CANDLE_DTYPE`,
+    em ordem estritamente crescente de `open_time`.
+
+    - Escrita: só anexa candles mais novos que o último gravado, com fsync a cada lote.
+      Um registro parcial no fim (queda no meio da escrita) é truncado na abertura.
+    - Leitura: `np.memmap` + busca binária por `open_time`; devolve `Candles` sobre o próprio
+      mapeamento, sem cópia.
+    """
+
+    def __init__(self, pasta=PASTA_PADRAO):
+        self.pasta = pasta
+        self._ultimos = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def caminho(self, symbol, interval):
+        return os.path.join(self.pasta, f"{symbol}_{interval}.bin")
+
+    def anexar(self, symbol, interval, candles):
+        """
+        Grava os candles (fechados) de `candles` — `Candles` ou array `CANDLE_DTYPE` — cujo
+        `open_time` é posterior ao último em disco. Retorna quantos registros foram gravados.
+        """
+        registros = candles.data if isinstance(candles, Candles) else np.asarray(candles, dtype=CANDLE_DTYPE)
+        if not len(registros):
+            return 0
+
+        chave = (symbol, interval)
+        with self._lock_serie(chave):
+            ultimo = self._ultimo_open_time(chave)
+            if ultimo is not None:
+                registros = registros[registros['open_time'] > ultimo]
+            if len(registros) > 1 and np.any(np.diff(registros['open_time']) <= 0):
+                raise ValueError(f"Candles fora de ordem para {symbol} {interval}.")
+            if not len(registros):
+                return 0
+
+            os.makedirs(self.pasta, exist_ok=True)
+            fd = os.open(self.caminho(symbol, interval), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, np.ascontiguousarray(registros).tobytes())
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._ultimos[chave] = int(registros['open_time'][-1])
+            return len(registros)
+
+    def substituir(self, symbol, interval, candles):
+        """
+        Regrava a série inteira só com `candles` (troca atômica do arquivo). Usado quando a janela
+        rebuscada não encosta no fim do disco: anexá-la deixaria um buraco no meio da série.
+        """
+        registros = candles.data if isinstance(candles, Candles) else np.asarray(candles, dtype=CANDLE_DTYPE)
+        if len(registros) > 1 and np.any(np.diff(registros['open_time']) <= 0):
+            raise ValueError(f"Candles fora de ordem para {symbol} {interval}.")
+
+        chave = (symbol, interval)
+        with self._lock_serie(chave):
+            os.makedirs(self.pasta, exist_ok=True)
+            caminho = self.caminho(symbol, interval)
+            temporario = f"{caminho}.tmp"
+            with open(temporario, "wb") as f:
+                f.write(np.ascontiguousarray(registros).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, caminho)
+            self._ultimos[chave] = int(registros['open_time'][-1]) if len(registros) else None
+            return len(registros)
+
+    def remover(self, symbol, interval=None):
+        """Apaga os arquivos do par (de um `interval` ou de todos). Retorna quantos foram apagados."""
+        if interval is not None:
+            intervalos = [interval]
+        else:
+            prefixo = f"{symbol}_"
+            try:
+                nomes = os.listdir(self.pasta)
+            except FileNotFoundError:
+                return 0
+            intervalos = [n[len(prefixo):-4] for n in nomes if n.startswith(prefixo) and n.endswith(".bin")]
+
+        removidos = 0
+        for intervalo in intervalos:
+            chave = (symbol, intervalo)
+            with self._lock_serie(chave):
+                try:
+                    os.remove(self.caminho(symbol, intervalo))
+                    removidos += 1
+                except FileNotFoundError:
+                    pass
+                self._ultimos.pop(chave, None)
+        return removidos
+
+    def ler(self, symbol, interval, inicio=None, fim=None):
+        """Candles com `inicio <= open_time <= fim` (ms, limites opcionais), mapeados do disco."""
+        registros = self._mapear(symbol, interval)
+        open_time = registros['open_time']
+        i = 0 if inicio is None else int(np.searchsorted(open_time, inicio, side="left"))
+        j = len(registros) if fim is None else int(np.searchsorted(open_time, fim, side="right"))
+        return Candles.from_records(registros[i:j])
+
+    def ultimos(self, symbol, interval, n):
+        """Os `n` candles mais recentes em disco."""
+        registros = self._mapear(symbol, interval)
+        return Candles.from_records(registros[max(0, len(registros) - n):])
+
+    def tamanho(self, symbol, interval):
+        try:
+            return os.path.getsize(self.caminho(symbol, interval)) // TAMANHO_REGISTRO
+        except FileNotFoundError:
+            return 0
+
+    def ultimo_open_time(self, symbol, interval):
+        chave = (symbol, interval)
+        with self._lock_serie(chave):
+            return self._ultimo_open_time(chave)
+
+    # --- internos ---
+
+    def _lock_serie(self, chave):
+        with self._lock:
+            return self._locks.setdefault(chave, threading.Lock())
+
+    def _ultimo_open_time(self, chave):
+        """Último `open_time` gravado (com o lock da série). Na primeira vez, recupera o arquivo."""
+        if chave not in self._ultimos:
+            caminho = self.caminho(*chave)
+            ultimo = None
+            if os.path.exists(caminho):
+                tamanho = os.path.getsize(caminho)
+                sobra = tamanho % TAMANHO_REGISTRO
+                if sobra:
+                    print(f"⚠️ Registro parcial em {caminho}: truncando {sobra} bytes.")
+                    with open(caminho, "r+b") as f:
+                        f.truncate(tamanho - sobra)
+                        os.fsync(f.fileno())
+                    tamanho -= sobra
+                if tamanho:
+                    with open(caminho, "rb") as f:
+                        f.seek(tamanho - TAMANHO_REGISTRO)
+                        ultimo = int(np.frombuffer(f.read(TAMANHO_REGISTRO), dtype=CANDLE_DTYPE)['open_time'][0])
+            self._ultimos[chave] = ultimo
+        return self._ultimos[chave]
+
+    def _mapear(self, symbol, interval):
+        n = self.tamanho(symbol, interval)
+        if not n:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        # Só os registros completos: um append em andamento não aparece pela metade
+        return np.memmap(self.caminho(symbol, interval), dtype=CANDLE_DTYPE, mode="r", shape=(n,))
@@ -0,0 +1,92 @@
+# candles.py 🕯️ CharlieCore Candles — armazenamento colunar compacto de OHLCV
+import numpy as np
+
+# Registro fixo de 56 bytes por candle: apenas os campos usados pelos indicadores
+CANDLE_DTYPE = np.dtype([
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),
+])
+
+CAMPOS = CANDLE_DTYPE.names
+
+
+class Candles:
+    """
+    Série de candles sobre um único array NumPy estruturado (open time, OHLCV, close time).
+    Fatias devolvem views (sem cópia) e as colunas podem ir direto para os indicadores.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        if data.dtype != CANDLE_DTYPE:
+            raise TypeError(f"dtype inválido para Candles: {data.dtype}")
+        self.data = data
+
+    @classmethod
+    def from_klines(cls, klines):
+        """Parse em lote do payload de klines da Binance (listas com números em string)."""
+        if not klines:
+            return cls(np.empty(0, dtype=CANDLE_DTYPE))
+
+        bruto = np.array([k[:7] for k in klines], dtype=np.float64)
+        data = np.empty(len(bruto), dtype=CANDLE_DTYPE)
+        for idx, campo in enumerate(CAMPOS):
+            data[campo] = bruto[:, idx]
+        return cls(data)
+
+    @classmethod
+    def from_records(cls, records):
+        """Envolve um array estruturado já existente (ex.: memmap) sem copiar."""
+        return cls(records)
+
+    @property
+    def open_time(self):
+        return self.data['open_time']
+
+    @property
+    def open(self):
+        return self.data['open']
+
+    @property
+    def high(self):
+        return self.data['high']
+
+    @property
+    def low(self):
+        return self.data['low']
+
+    @property
+    def close(self):
+        return self.data['close']
+
+    @property
+    def volume(self):
+        return self.data['volume']
+
+    @property
+    def close_time(self):
+        return self.data['close_time']
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return Candles(self.data[item])
+        return self.data[item]
+
+    def __repr__(self):
+        return f"Candles(n={len(self)})"
+
+    def to_pandas(self):
+        """Escape para pandas: DataFrame com os mesmos nomes de coluna usados no restante do código."""
+        import pandas as pd
+
+        df = pd.DataFrame({campo: self.data[campo] for campo in CAMPOS})
+        return df.rename(columns={'open_time': 'timestamp'})
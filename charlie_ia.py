@@ -1,65 +1,338 @@
 # charlie_ia.py 🤖 CharlieCore AI Module — Tactical Intelligence Interface
+import asyncio
+import functools
+import json
 import os
-import requests
-from dotenv import load_dotenv
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import metricas
+from ambiente import carregar_ambiente
+
+OPENAI_API_KEY = None
+OPENAI_URL = os.getenv("OPENAI_URL", "https://api.openai.com/v1/chat/completions")
+MODELO_PADRAO = "gpt-3.5-turbo"
+PROMPT_SISTEMA = "Você é Charlie, a IA tática da CharlieCore."
+
+TIMEOUT_HTTP = 15
+CONEXOES = 8
+CACHE_TTL = float(os.getenv("CHARLIE_IA_CACHE_TTL", "60"))   # segundos
+CACHE_MAXIMO = 256
+INTERVALOS_CONTEXTO = ("15m", "1h", "4h")
+MAX_SIMBOLOS_CONTEXTO = 3
+TRECHO_ERRO = 200   # caracteres do corpo mostrados em erros (o corpo inteiro nunca vai para o log)
+
 
 # === 🔰 FASE 1: BOOTSTRAP DO AMBIENTE === #
-print("🧠 [CharlieCore] Iniciando carregamento de variáveis táticas...")
-dotenv_ok = load_dotenv("config/keys.env")
+def carregar_chave():
+    """Carrega o ambiente e a chave da OpenAI na primeira chamada (não no import)."""
+    global OPENAI_API_KEY
+    if OPENAI_API_KEY:
+        return OPENAI_API_KEY
+
+    print("🧠 [CharlieCore] Iniciando carregamento de variáveis táticas...")
+    if carregar_ambiente():
+        print("✅ [CharlieCore] Ambiente carregado com sucesso.")
+    else:
+        print("⚠️ [CharlieCore] Falha ao carregar config/keys.env.")
+
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    if not OPENAI_API_KEY:
+        print("❌ [CharlieCore] Chave da OpenAI não encontrada no ambiente.")
+    else:
+        print("🔐 [CharlieCore] Chave da OpenAI carregada.")
+    return OPENAI_API_KEY
+
+
+def configurar(url=None, chave=None, ttl=None):
+    """Permite injetar o endpoint e a chave (ex.: servidor stub local nos testes)."""
+    global OPENAI_URL, OPENAI_API_KEY, CACHE_TTL
+    if url is not None:
+        OPENAI_URL = url
+    if chave is not None:
+        OPENAI_API_KEY = chave
+    if ttl is not None:
+        CACHE_TTL = ttl
+        if _cliente is not None:
+            _cliente.cache.ttl = ttl
+
+
+# === 🗃️ FASE 2: CACHE E COALESCÊNCIA === #
+def normalizar(pergunta):
+    """Chave do cache: sem diferença de caixa, espaços repetidos ou pontuação final."""
+    return re.sub(r"\s+", " ", pergunta).strip().rstrip("?!.").strip().lower()
+
+
+class CacheRespostas:
+    """LRU com validade: no máximo `maximo` respostas, cada uma válida por `ttl` segundos."""
+
+    def __init__(self, maximo=CACHE_MAXIMO, ttl=CACHE_TTL, relogio=time.monotonic):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._relogio = relogio
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            valor, expira = item
+            if self._relogio() >= expira:
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (valor, self._relogio() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
 
-if dotenv_ok:
-    print("✅ [CharlieCore] Ambiente carregado com sucesso.")
-else:
-    print("⚠️ [CharlieCore] Falha ao carregar config/keys.env.")
+    def __len__(self):
+        with self._lock:
+            return len(self._itens)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-if not OPENAI_API_KEY:
-    print("❌ [CharlieCore] Chave da OpenAI não encontrada no ambiente.")
-else:
-    print("🔐 [CharlieCore] Chave da OpenAI carregada.")
+class ErroIA(Exception):
+    def __init__(self, status, corpo):
+        self.status = status
+        self.trecho = str(corpo)[:TRECHO_ERRO]
+        super().__init__(f"OpenAI {status}: {self.trecho}")
 
-# === 🧠 FASE 2: FUNÇÃO DE RESPOSTA TÁTICA === #
-def responder_mensagem(pergunta, modelo="gpt-3.5-turbo"):
+
+class ClienteIA:
     """
-    Envia uma mensagem à OpenAI e retorna a resposta textual.
-    Ideal para integração com Discord ou interfaces de comando.
+    Cliente assíncrono (aiohttp) com sessão e pool de conexões reaproveitados.
+    Respostas ficam no `CacheRespostas` por (modelo, pergunta normalizada, contexto);
+    perguntas idênticas em voo ao mesmo tempo esperam a mesma requisição.
+    O contexto pode ser uma função sem argumentos: ela só roda (numa thread) quando a pergunta
+    não está no cache nem em voo, e a chave passa a ser a pergunta + `symbol`.
     """
-    if not OPENAI_API_KEY:
-        return "❌ Chave da OpenAI não encontrada."
 
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    def __init__(self, cache=None, conexoes=CONEXOES, timeout=TIMEOUT_HTTP):
+        self.cache = cache if cache is not None else CacheRespostas()
+        self.conexoes = conexoes
+        self.timeout = timeout
+        self._sessao = None
+        self._em_voo = {}
+        self.requisicoes = 0
+        self.coalescidas = 0
 
-    payload = {
-        "model": modelo,
-        "messages": [
-            {"role": "system", "content": "Você é Charlie, a IA tática da CharlieCore."},
-            {"role": "user", "content": pergunta}
-        ]
-    }
+    async def _obter_sessao(self):
+        import aiohttp
 
-    try:
-        print("🚀 [CharlieCore] Enviando requisição à OpenAI...")
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=15
-        )
-
-        print(f"📡 [CharlieCore] Código de resposta: {response.status_code}")
-        print("📝 [CharlieCore] Corpo da resposta:", response.text)
-
-        if response.status_code == 200:
-            resposta = response.json()["choices"][0]["message"]["content"]
-            print("✅ [CharlieCore] Resposta recebida da IA.")
-            return resposta.strip()
+        if self._sessao is None or self._sessao.closed:
+            self._sessao = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.conexoes),
+            )
+        return self._sessao
+
+    async def fechar(self):
+        if self._sessao is not None:
+            await self._sessao.close()
+
+    async def perguntar(self, pergunta, modelo=MODELO_PADRAO, contexto=None, symbol=None):
+        marca = ("contexto", symbol or "") if callable(contexto) else (contexto or "")
+        chave = (modelo, normalizar(pergunta), marca)
+        resposta = self.cache.obter(chave)
+        if resposta is not None:
+            metricas.contar("ia_cache", resultado="hit", modelo=modelo)
+            return resposta
+
+        em_voo = self._em_voo.get(chave)
+        if em_voo is not None:
+            self.coalescidas += 1
+            metricas.contar("ia_cache", resultado="coalescida", modelo=modelo)
+            try:
+                return await asyncio.shield(em_voo)
+            except asyncio.CancelledError:
+                if not em_voo.done():
+                    raise  # quem foi cancelado é quem esperava
+                # A requisição líder foi cancelada, não esta: pergunta de novo (cache, outra em voo ou nova)
+                return await self.perguntar(pergunta, modelo, contexto, symbol)
+
+        metricas.contar("ia_cache", resultado="miss", modelo=modelo)
+        futuro = asyncio.get_running_loop().create_future()
+        self._em_voo[chave] = futuro
+        try:
+            if callable(contexto):
+                contexto = await asyncio.to_thread(contexto)
+            resposta = await self._completar(pergunta, modelo, contexto)
+        except BaseException as e:  # inclui cancelamento: quem espera a mesma pergunta não fica preso
+            futuro.set_exception(e)
+            futuro.exception()  # marca como lida: sem espera concorrente, não vira aviso do asyncio
+            raise
         else:
-            return f"❌ Erro {response.status_code}: {response.text}"
+            self.cache.guardar(chave, resposta)
+            futuro.set_result(resposta)
+            return resposta
+        finally:
+            del self._em_voo[chave]
+
+    async def _completar(self, pergunta, modelo, contexto):
+        mensagens = [{"role": "system", "content": PROMPT_SISTEMA}]
+        if contexto:
+            mensagens.append({"role": "system", "content": f"Indicadores atuais (cache local da CharlieCore):\n{contexto}"})
+        mensagens.append({"role": "user", "content": pergunta})
+
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"}
+        sessao = await self._obter_sessao()
+        print("🚀 [CharlieCore] Enviando requisição à OpenAI...")
+        with metricas.cronometro("ia_resposta", modelo=modelo):
+            async with sessao.post(OPENAI_URL, headers=headers, json={"model": modelo, "messages": mensagens}) as resposta:
+                self.requisicoes += 1
+                corpo = await resposta.text()
+                status = resposta.status
+
+        print(f"📡 [CharlieCore] Código de resposta: {status} ({len(corpo)} bytes)")
+        if status != 200:
+            raise ErroIA(status, corpo)
+        return json.loads(corpo)["choices"][0]["message"]["content"].strip()
+
+
+# === 📎 FASE 3: CONTEXTO DE MERCADO (sem nova busca de klines) === #
+def _series_em_cache(symbol, interval):
+    """Candles do par já em memória; o intervalo pode vir da reamostragem do Sentinel (série 5m)."""
+    from candles import Candles
+    from data import kline_cache
+    from indicators.indicators import candles_reamostrados
 
+    klines = kline_cache.em_cache(symbol, interval)
+    if len(klines) >= 50:
+        return Candles.from_klines(klines[-200:])
+    candles = candles_reamostrados(symbol, interval)
+    if candles is None:
+        return None
+    candles = candles[-200:]
+    return candles if len(candles) >= 50 else None
+
+
+def simbolos_citados(pergunta):
+    """Pares citados na pergunta ("sui", "SUIUSDT") que já têm candles em cache."""
+    from data import kline_cache
+
+    em_cache = kline_cache.simbolos()
+    encontrados = []
+    for palavra in re.findall(r"[A-Za-z0-9]{2,15}", pergunta):
+        symbol = palavra.upper()
+        if not symbol.endswith("USDT"):
+            symbol += "USDT"
+        if symbol in em_cache and symbol not in encontrados:
+            encontrados.append(symbol)
+    return encontrados[:MAX_SIMBOLOS_CONTEXTO]
+
+
+def contexto_mercado(pergunta, symbol=None):
+    """Texto com RSI/OBV/Supertrend (e correlação com o BTC, se houver) dos pares citados, ou None."""
+    import analytics
+    from indicators.indicators import calcular_indicadores
+    from sentinel import INTERVALO_CRUZADO
+
+    linhas = []
+    for s in ([symbol] if symbol else simbolos_citados(pergunta)):
+        for interval in INTERVALOS_CONTEXTO:
+            candles = _series_em_cache(s, interval)
+            if candles is None:
+                continue
+            r = calcular_indicadores(candles)
+            linhas.append(
+                f"{s} {interval}: preço {r['price']:.6g} | RSI {r['rsi']:.1f} | OBV {r['obv']:.0f} | "
+                f"Supertrend {'alta' if r['supertrend'] > 0 else 'baixa'} | candle {r['timestamp']} UTC"
+            )
+        cruzado = analytics.contexto_simbolo(s, INTERVALO_CRUZADO)
+        if cruzado and s != analytics.BENCHMARK:
+            linhas.append(f"{s} vs BTC ({INTERVALO_CRUZADO}): corr {cruzado['correlacao']:+.2f} | beta {cruzado['beta']:.2f}")
+    return "\n".join(linhas) or None
+
+
+# === 🧠 FASE 4: FUNÇÃO DE RESPOSTA TÁTICA === #
+_cliente = None
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def obter_cliente():
+    """Cliente compartilhado; vive num event loop próprio em thread daemon (sessão reaproveitada entre chamadas)."""
+    global _cliente, _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True, name="charlie-ia").start()
+        if _cliente is None:
+            _cliente = ClienteIA(CacheRespostas(ttl=CACHE_TTL))
+        return _cliente, _loop
+
+
+def encerrar():
+    """Fecha a sessão HTTP do cliente compartilhado (encerramento, testes)."""
+    global _cliente
+    with _loop_lock:
+        cliente, _cliente = _cliente, None
+    if cliente is not None and _loop is not None:
+        asyncio.run_coroutine_threadsafe(cliente.fechar(), _loop).result(TIMEOUT_HTTP)
+
+
+def _montar_contexto(pergunta, symbol):
+    try:
+        return contexto_mercado(pergunta, symbol) or ""
+    except Exception as e:
+        print(f"⚠️ [CharlieCore] Contexto de mercado indisponível: {e}")
+        return ""
+
+
+def _preparar(pergunta, symbol, contexto):
+    """None sem chave da OpenAI; senão o montador do contexto (só roda num miss do cache) ou ""."""
+    if not carregar_chave():
+        return None
+    return functools.partial(_montar_contexto, pergunta, symbol) if contexto else ""
+
+
+def _tratar_erro(e):
+    if isinstance(e, ErroIA):
+        return f"❌ Erro {e.status}: {e.trecho}"
+    print(f"🔥 [CharlieCore] Exceção durante requisição: {e}")
+    return f"❌ Erro na requisição: {e}"
+
+
+async def responder(pergunta, modelo=MODELO_PADRAO, symbol=None, contexto=True):
+    """Versão assíncrona de `responder_mensagem` (ex.: handlers do bot do Discord)."""
+    # A chave é carregada fora do event loop de quem chamou; o contexto, numa thread e só num miss
+    montador = await asyncio.to_thread(_preparar, pergunta, symbol, contexto)
+    if montador is None:
+        return "❌ Chave da OpenAI não encontrada."
+    cliente, loop = obter_cliente()
+    try:
+        resposta = await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(cliente.perguntar(pergunta, modelo, montador, symbol), loop))
+    except Exception as e:
+        return _tratar_erro(e)
+    print("✅ [CharlieCore] Resposta recebida da IA.")
+    return resposta
+
+
+def responder_mensagem(pergunta, modelo=MODELO_PADRAO, symbol=None, contexto=True):
+    """
+    Envia uma mensagem à OpenAI e retorna a resposta textual.
+    Ideal para integração com Discord ou interfaces de comando. Perguntas repetidas dentro
+    de `CACHE_TTL` voltam do cache; com `contexto`, os indicadores em cache dos pares citados
+    (ou de `symbol`) vão junto, sem nova busca de klines — montados só quando a pergunta não
+    está no cache.
+    """
+    montador = _preparar(pergunta, symbol, contexto)
+    if montador is None:
+        return "❌ Chave da OpenAI não encontrada."
+    cliente, loop = obter_cliente()
+    try:
+        resposta = asyncio.run_coroutine_threadsafe(
+            cliente.perguntar(pergunta, modelo, montador, symbol), loop).result(TIMEOUT_HTTP * 2)
     except Exception as e:
-        print(f"🔥 [CharlieCore] Exceção durante requisição: {e}")
-        return f"❌ Erro na requisição: {e}"
+        return _tratar_erro(e)
+    print("✅ [CharlieCore] Resposta recebida da IA.")
+    return resposta
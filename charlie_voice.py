@@ -1,14 +1,23 @@
 # charlie_voice.py 🎙️ CharlieCore Emotional Voice v4.1
+import hashlib
 import os
-import requests
-import uuid
-import time
-from voice_logger import log_fala  # ⬅️ Logger ativado
+import queue
+import threading
+import metricas
+from discord_dispatcher import obter_dispatcher
+from voice_logger import log_fala  # ⬅️ Logger ativado (JSONL diário em segundo plano)
 
 VOZ_PADRAO = "onyx"
 WEBHOOK_AUDIO = os.getenv("DISCORD_AUDIO_WEBHOOK_URL")
+TTS_URL = os.getenv("ELEVENLABS_TTS_URL", "https://api.elevenlabs.io/v1/text-to-speech/{voz}")
 PASTA_AUDIO = "audios"
 
+# 🧵 Fila de fala: `falar` só enfileira; um worker gera e envia em segundo plano
+FILA_MAXIMA = 32
+TIMEOUT_HTTP = 20
+LIMITE_CACHE_BYTES = int(os.getenv("CHARLIE_AUDIO_CACHE_BYTES", str(200 * 1024 * 1024)))
+FALLBACK = "falha.mp3"
+
 EMOCOES = {
     "alegre": {"stability": 0.40, "similarity": 0.85},
     "triste": {"stability": 0.80, "similarity": 0.80},
@@ -18,13 +27,48 @@ EMOCOES = {
     "tensa": {"stability": 0.90, "similarity": 0.65},
 }
 
-def falar(texto, emocao="neutra"):
-    print(f"\n⚙️ Gerando fala com emoção: {emocao}")
-    
+_fila = queue.Queue(maxsize=FILA_MAXIMA)
+_worker = None
+_worker_lock = threading.Lock()
+_sessao = None
+
+
+def _obter_sessao():
+    global _sessao
+    if _sessao is None:
+        import requests  # sob demanda: não pesa no import do sentinel
+
+        _sessao = requests.Session()
+    return _sessao
+
+
+def configurar(tts_url=None, webhook_audio=None, pasta_audio=None):
+    """Permite injetar os endpoints (ex.: servidor stub local nos testes)."""
+    global TTS_URL, WEBHOOK_AUDIO, PASTA_AUDIO
+    if tts_url is not None:
+        TTS_URL = tts_url
+    if webhook_audio is not None:
+        WEBHOOK_AUDIO = webhook_audio
+    if pasta_audio is not None:
+        PASTA_AUDIO = pasta_audio
+
+
+def chave_audio(texto, emocao, voz=VOZ_PADRAO):
+    """Endereço do áudio no cache: hash de (texto, emoção, voz)."""
+    return hashlib.sha256(f"{voz}\x1f{emocao}\x1f{texto}".encode("utf-8")).hexdigest()
+
+
+def gerar_audio(texto, emocao="neutra"):
+    """Retorna o caminho do mp3, gerando via TTS só quando não está no cache."""
     os.makedirs(PASTA_AUDIO, exist_ok=True)
-    id_audio = str(uuid.uuid4())
-    caminho_audio = os.path.join(PASTA_AUDIO, f"{id_audio}.mp3")
-    url_api = f"https://api.elevenlabs.io/v1/text-to-speech/{VOZ_PADRAO}"
+    chave = chave_audio(texto, emocao)
+    caminho_audio = os.path.join(PASTA_AUDIO, f"{chave}.mp3")
+
+    if os.path.exists(caminho_audio):
+        os.utime(caminho_audio)  # marca como usado recentemente (LRU)
+        metricas.contar("tts_cache", resultado="hit", emocao=emocao)
+        print("♻️ Áudio reaproveitado do cache.")
+        return caminho_audio
 
     payload = {
         "text": texto,
@@ -37,34 +81,98 @@ def falar(texto, emocao="neutra"):
         "Content-Type": "application/json"
     }
 
-    try:
-        response = requests.post(url_api, json=payload, headers=headers)
-        response.raise_for_status()
+    metricas.contar("tts_cache", resultado="miss", emocao=emocao)
+    with metricas.cronometro("tts", emocao=emocao):
+        response = _obter_sessao().post(TTS_URL.format(voz=VOZ_PADRAO), json=payload, headers=headers, timeout=TIMEOUT_HTTP)
+    response.raise_for_status()
+
+    temporario = f"{caminho_audio}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(response.content)
+    os.replace(temporario, caminho_audio)
+
+    print("✅ Áudio gerado com sucesso.")
+    limpar_cache()
+    return caminho_audio
 
-        with open(caminho_audio, "wb") as f:
-            f.write(response.content)
 
-        print("✅ Áudio gerado com sucesso.")
+def limpar_cache(limite_bytes=None):
+    """Remove os áudios menos usados até a pasta caber em `limite_bytes`."""
+    limite_bytes = LIMITE_CACHE_BYTES if limite_bytes is None else limite_bytes
+    arquivos = []
+    for entrada in os.scandir(PASTA_AUDIO):
+        if entrada.is_file() and entrada.name.endswith(".mp3") and entrada.name != FALLBACK:
+            info = entrada.stat()
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
 
-        if WEBHOOK_AUDIO:
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except OSError:
+            pass
+    return total
+
+
+def falar_sincrono(texto, emocao="neutra"):
+    print(f"\n⚙️ Gerando fala com emoção: {emocao}")
+
+    try:
+        caminho_audio = gerar_audio(texto, emocao)
+
+        webhook = WEBHOOK_AUDIO or os.getenv("DISCORD_AUDIO_WEBHOOK_URL")
+        if webhook:
             with open(caminho_audio, "rb") as f:
-                file = {"file": (f"{id_audio}.mp3", f)}
-                r = requests.post(WEBHOOK_AUDIO, files=file)
-                if r.status_code == 200:
-                    print("📡 Áudio enviado ao Discord com sucesso.")
-                else:
-                    print(f"⚠️ Falha ao enviar áudio ao Discord. Código: {r.status_code}")
+                conteudo = f.read()
+            obter_dispatcher().enviar_arquivo(webhook, os.path.basename(caminho_audio), conteudo)
+            print("📡 Áudio enfileirado para o Discord.")
         else:
             print("⚠️ WEBHOOK_AUDIO não configurado. Áudio salvo localmente.")
 
         # ✅ Log da fala
-        log_fala(texto, emocao)
+        log_fala(texto, emocao, audio=caminho_audio)
 
     except Exception as e:
         print(f"❌ Erro ao gerar ou enviar áudio: {e}")
         print("🎧 Emitindo fallback sonoro padrão...")
-        fallback = os.path.join(PASTA_AUDIO, "falha.mp3")
+        fallback = os.path.join(PASTA_AUDIO, FALLBACK)
         if os.path.exists(fallback):
             os.system(f"mpg123 {fallback}")
         else:
             print("⚠️ Nenhum fallback disponível.")
+
+
+def _processar_fila():
+    while True:
+        texto, emocao = _fila.get()
+        try:
+            falar_sincrono(texto, emocao)
+        finally:
+            _fila.task_done()
+
+
+def _garantir_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_processar_fila, name="charlie-voz", daemon=True)
+            _worker.start()
+
+
+def falar(texto, emocao="neutra"):
+    """Enfileira a fala e retorna imediatamente. Com a fila cheia, a fala é descartada."""
+    _garantir_worker()
+    try:
+        _fila.put_nowait((texto, emocao))
+        return True
+    except queue.Full:
+        print(f"⚠️ Fila de voz cheia ({FILA_MAXIMA}). Fala descartada: {texto[:40]}")
+        return False
+
+
+def aguardar_falas():
+    """Bloqueia até a fila de voz esvaziar (útil no encerramento e em testes)."""
+    _fila.join()
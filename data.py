@@ -1,31 +1,29 @@
 # data.py — Módulo de Coleta de Dados da CharlieCore
-import os
-from binance.client import Client
-from dotenv import load_dotenv
+from gateway import obter_gateway
+from kline_cache import KlineCache
+from candle_store import CandleStore
 
-# Carregar variáveis de ambiente
-load_dotenv(dotenv_path='config/keys.env')
 
-api_key = os.getenv("BINANCE_API_KEY")
-api_secret = os.getenv("BINANCE_API_SECRET")
+def _buscar_klines(**params):
+    return obter_gateway().get_klines(**params)
 
-client = Client(api_key, api_secret)
+# Candles fechados persistidos em disco (volume ./dados): um restart recarrega daqui
+armazem_candles = CandleStore()
+
+# Cache de candles fechados por (symbol, interval) — só o delta é buscado a cada chamada
+kline_cache = KlineCache(_buscar_klines, armazem=armazem_candles)
 
 def get_current_price(symbol="BTCUSDT"):
     try:
-        ticker = client.get_symbol_ticker(symbol=symbol)
+        ticker = obter_gateway().get_symbol_ticker(symbol=symbol)
         return float(ticker["price"])
     except Exception as e:
         print(f"❌ Erro ao obter preço atual: {e}")
         return None
 
-def get_klines(symbol="BTCUSDT", interval="15m", limit=200):
+def get_klines(symbol="BTCUSDT", interval="15m", limit=200, apos=None):
     try:
-        klines = client.get_klines(
-            symbol=symbol,
-            interval=interval,
-            limit=limit
-        )
+        klines = kline_cache.get(symbol=symbol, interval=interval, limit=limit, apos=apos)
         return klines
     except Exception as e:
         print(f"❌ Erro ao obter candles [{symbol} {interval}]: {e}")
@@ -1,50 +1,35 @@
 # discord_bot.py 📡 CharlieCore Tactical Discord Transmitter
 import os
-import requests
+from discord_dispatcher import obter_dispatcher
 
 WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 
+def _webhook():
+    # Lido também na hora do envio: o ambiente é carregado pelo ponto de entrada, depois dos imports
+    return WEBHOOK_URL or os.getenv("DISCORD_WEBHOOK_URL")
+
 def enviar_relatorio(texto):
     """
     Envia o relatório dividido em partes menores se exceder o limite do Discord (2000 caracteres).
+    As partes são quebradas em fim de linha e entregues em segundo plano pelo dispatcher.
     """
-    if not WEBHOOK_URL:
+    webhook = _webhook()
+    if not webhook:
         print("❌ Webhook do Discord não configurado.")
         return
 
-    partes = [texto[i:i+1900] for i in range(0, len(texto), 1900)]
-
-    for idx, parte in enumerate(partes):
-        payload = {
-            "content": f"```{parte}```"
-        }
-
-        try:
-            response = requests.post(WEBHOOK_URL, json=payload)
-            if response.status_code == 204:
-                print(f"✅ Parte {idx+1}/{len(partes)} enviada com sucesso ao Discord.")
-            else:
-                print(f"⚠️ Falha ao enviar parte {idx+1}. Código: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Erro ao enviar parte {idx+1} para Discord: {e}")
+    partes = obter_dispatcher().enviar_texto(webhook, texto, bloco_codigo=True)
+    print(f"📮 Relatório enfileirado para o Discord em {partes} parte(s).")
 
 def enviar_alerta_entrada(mensagem):
     """
     Envia uma mensagem de entrada tática separada no Discord (LONG/SHORT autorizada).
+    Alertas disparados na mesma janela curta são agrupados numa única mensagem.
     """
-    if not WEBHOOK_URL:
+    webhook = _webhook()
+    if not webhook:
         print("❌ Webhook do Discord não configurado.")
         return
 
-    alerta_payload = {
-        "content": f"🚀 **ENTRADA AUTORIZADA**\n{mensagem}"
-    }
-
-    try:
-        response = requests.post(WEBHOOK_URL, json=alerta_payload)
-        if response.status_code == 204:
-            print("✅ Entrada autorizada enviada ao Discord.")
-        else:
-            print(f"⚠️ Falha ao enviar entrada. Código: {response.status_code}")
-    except Exception as e:
-        print(f"❌ Erro ao enviar entrada para Discord: {e}")
+    if obter_dispatcher().enviar_alerta(webhook, mensagem):
+        print("📮 Entrada autorizada enfileirada para o Discord.")
@@ -0,0 +1,261 @@
+# discord_dispatcher.py 📮 CharlieCore Discord Dispatcher — envio único, em fila e ciente de rate limit
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import metricas
+
+LIMITE_MENSAGEM = 1900     # margem sob o limite de 2000 caracteres do Discord
+JANELA_ALERTAS = 2.0       # segundos para agrupar alertas numa única mensagem
+FILA_MAXIMA = 256
+TENTATIVAS = 5
+TIMEOUT_HTTP = 10
+CABECALHO_ALERTA = "🚀 **ENTRADA AUTORIZADA**"
+
+
+def dividir_em_linhas(texto, limite=LIMITE_MENSAGEM):
+    """Divide o texto em partes de até `limite` caracteres sem quebrar linhas no meio (linhas em branco incluídas)."""
+    partes = []
+    atual = ""
+    iniciada = False  # a parte atual já tem alguma linha (mesmo que em branco)
+    for linha in texto.split("\n"):
+        cortada = False
+        while len(linha) > limite:  # linha sozinha maior que o limite: corte forçado
+            if iniciada:
+                partes.append(atual)
+                atual, iniciada = "", False
+            partes.append(linha[:limite])
+            linha = linha[limite:]
+            cortada = True
+        if cortada and not linha:
+            continue
+        candidato = f"{atual}\n{linha}" if iniciada else linha
+        if len(candidato) > limite:
+            partes.append(atual)
+            atual = linha
+        else:
+            atual = candidato
+        iniciada = True
+    if iniciada:
+        partes.append(atual)
+    return partes
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class DiscordDispatcher:
+    """
+    Único ponto de saída para webhooks do Discord: uma `requests.Session` com pool de conexões,
+    uma fila consumida por um worker em segundo plano, agrupamento de alertas por janela (e por webhook)
+    e respeito aos cabeçalhos de rate limit (429 `retry_after`, `X-RateLimit-*`).
+    """
+
+    def __init__(self, sessao=None, janela_alertas=JANELA_ALERTAS, fila_maxima=FILA_MAXIMA,
+                 tentativas=TENTATIVAS, timeout=TIMEOUT_HTTP):
+        import requests  # sob demanda: só quem envia paga o import
+
+        self.sessao = sessao or requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+
+        self.janela_alertas = janela_alertas
+        self.tentativas = tentativas
+        self.timeout = timeout
+        self._fila = queue.Queue(maxsize=fila_maxima)
+        self._bloqueado_ate = {}
+        self._worker = None
+        self._lock = threading.Lock()
+
+        self.enviados = 0
+        self.descartados = 0
+        self.falhas = 0
+        self.rate_limits = 0
+        self.latencias = deque(maxlen=1000)
+
+    # --- API pública ---
+
+    def enviar_texto(self, url, texto, bloco_codigo=False):
+        """Enfileira um texto longo, dividido em mensagens nas quebras de linha."""
+        # O Discord recusa mensagens vazias: partes só com linhas em branco não são enviadas
+        partes = [p for p in dividir_em_linhas(texto, LIMITE_MENSAGEM - (6 if bloco_codigo else 0)) if p.strip()]
+        for parte in partes:
+            conteudo = f"```{parte}```" if bloco_codigo else parte
+            self._enfileirar(("json", url, {"content": conteudo}, time.monotonic()))
+        return len(partes)
+
+    def enviar_alerta(self, url, mensagem):
+        """Enfileira um alerta; alertas próximos no tempo viram uma única mensagem."""
+        return self._enfileirar(("alerta", url, mensagem, time.monotonic()))
+
+    def enviar_arquivo(self, url, nome, conteudo):
+        """Enfileira o upload de um arquivo (conteúdo em bytes)."""
+        return self._enfileirar(("arquivo", url, (nome, conteudo), time.monotonic()))
+
+    def aguardar(self):
+        """Bloqueia até a fila esvaziar."""
+        self._fila.join()
+
+    def metricas(self):
+        latencias = list(self.latencias)
+        return {
+            'enviados': self.enviados,
+            'descartados': self.descartados,
+            'falhas': self.falhas,
+            'rate_limits': self.rate_limits,
+            'fila': self._fila.qsize(),
+            'latencia_p50_ms': _percentil(latencias, 50) * 1000,
+            'latencia_p95_ms': _percentil(latencias, 95) * 1000,
+        }
+
+    # --- internos ---
+
+    def _enfileirar(self, item):
+        self._garantir_worker()
+        try:
+            self._fila.put_nowait(item)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            metricas.contar("discord_descartada", tipo=item[0])
+            print("⚠️ Fila do Discord cheia. Mensagem descartada.")
+            return False
+
+    def _garantir_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._processar, name="charlie-discord", daemon=True)
+                self._worker.start()
+
+    def _processar(self):
+        while True:
+            item = self._fila.get()
+            concluidos = 1
+            try:
+                if item[0] == "alerta":
+                    extras = self._coletar_janela()
+                    concluidos += len(extras)
+                    for pendente in self._agrupar_alertas([item] + extras):
+                        self._entregar(*pendente)
+                else:
+                    self._entregar(*item)
+            except Exception as e:
+                self.falhas += 1
+                print(f"❌ Erro no dispatcher do Discord: {e}")
+            finally:
+                for _ in range(concluidos):
+                    self._fila.task_done()
+
+    def _coletar_janela(self):
+        """Tudo o que chegar à fila dentro da janela de alertas, na ordem de chegada."""
+        extras = []
+        limite = time.monotonic() + self.janela_alertas
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                extras.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return extras
+
+    @staticmethod
+    def _agrupar_alertas(itens):
+        """
+        Alertas de cada webhook viram uma mensagem (com cabeçalho), entregue na posição do primeiro
+        alerta daquele webhook; os demais itens mantêm a ordem de chegada.
+        """
+        fila, por_url = [], {}
+        for tipo, url, dados, enfileirado in itens:
+            if tipo != "alerta":
+                fila.append((tipo, url, dados, enfileirado))
+            elif url in por_url:
+                por_url[url].append(dados)
+            else:
+                por_url[url] = [dados]
+                fila.append((tipo, url, por_url[url], enfileirado))
+
+        entregas = []
+        for tipo, url, dados, enfileirado in fila:
+            if tipo != "alerta":
+                entregas.append((tipo, url, dados, enfileirado))
+                continue
+            for parte in dividir_em_linhas("\n".join(dados), LIMITE_MENSAGEM - len(CABECALHO_ALERTA) - 1):
+                entregas.append(("json", url, {"content": f"{CABECALHO_ALERTA}\n{parte}"}, enfileirado))
+        return entregas
+
+    def _entregar(self, tipo, url, dados, enfileirado):
+        import requests
+
+        for tentativa in range(self.tentativas):
+            espera = self._bloqueado_ate.get(url, 0) - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+
+            try:
+                with metricas.cronometro("discord_envio", tipo=tipo):
+                    if tipo == "arquivo":
+                        nome, conteudo = dados
+                        resposta = self.sessao.post(url, files={"file": (nome, conteudo)}, timeout=self.timeout)
+                    else:
+                        resposta = self.sessao.post(url, json=dados, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"⚠️ Erro de rede ao enviar ao Discord (tentativa {tentativa + 1}): {e}")
+                time.sleep(min(2 ** tentativa, 30) + random.uniform(0, 0.5))
+                continue
+
+            self._atualizar_limite(url, resposta)
+
+            if resposta.status_code in (200, 204):
+                self.enviados += 1
+                self.latencias.append(time.monotonic() - enfileirado)
+                return True
+            if resposta.status_code == 429:
+                self.rate_limits += 1
+                metricas.contar("discord_rate_limit", tipo=tipo)
+                retry_after = self._retry_after(resposta)
+                print(f"⏳ Rate limit do Discord. Aguardando {retry_after:.2f}s...")
+                self._bloqueado_ate[url] = time.monotonic() + retry_after
+                continue
+            if resposta.status_code >= 500:
+                time.sleep(min(2 ** tentativa, 30) + random.uniform(0, 0.5))
+                continue
+
+            print(f"⚠️ Falha ao enviar ao Discord. Código: {resposta.status_code}")
+            break
+
+        self.falhas += 1
+        return False
+
+    def _atualizar_limite(self, url, resposta):
+        if resposta.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(resposta.headers.get("X-RateLimit-Reset-After", 0) or 0)
+            self._bloqueado_ate[url] = time.monotonic() + reset
+
+    @staticmethod
+    def _retry_after(resposta):
+        try:
+            return float(resposta.json().get("retry_after", 1))
+        except ValueError:
+            return float(resposta.headers.get("Retry-After", 1))
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def obter_dispatcher():
+    """Instância compartilhada, criada no primeiro uso."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = DiscordDispatcher()
+        return _dispatcher
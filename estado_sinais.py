@@ -0,0 +1,179 @@
+# estado_sinais.py 🧭 CharlieCore Estado dos Sinais — só transições saem para Discord e voz
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+ARQUIVO_PADRAO = "dados/estado_sinais.json"
+COOLDOWN_ALERTA = float(os.getenv("SENTINEL_COOLDOWN_ALERTA", "3600"))   # segundos entre alertas do mesmo par
+COOLDOWN_REGIME = float(os.getenv("SENTINEL_COOLDOWN_REGIME", "900"))    # mudança só de regime, por par
+RSI_SOBREVENDIDO = 30
+RSI_SOBRECOMPRADO = 70
+HISTERESE_RSI = 5       # pontos que o RSI precisa recuar para deixar uma zona extrema
+ERRO = "erro"
+
+# Resultado de `avaliar`: `mudou` quando decisão ou regime diferem do último emitido;
+# `alertar` quando o alerta acabou de ligar e o par está fora do cooldown
+Mudanca = namedtuple("Mudanca", ["symbol", "interval", "anterior", "atual", "mudou", "alertar"])
+
+
+def regime(result, anterior=None):
+    """
+    Regime dos indicadores: direção do Supertrend e zona do RSI (ex.: 'alta/neutro').
+    Com o regime `anterior`, uma zona extrema só é deixada depois de o RSI recuar
+    `HISTERESE_RSI` pontos — um RSI oscilando em torno de 70 não troca o regime a cada ciclo.
+    """
+    if result is None:
+        return ERRO
+    tendencia = "alta" if result['supertrend'] > 0 else "baixa"
+    zona_anterior = anterior.partition("/")[2] if anterior else ""
+    rsi = result['rsi']
+    if rsi < RSI_SOBREVENDIDO or (zona_anterior == "sobrevendido" and rsi < RSI_SOBREVENDIDO + HISTERESE_RSI):
+        zona = "sobrevendido"
+    elif rsi > RSI_SOBRECOMPRADO or (zona_anterior == "sobrecomprado" and rsi > RSI_SOBRECOMPRADO - HISTERESE_RSI):
+        zona = "sobrecomprado"
+    else:
+        zona = "neutro"
+    return f"{tendencia}/{zona}"
+
+
+class EstadoSinais:
+    """
+    Último estado emitido por (symbol, interval): decisão, regime, alerta ativo e hora do último
+    alerta. Cada avaliação é comparada com ele; o ciclo só emite o que mudou. Uma mudança só de
+    regime dentro de `cooldown_regime` segundos da última transição do par fica retida. O estado
+    é gravado em JSON com troca atômica e recarregado no próximo start.
+    """
+
+    def __init__(self, caminho=ARQUIVO_PADRAO, cooldown=COOLDOWN_ALERTA, relogio=time.time,
+                 cooldown_regime=COOLDOWN_REGIME):
+        self.caminho = caminho
+        self.cooldown = cooldown
+        self.cooldown_regime = cooldown_regime
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._estados = self._carregar()
+        self._sujo = False
+        self.mudancas = []   # transições do ciclo atual
+
+    @staticmethod
+    def _chave(symbol, interval):
+        return f"{symbol}|{interval}"
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Estado dos sinais ilegível ({e}). Recomeçando do zero.")
+            return {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._estados)
+
+    def ultimo(self, symbol, interval):
+        with self._lock:
+            estado = self._estados.get(self._chave(symbol, interval))
+            return dict(estado) if estado else None
+
+    def regime(self, symbol, interval, result):
+        """`regime(result)` com a histerese aplicada a partir do último regime emitido do par."""
+        anterior = self.ultimo(symbol, interval)
+        return regime(result, anterior['regime'] if anterior else None)
+
+    def podar(self, simbolos):
+        """Esquece os pares fora de `simbolos` (ex.: saíram da rotação do scanner). Retorna quantos."""
+        vigiados = set(simbolos)
+        with self._lock:
+            fora = [chave for chave in self._estados if chave.split("|", 1)[0] not in vigiados]
+            for chave in fora:
+                del self._estados[chave]
+            self._sujo = self._sujo or bool(fora)
+        return len(fora)
+
+    def avaliar(self, symbol, interval, decisao, regime_atual, alerta=False):
+        """Compara com o último estado emitido, atualiza-o e devolve a `Mudanca`."""
+        agora = self._relogio()
+        chave = self._chave(symbol, interval)
+        with self._lock:
+            anterior = self._estados.get(chave)
+            if (anterior is not None and anterior['decisao'] == decisao and anterior['regime'] != regime_atual
+                    and alerta == bool(anterior.get('alerta'))
+                    and agora - anterior.get('desde', agora) < self.cooldown_regime):
+                regime_atual = anterior['regime']  # só o regime mudou, cedo demais: segue o último emitido
+            mudou = anterior is None or anterior['decisao'] != decisao or anterior['regime'] != regime_atual
+            ultimo_alerta = anterior.get('ultimo_alerta') if anterior else None
+            alertar = (
+                alerta
+                and not (anterior and anterior.get('alerta'))
+                and (ultimo_alerta is None or agora - ultimo_alerta >= self.cooldown)
+            )
+            if alerta != bool(anterior and anterior.get('alerta')):
+                mudou = True
+
+            atual = {
+                'decisao': decisao,
+                'regime': regime_atual,
+                'alerta': alerta,
+                'ultimo_alerta': agora if alertar else ultimo_alerta,
+                'desde': agora if mudou else anterior.get('desde', agora),
+            }
+            self._estados[chave] = atual
+            self._sujo = self._sujo or mudou or alertar
+            mudanca = Mudanca(symbol, interval, dict(anterior) if anterior else None, atual, mudou, alertar)
+            if mudou or alertar:
+                self.mudancas.append(mudanca)
+            return mudanca
+
+    def fechar_ciclo(self):
+        """Devolve as transições do ciclo, zera a lista e grava o estado se algo mudou."""
+        with self._lock:
+            mudancas, self.mudancas = self.mudancas, []
+        self.salvar()
+        return mudancas
+
+    def salvar(self):
+        with self._lock:
+            if not self._sujo:
+                return False
+            dados = json.dumps(self._estados, ensure_ascii=False, separators=(",", ":"))
+            self._sujo = False
+        try:
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                f.write(dados)
+            os.replace(temporario, self.caminho)
+            return True
+        except OSError as e:
+            self._sujo = True
+            print(f"⚠️ Falha ao gravar o estado dos sinais: {e}")
+            return False
+
+
+def relatorio_delta(mudancas, total=None):
+    """Relatório compacto: uma linha por transição (ou uma linha dizendo que nada mudou)."""
+    if not mudancas:
+        return f"📡 CharlieCore Sentinel: sem mudanças{f' nos {total} pares' if total else ''}."
+    linhas = [f"📡 CharlieCore Sentinel — {len(mudancas)} mudança(s){f' em {total} pares' if total else ''}"]
+    for m in mudancas:
+        atual = m.atual
+        if m.anterior is None:
+            linha = f"🆕 {m.symbol} [{m.interval}]: {atual['decisao']} | {atual['regime']}"
+        else:
+            partes = []
+            if m.anterior['decisao'] != atual['decisao']:
+                partes.append(f"{m.anterior['decisao']} → {atual['decisao']}")
+            if m.anterior['regime'] != atual['regime']:
+                partes.append(f"regime {m.anterior['regime']} → {atual['regime']}")
+            if not partes:
+                partes.append(atual['decisao'])
+            linha = f"🔁 {m.symbol} [{m.interval}]: {' | '.join(partes)}"
+        if m.alertar:
+            linha += " | 🎯 alerta de entrada"
+        linhas.append(linha)
+    return "\n".join(linhas)
@@ -1,28 +1,81 @@
 # estrategia.py 🧠 CharlieCore Tactical Logic v1.0
 # Protocolo: Confirmar entrada apenas se RSI no 5m iniciar novo ciclo com OBV e Supertrend alinhados.
+from enum import IntEnum
 
-def avaliar_estrategia(rsi, obv, supertrend, intervalo):
+import numpy as np
+
+LIMIAR_LONG = 35
+LIMIAR_SHORT = 65
+
+
+class Sinal(IntEnum):
+    """Código do sinal por candle. O texto para relatório/voz fica em `DESCRICOES`."""
+    SEM_SINAL = 0          # relatório: sem tendência clara
+    TENDENCIA_ALTA = 1
+    TENDENCIA_BAIXA = 2
+    SEM_CONFIRMACAO = 3    # 5m: nenhuma entrada confirmada
+    ENTRADA_LONG = 4
+    ENTRADA_SHORT = 5
+
+
+DESCRICOES = {
+    Sinal.SEM_SINAL: "Sem sinal claro - Observar evolução",
+    Sinal.TENDENCIA_ALTA: "Tendência de Alta - Acompanhar possível entrada",
+    Sinal.TENDENCIA_BAIXA: "Tendência de Baixa - Acompanhar possível entrada",
+    Sinal.SEM_CONFIRMACAO: "⏸ Sem confirmação de entrada - Monitorando 5m",
+    Sinal.ENTRADA_LONG: "✅ entrada LONG autorizada",
+    Sinal.ENTRADA_SHORT: "⚠️ entrada SHORT autorizada",
+}
+
+ENTRADAS = (Sinal.ENTRADA_LONG, Sinal.ENTRADA_SHORT)
+
+
+def avaliar_estrategia_vetorizada(rsi, obv, supertrend, intervalo, limiar_long=LIMIAR_LONG, limiar_short=LIMIAR_SHORT):
     """
-    Avalia a estratégia com base nos indicadores.
+    Avalia a estratégia em todos os candles de uma vez. Recebe arrays (ou escalares) de
+    RSI, OBV e direção do Supertrend e devolve um array int8 de códigos `Sinal`.
     Entrada autorizada somente no 5m com:
-    - RSI iniciando novo ciclo (subindo de <30 para >35) → LONG
-    - RSI iniciando novo ciclo (caindo de >70 para <65) → SHORT
-    - E supertrend alinhado + OBV em volume crescente
+    - RSI acima de `limiar_long`, supertrend de alta e OBV positivo → LONG
+    - RSI abaixo de `limiar_short`, supertrend de baixa e OBV negativo → SHORT
+    Nos demais intervalos, apenas a tendência para o relatório. RSI NaN nunca gera sinal.
     """
+    rsi = np.asarray(rsi, dtype=np.float64)
+    obv = np.asarray(obv, dtype=np.float64)
+    supertrend = np.asarray(supertrend)
 
     # Estratégia geral apenas para relatório (4h, 15m, 1h)
     if intervalo != "5m":
-        if supertrend > 0 and rsi > 50:
-            return "Tendência de Alta - Acompanhar possível entrada"
-        elif supertrend < 0 and rsi < 50:
-            return "Tendência de Baixa - Acompanhar possível entrada"
-        else:
-            return "Sem sinal claro - Observar evolução"
-    
-    # Lógica de ENTRADA no 5m:
-    if rsi > 35 and supertrend > 0 and obv > 0:
-        return "✅ entrada LONG autorizada"
-    elif rsi < 65 and supertrend < 0 and obv < 0:
-        return "⚠️ entrada SHORT autorizada"
-    
-    return "⏸ Sem confirmação de entrada - Monitorando 5m"
+        condicoes = [(supertrend > 0) & (rsi > 50), (supertrend < 0) & (rsi < 50)]
+        escolhas = [Sinal.TENDENCIA_ALTA, Sinal.TENDENCIA_BAIXA]
+        padrao = Sinal.SEM_SINAL
+    else:
+        condicoes = [(rsi > limiar_long) & (supertrend > 0) & (obv > 0),
+                     (rsi < limiar_short) & (supertrend < 0) & (obv < 0)]
+        escolhas = [Sinal.ENTRADA_LONG, Sinal.ENTRADA_SHORT]
+        padrao = Sinal.SEM_CONFIRMACAO
+
+    return np.select(condicoes, escolhas, default=padrao).astype(np.int8)
+
+
+def direcao_entrada(codigos):
+    """+1 para ENTRADA_LONG, -1 para ENTRADA_SHORT e 0 nos demais códigos."""
+    codigos = np.asarray(codigos)
+    return ((codigos == Sinal.ENTRADA_LONG).astype(np.int8) - (codigos == Sinal.ENTRADA_SHORT).astype(np.int8))
+
+
+def classificar_estrategia(rsi, obv, supertrend, intervalo):
+    """Versão escalar: o `Sinal` de um único candle."""
+    return Sinal(int(avaliar_estrategia_vetorizada(rsi, obv, supertrend, intervalo)))
+
+
+def renderizar_sinal(sinal):
+    """Texto do relatório para um código de sinal (etapa de apresentação)."""
+    return DESCRICOES[Sinal(int(sinal))]
+
+
+def avaliar_estrategia(rsi, obv, supertrend, intervalo):
+    """
+    Avalia a estratégia com base nos indicadores de um candle e devolve o texto do relatório.
+    Mantida para quem consome o texto; a decisão vem de `avaliar_estrategia_vetorizada`.
+    """
+    return renderizar_sinal(classificar_estrategia(rsi, obv, supertrend, intervalo))
@@ -0,0 +1,375 @@
+# execucao.py 🎯 CharlieCore Execution Engine — envio assíncrono, IDs idempotentes e acompanhamento de fills
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_DOWN
+
+import metricas
+from gateway import BinanceErro, obter_gateway
+
+TTL_EXCHANGE_INFO = 3600        # segundos; filtros de símbolo mudam raramente
+TENTATIVAS_RECONCILIACAO = 6
+INTERVALO_RECONCILIACAO = 0.5
+MAX_WORKERS = 4
+DIARIO_PADRAO = "logs/ordens.jsonl"
+PREFIXO_CLIENT_ID = "cc"
+CODIGO_ORDEM_INEXISTENTE = -2013
+LIMITE_ORDENS_MEMORIA = 5000    # client IDs lembrados (Futures em memória e ordens do diário)
+AMOSTRAS_LATENCIA = 2048        # janela das latências de ack usadas nos percentis
+
+# Estados finais registrados no diário
+PREENCHIDA = "FILLED"
+PARCIAL = "PARTIALLY_FILLED"
+REJEITADA = "REJEITADA"
+NAO_ENVIADA = "NAO_ENVIADA"
+DESCONHECIDA = "DESCONHECIDA"
+ESTADOS_ABERTOS = {"NEW", PARCIAL}
+
+FiltrosSimbolo = namedtuple("FiltrosSimbolo", ["passo_lote", "qtd_minima", "qtd_maxima", "notional_minimo"])
+
+
+def gerar_client_id(symbol, lado, id_sinal):
+    """
+    `newClientOrderId` determinístico por sinal: reenviar o mesmo sinal gera o mesmo ID.
+    A corretora só recusa o ID repetido enquanto a ordem original está aberta — uma ordem a
+    mercado já preenchida não bloqueia a duplicata, por isso o motor consulta o diário e a
+    corretora antes de enviar. Máximo de 36 caracteres ([A-Za-z0-9_-]).
+    """
+    resumo = hashlib.sha1(f"{symbol}|{lado}|{id_sinal}".encode()).hexdigest()[:30]
+    return f"{PREFIXO_CLIENT_ID}-{resumo}"
+
+
+def extrair_filtros(info_simbolo):
+    """Filtros de quantidade/notional de um símbolo do exchangeInfo (ordens a mercado)."""
+    filtros = {f['filterType']: f for f in info_simbolo.get('filters', [])}
+    lote = filtros.get('MARKET_LOT_SIZE') or filtros.get('LOT_SIZE') or {}
+    if lote and Decimal(lote.get('stepSize', '0')) == 0:
+        lote = filtros.get('LOT_SIZE', lote)  # MARKET_LOT_SIZE com passo 0 herda do LOT_SIZE
+    notional = filtros.get('MIN_NOTIONAL') or filtros.get('NOTIONAL') or {}
+    return FiltrosSimbolo(
+        passo_lote=Decimal(lote.get('stepSize', '0')),
+        qtd_minima=Decimal(lote.get('minQty', '0')),
+        qtd_maxima=Decimal(lote.get('maxQty', '0')),
+        notional_minimo=Decimal(notional.get('notional') or notional.get('minNotional') or '0'),
+    )
+
+
+def dimensionar(filtros, preco, quantidade=None, valor=None):
+    """
+    Quantidade válida para o símbolo: `quantidade` (ou `valor` / `preco`) arredondada para baixo
+    no passo do lote. Levanta ValueError abaixo do mínimo de quantidade ou de notional.
+    """
+    preco = Decimal(str(preco))
+    bruta = Decimal(str(quantidade)) if quantidade is not None else Decimal(str(valor)) / preco
+    if filtros.passo_lote > 0:
+        bruta = (bruta / filtros.passo_lote).to_integral_value(rounding=ROUND_DOWN) * filtros.passo_lote
+    if filtros.qtd_maxima > 0:
+        bruta = min(bruta, filtros.qtd_maxima)
+    if bruta <= 0 or bruta < filtros.qtd_minima:
+        raise ValueError(f"Quantidade {bruta} abaixo do mínimo {filtros.qtd_minima}.")
+    if bruta * preco < filtros.notional_minimo:
+        raise ValueError(f"Notional {bruta * preco:.4f} abaixo do mínimo {filtros.notional_minimo}.")
+    return bruta.normalize()
+
+
+class CacheExchangeInfo:
+    """`futures_exchange_info` buscado uma vez e renovado só depois de `ttl` segundos."""
+
+    def __init__(self, buscar, ttl=TTL_EXCHANGE_INFO, relogio=time.monotonic):
+        self._buscar = buscar
+        self.ttl = ttl
+        self._relogio = relogio
+        self._filtros = {}
+        self._validade = 0.0
+        self._lock = threading.Lock()
+        self.buscas = 0
+
+    def filtros(self, symbol):
+        with self._lock:
+            if self._relogio() >= self._validade:
+                self._renovar()
+            if symbol not in self._filtros:
+                raise ValueError(f"Símbolo {symbol} não encontrado no exchangeInfo.")
+            return self._filtros[symbol]
+
+    def invalidar(self):
+        with self._lock:
+            self._validade = 0.0
+
+    def _renovar(self):
+        info = self._buscar()
+        self._filtros = {s['symbol']: extrair_filtros(s) for s in info.get('symbols', [])}
+        self._validade = self._relogio() + self.ttl
+        self.buscas += 1
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class MotorExecucao:
+    """
+    Envio de ordens a mercado em segundo plano (pool de threads), cada uma com um
+    `newClientOrderId` idempotente. Se o envio fica incerto (timeout, erro de rede, 5xx),
+    a ordem é reconciliada consultando `futures_get_order` pelo clientOrderId; uma ordem
+    aceita mas ainda não preenchida também é acompanhada por polling até o fill.
+    Cada ordem mede a latência sinal → ack e termina registrada no diário JSONL.
+
+    Antes de enviar, o clientOrderId é procurado no diário (que sobrevive a restarts) e na
+    corretora; se a ordem já existe, ela é reaproveitada em vez de abrir uma segunda posição.
+    """
+
+    def __init__(self, gateway=None, workers=MAX_WORKERS, diario=DIARIO_PADRAO,
+                 tentativas_reconciliacao=TENTATIVAS_RECONCILIACAO, intervalo_reconciliacao=INTERVALO_RECONCILIACAO,
+                 ttl_exchange_info=TTL_EXCHANGE_INFO, relogio=time.time):
+        self._gateway = gateway
+        self.diario = diario
+        self.tentativas_reconciliacao = tentativas_reconciliacao
+        self.intervalo_reconciliacao = intervalo_reconciliacao
+        self._relogio = relogio
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="execucao")
+        self._ordens = OrderedDict()
+        self._lock = threading.Lock()
+        self._lock_diario = threading.Lock()
+        self._enviadas = self._carregar_diario()
+        self.exchange_info = CacheExchangeInfo(lambda: self.gateway.futures_exchange_info(), ttl=ttl_exchange_info)
+
+        self.estados = {}
+        self.reaproveitadas = 0
+        self.latencias_ack = deque(maxlen=AMOSTRAS_LATENCIA)
+
+    @property
+    def gateway(self):
+        return self._gateway or obter_gateway()
+
+    def submeter(self, symbol, lado, quantidade=None, valor=None, preco=None, id_sinal=None, momento_sinal=None):
+        """
+        Enfileira uma ordem a mercado e devolve um Future com o registro final da ordem.
+        `quantidade` (base) ou `valor` (USDT) são ajustados aos filtros do símbolo; `preco` é a
+        referência para o notional (padrão: preço atual). `id_sinal` é obrigatório e identifica
+        o sinal: repeti-lo não gera uma segunda ordem (o mesmo Future, ou a ordem já existente).
+        """
+        if (quantidade is None) == (valor is None):
+            raise ValueError("Informe exatamente um entre `quantidade` e `valor`.")
+        if id_sinal is None:
+            raise ValueError("Informe `id_sinal`: sem ele não há como deduplicar a ordem.")
+        momento_sinal = self._relogio() if momento_sinal is None else momento_sinal
+        client_id = gerar_client_id(symbol, lado, id_sinal)
+
+        with self._lock:
+            if client_id in self._ordens:
+                return self._ordens[client_id]
+            futuro = self._pool.submit(self._executar, symbol, lado, quantidade, valor, preco, client_id, momento_sinal)
+            self._ordens[client_id] = futuro
+            self._podar_ordens()
+            return futuro
+
+    def aguardar(self, timeout=None):
+        with self._lock:
+            futuros = list(self._ordens.values())
+        for futuro in futuros:
+            futuro.exception(timeout=timeout)
+
+    def encerrar(self):
+        self._pool.shutdown(wait=True)
+
+    def metricas(self):
+        with self._lock:
+            latencias = list(self.latencias_ack)
+            return {
+                'ordens': len(self._ordens),
+                'estados': dict(self.estados),
+                'reaproveitadas': self.reaproveitadas,
+                'exchange_info_buscas': self.exchange_info.buscas,
+                'latencia_ack_p50_ms': round(_percentil(latencias, 50) * 1000, 1),
+                'latencia_ack_p95_ms': round(_percentil(latencias, 95) * 1000, 1),
+            }
+
+    # --- internos ---
+
+    def _podar_ordens(self):
+        """Esquece os Futures concluídos mais antigos além do limite (o diário e a corretora seguem deduplicando)."""
+        excesso = len(self._ordens) - LIMITE_ORDENS_MEMORIA
+        for client_id in list(self._ordens):
+            if excesso <= 0:
+                break
+            if self._ordens[client_id].done():
+                del self._ordens[client_id]
+                excesso -= 1
+
+    def _carregar_diario(self):
+        """clientOrderId → registro das ordens que chegaram à corretora, lidos do diário (mais recentes)."""
+        enviadas = OrderedDict()
+        if not self.diario:
+            return enviadas
+        try:
+            with open(self.diario, encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        continue  # linha truncada por um crash no meio da gravação
+                    if registro.get('ordem'):
+                        enviadas[registro['clientOrderId']] = registro
+                        enviadas.move_to_end(registro['clientOrderId'])
+                        if len(enviadas) > LIMITE_ORDENS_MEMORIA:
+                            enviadas.popitem(last=False)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Diário de ordens ilegível ({e}). Deduplicando só pela corretora.")
+        return enviadas
+
+    def _ordem_existente(self, symbol, client_id):
+        """A ordem deste clientOrderId, se já foi enviada antes: primeiro no diário, depois na corretora."""
+        with self._lock:
+            anterior = self._enviadas.get(client_id)
+        if anterior is not None:
+            return anterior['ordem']
+        return self._consultar(symbol, client_id)
+
+    def _executar(self, symbol, lado, quantidade, valor, preco, client_id, momento_sinal):
+        registro = {'symbol': symbol, 'lado': lado, 'clientOrderId': client_id, 'momento_sinal': momento_sinal}
+        try:
+            existente = self._ordem_existente(symbol, client_id)
+        except Exception as e:
+            # Sem saber se a ordem existe, reenviar poderia abrir uma segunda posição
+            return self._finalizar(registro, NAO_ENVIADA, erro=f"falha ao verificar ordem existente: {e}")
+        if existente is not None:
+            print(f"⚠️ Ordem {client_id} já enviada antes. Reaproveitando.")
+            registro['reaproveitada'] = True
+            with self._lock:
+                self.reaproveitadas += 1
+            if existente.get('status') in ESTADOS_ABERTOS:
+                existente = self._acompanhar(symbol, client_id, existente)
+            return self._finalizar(registro, existente.get('status', DESCONHECIDA), ordem=existente)
+
+        try:
+            filtros = self.exchange_info.filtros(symbol)
+            if preco is None:
+                preco = float(self.gateway.get_symbol_ticker(symbol=symbol)['price'])
+            registro['quantidade'] = str(dimensionar(filtros, preco, quantidade=quantidade, valor=valor))
+        except (ValueError, KeyError, BinanceErro) as e:
+            return self._finalizar(registro, NAO_ENVIADA, erro=str(e))
+
+        envio = self._relogio()
+        registro['envio'] = envio
+        try:
+            with metricas.cronometro("ordem_envio", symbol=symbol):
+                ordem = self.gateway.futures_create_order(
+                    symbol=symbol, side=lado, type='MARKET', quantity=registro['quantidade'],
+                    newClientOrderId=client_id, newOrderRespType='RESULT',
+                )
+        except BinanceErro as e:
+            if e.status < 500:
+                return self._finalizar(registro, REJEITADA, erro=str(e))
+            print(f"⚠️ Envio incerto de {client_id} ({e.status}). Reconciliando...")
+            ordem = self._reconciliar(symbol, client_id)
+        except Exception as e:
+            print(f"⚠️ Envio incerto de {client_id} ({e}). Reconciliando...")
+            ordem = self._reconciliar(symbol, client_id)
+
+        if ordem is None:
+            return self._finalizar(registro, DESCONHECIDA, erro="ordem não confirmada após reconciliação")
+
+        ack = self._relogio()
+        registro['ack'] = ack
+        registro['latencia_ack'] = ack - momento_sinal
+        registro['latencia_envio'] = ack - envio
+        with self._lock:
+            self.latencias_ack.append(registro['latencia_ack'])
+        metricas.observar("ordem_ack", registro['latencia_ack'], symbol=symbol)
+
+        if ordem.get('status') in ESTADOS_ABERTOS:
+            ordem = self._acompanhar(symbol, client_id, ordem)
+        return self._finalizar(registro, ordem.get('status', DESCONHECIDA), ordem=ordem)
+
+    def _consultar(self, symbol, client_id):
+        try:
+            return self.gateway.futures_get_order(symbol=symbol, origClientOrderId=client_id)
+        except BinanceErro as e:
+            if e.codigo == CODIGO_ORDEM_INEXISTENTE:
+                return None
+            raise
+
+    def _reconciliar(self, symbol, client_id):
+        """Procura a ordem pelo clientOrderId; None se a corretora não a conhece."""
+        for _ in range(self.tentativas_reconciliacao):
+            try:
+                ordem = self._consultar(symbol, client_id)
+                if ordem is not None:
+                    return ordem
+            except Exception as e:
+                print(f"⚠️ Falha ao consultar {client_id}: {e}")
+            time.sleep(self.intervalo_reconciliacao)
+        return None
+
+    def _acompanhar(self, symbol, client_id, ordem):
+        """Polling até a ordem sair de NEW/PARTIALLY_FILLED (ou acabarem as tentativas)."""
+        for _ in range(self.tentativas_reconciliacao):
+            time.sleep(self.intervalo_reconciliacao)
+            try:
+                atual = self._consultar(symbol, client_id)
+            except Exception as e:
+                print(f"⚠️ Falha ao acompanhar {client_id}: {e}")
+                continue
+            if atual is not None:
+                ordem = atual
+                if ordem.get('status') not in ESTADOS_ABERTOS:
+                    break
+        return ordem
+
+    def _finalizar(self, registro, estado, ordem=None, erro=None):
+        registro['estado'] = estado
+        registro.setdefault('reaproveitada', False)
+        registro.setdefault('latencia_ack', None)  # sem ack: não enviada, ou ordem reaproveitada
+        if ordem is not None:
+            registro['orderId'] = ordem.get('orderId')
+            registro['executado'] = ordem.get('executedQty')
+            registro['preco_medio'] = ordem.get('avgPrice')
+            registro['ordem'] = ordem
+            with self._lock:
+                self._enviadas[registro['clientOrderId']] = registro
+                self._enviadas.move_to_end(registro['clientOrderId'])
+                if len(self._enviadas) > LIMITE_ORDENS_MEMORIA:
+                    self._enviadas.popitem(last=False)
+        if erro is not None:
+            registro['erro'] = erro
+            print(f"❌ Ordem {registro['clientOrderId']} {estado}: {erro}")
+
+        with self._lock:
+            self.estados[estado] = self.estados.get(estado, 0) + 1
+        metricas.contar("ordens", symbol=registro['symbol'], estado=estado)
+        self._registrar(registro)
+        return registro
+
+    def _registrar(self, registro):
+        if not self.diario:
+            return
+        try:
+            with self._lock_diario:
+                os.makedirs(os.path.dirname(self.diario) or ".", exist_ok=True)
+                with open(self.diario, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"⚠️ Falha ao registrar ordem no diário: {e}")
+
+
+_motor = None
+_motor_lock = threading.Lock()
+
+
+def obter_motor():
+    """Motor de execução compartilhado do processo, criado no primeiro uso."""
+    global _motor
+    with _motor_lock:
+        if _motor is None:
+            _motor = MotorExecucao()
+        return _motor
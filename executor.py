@@ -1,30 +1,30 @@
 # executor.py 🎯 CharlieCore Order Executor
-import os
-from binance.client import Client
-from dotenv import load_dotenv
+from execucao import obter_motor, PREENCHIDA, PARCIAL
 
-load_dotenv()
-
-API_KEY = os.getenv("BINANCE_API_KEY")
-API_SECRET = os.getenv("BINANCE_API_SECRET")
-
-client = Client(API_KEY, API_SECRET)
-client.FUTURES_URL = 'https://fapi.binance.com/fapi'  # Testnet: 'https://testnet.binancefuture.com'
-
-def enviar_ordem(symbol, lado, quantidade=0.01):
+def enviar_ordem(symbol, lado, quantidade=0.01, valor=None, *, id_sinal, timeout=30):
     """
-    Envia ordem de mercado (LONG ou SHORT)
+    Envia ordem de mercado (LONG ou SHORT) pelo motor de execução e aguarda o resultado.
     lado: "BUY" para LONG, "SELL" para SHORT
+    Com `valor` (USDT), a quantidade é calculada e ajustada aos filtros do símbolo.
+    `id_sinal` é obrigatório: o mesmo sinal nunca abre duas ordens, mesmo após um restart.
     """
+    motor = obter_motor()
     try:
-        ordem = client.futures_create_order(
-            symbol=symbol,
-            side=lado,
-            type='MARKET',
-            quantity=quantidade
-        )
-        print(f"🚀 Ordem enviada: {ordem['side']} {ordem['origQty']} {ordem['symbol']}")
-        return ordem
+        if valor is not None:
+            futuro = motor.submeter(symbol, lado, valor=valor, id_sinal=id_sinal)
+        else:
+            futuro = motor.submeter(symbol, lado, quantidade=quantidade, id_sinal=id_sinal)
+        registro = futuro.result(timeout=timeout)
     except Exception as e:
         print(f"❌ Erro ao enviar ordem: {e}")
         return None
+
+    if registro['estado'] not in (PREENCHIDA, PARCIAL, "NEW"):
+        return None
+    ordem = registro['ordem']
+    if registro['reaproveitada']:
+        print(f"♻️ Ordem já existente: {ordem['side']} {ordem['origQty']} {ordem['symbol']} ({ordem['status']})")
+    else:
+        print(f"🚀 Ordem enviada: {ordem['side']} {ordem['origQty']} {ordem['symbol']} "
+              f"(ack em {registro['latencia_ack'] * 1000:.0f} ms)")
+    return ordem
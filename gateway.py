@@ -0,0 +1,295 @@
+# gateway.py 🛰️ CharlieCore Binance Gateway — cliente único com pool de conexões e governador de peso
+import hashlib
+import hmac
+import os
+import random
+import threading
+import time
+from urllib.parse import urlencode
+
+from rate_limiter import TokenBucket
+
+BASE_SPOT = "https://api.binance.com"
+BASE_FUTURES = "https://fapi.binance.com"  # Testnet: 'https://testnet.binancefuture.com'
+
+PESO_MAXIMO_SPOT = 1200     # por minuto, por IP
+PESO_MAXIMO_FUTURES = 2400
+TENTATIVAS = 5
+TIMEOUT_HTTP = 10
+BACKOFF_MAXIMO = 30
+STATUS_REPETIR = {418, 429}
+
+
+class BinanceErro(Exception):
+    """Erro retornado pela API (4xx que não vale a pena repetir)."""
+
+    def __init__(self, status, corpo):
+        self.status = status
+        self.corpo = corpo
+        codigo = corpo.get("code") if isinstance(corpo, dict) else None
+        self.codigo = codigo
+        super().__init__(f"Binance {status} (code={codigo}): {corpo}")
+
+
+PESO_KLINES_SPOT = 2                                   # /api/v3/klines: fixo, qualquer `limit`
+FAIXAS_KLINES_FUTURES = ((100, 1), (500, 2), (1001, 5))  # /fapi/v1/klines: (`limit` abaixo de, peso)
+PESO_KLINES_FUTURES_MAXIMO = 10
+
+
+def peso_klines(limit, mercado="spot"):
+    """Peso do endpoint de klines: fixo no spot, por faixa de `limit` nos futuros USDT-M."""
+    if mercado == "spot":
+        return PESO_KLINES_SPOT
+    for teto, peso in FAIXAS_KLINES_FUTURES:
+        if limit < teto:
+            return peso
+    return PESO_KLINES_FUTURES_MAXIMO
+
+
+def _espera_backoff(tentativa, resposta=None):
+    if resposta is not None and resposta.headers.get("Retry-After"):
+        return float(resposta.headers["Retry-After"])
+    return min(2 ** tentativa * 0.5, BACKOFF_MAXIMO) * (1 + random.uniform(0, 0.5))
+
+
+def _peso_usado(headers):
+    for chave, valor in headers.items():
+        chave = chave.lower()
+        if chave.startswith("x-mbx-used-weight-1m") or chave == "x-mbx-used-weight":
+            return float(valor)
+    return None
+
+
+class BinanceGateway:
+    """
+    Gateway compartilhado de dados de mercado (spot) e trading (USDT-M futures).
+    Uma `requests.Session` com pool, governador de peso por token bucket sincronizado com
+    `X-MBX-USED-WEIGHT-1M`, e repetição com jitter em 418/429/5xx. As URLs base são
+    injetáveis (ex.: servidor falso local nos testes).
+    """
+
+    def __init__(self, api_key=None, api_secret=None, base_url=BASE_SPOT, futures_url=BASE_FUTURES,
+                 sessao=None, tentativas=TENTATIVAS, timeout=TIMEOUT_HTTP, pool=16):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url.rstrip("/")
+        self.futures_url = futures_url.rstrip("/")
+        self.tentativas = tentativas
+        self.timeout = timeout
+
+        import requests  # sob demanda: não pesa no import do sentinel
+
+        self.sessao = sessao or requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        if api_key:
+            self.sessao.headers["X-MBX-APIKEY"] = api_key
+
+        self.governador_spot = TokenBucket(PESO_MAXIMO_SPOT, PESO_MAXIMO_SPOT / 60)
+        self.governador_futures = TokenBucket(PESO_MAXIMO_FUTURES, PESO_MAXIMO_FUTURES / 60)
+        self.requisicoes = 0
+        self.repeticoes = 0
+
+    # --- núcleo ---
+
+    def _exigir_segredo(self):
+        if not self.api_secret:
+            raise ValueError("BINANCE_API_SECRET ausente: endpoints assinados (ordens) exigem a chave secreta.")
+
+    def _assinar(self, params):
+        self._exigir_segredo()
+        params = dict(params, timestamp=int(time.time() * 1000))
+        consulta = urlencode(params)
+        assinatura = hmac.new(self.api_secret.encode(), consulta.encode(), hashlib.sha256).hexdigest()
+        return dict(params, signature=assinatura)
+
+    def _request(self, metodo, url, params=None, peso=1, governador=None, assinado=False, repetir_incerto=True):
+        """
+        `repetir_incerto=False` (envio de ordens): falha de rede ou 5xx não é repetida aqui,
+        pois a ordem pode ter sido aceita — quem chamou reconcilia pelo clientOrderId.
+        """
+        import requests
+
+        if assinado:
+            self._exigir_segredo()  # antes de gastar peso do governador
+        governador = governador or self.governador_spot
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+
+        for tentativa in range(self.tentativas):
+            governador.consumir(peso)
+            enviados = self._assinar(params) if assinado else params
+            try:
+                resposta = self.sessao.request(metodo, url, params=enviados, timeout=self.timeout)
+            except requests.RequestException:
+                if tentativa == self.tentativas - 1 or not repetir_incerto:
+                    raise
+                self.repeticoes += 1
+                time.sleep(_espera_backoff(tentativa))
+                continue
+
+            self.requisicoes += 1
+            usado = _peso_usado(resposta.headers)
+            if usado is not None:
+                governador.sincronizar(usado)
+
+            if resposta.status_code in STATUS_REPETIR or resposta.status_code >= 500:
+                if tentativa == self.tentativas - 1 or (resposta.status_code >= 500 and not repetir_incerto):
+                    break
+                self.repeticoes += 1
+                time.sleep(_espera_backoff(tentativa, resposta))
+                continue
+            if resposta.status_code >= 400:
+                raise BinanceErro(resposta.status_code, _json_ou_texto(resposta))
+            return resposta.json()
+
+        raise BinanceErro(resposta.status_code, _json_ou_texto(resposta))
+
+    # --- dados de mercado (spot) — mesmas assinaturas do python-binance ---
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None):
+        params = {'symbol': symbol, 'interval': interval, 'limit': limit, 'startTime': startTime, 'endTime': endTime}
+        return self._request("GET", f"{self.base_url}/api/v3/klines", params, peso=peso_klines(limit, "spot"))
+
+    def get_symbol_ticker(self, symbol):
+        return self._request("GET", f"{self.base_url}/api/v3/ticker/price", {'symbol': symbol}, peso=2)
+
+    def get_ticker_24h(self, symbol=None):
+        return self._request("GET", f"{self.base_url}/api/v3/ticker/24hr", {'symbol': symbol},
+                             peso=2 if symbol else 80)
+
+    def get_exchange_info(self, **params):
+        return self._request("GET", f"{self.base_url}/api/v3/exchangeInfo", params, peso=20)
+
+    # --- USDT-M futures ---
+
+    def futures_exchange_info(self):
+        return self._request("GET", f"{self.futures_url}/fapi/v1/exchangeInfo", peso=1,
+                             governador=self.governador_futures)
+
+    def futures_ticker_24h(self, symbol=None):
+        return self._request("GET", f"{self.futures_url}/fapi/v1/ticker/24hr", {'symbol': symbol},
+                             peso=1 if symbol else 40, governador=self.governador_futures)
+
+    def futures_create_order(self, **params):
+        return self._request("POST", f"{self.futures_url}/fapi/v1/order", params, peso=1,
+                             governador=self.governador_futures, assinado=True, repetir_incerto=False)
+
+    def futures_get_order(self, **params):
+        return self._request("GET", f"{self.futures_url}/fapi/v1/order", params, peso=1,
+                             governador=self.governador_futures, assinado=True)
+
+
+class AsyncBinanceGateway(BinanceGateway):
+    """
+    Variante assíncrona (aiohttp) com o mesmo governador e a mesma política de repetição.
+    Os métodos públicos herdados passam a devolver corrotinas.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sessao_async = None
+
+    async def _obter_sessao(self):
+        import aiohttp
+
+        if self._sessao_async is None or self._sessao_async.closed:
+            headers = {"X-MBX-APIKEY": self.api_key} if self.api_key else None
+            self._sessao_async = aiohttp.ClientSession(
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=16),
+            )
+        return self._sessao_async
+
+    async def fechar(self):
+        if self._sessao_async is not None:
+            await self._sessao_async.close()
+
+    async def _request(self, metodo, url, params=None, peso=1, governador=None, assinado=False, repetir_incerto=True):
+        import asyncio
+        import aiohttp
+
+        if assinado:
+            self._exigir_segredo()
+        governador = governador or self.governador_spot
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        sessao = await self._obter_sessao()
+
+        for tentativa in range(self.tentativas):
+            while True:
+                espera = governador.reservar(peso)
+                if not espera:
+                    break
+                await asyncio.sleep(espera)
+
+            enviados = self._assinar(params) if assinado else params
+            try:
+                async with sessao.request(metodo, url, params=enviados) as resposta:
+                    self.requisicoes += 1
+                    usado = _peso_usado(resposta.headers)
+                    if usado is not None:
+                        governador.sincronizar(usado)
+                    status = resposta.status
+                    retry_after = resposta.headers.get("Retry-After")
+                    corpo = await resposta.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if tentativa == self.tentativas - 1 or not repetir_incerto:
+                    raise
+                self.repeticoes += 1
+                await asyncio.sleep(_espera_backoff(tentativa))
+                continue
+
+            if status in STATUS_REPETIR or status >= 500:
+                if tentativa == self.tentativas - 1 or (status >= 500 and not repetir_incerto):
+                    break
+                self.repeticoes += 1
+                await asyncio.sleep(float(retry_after) if retry_after else _espera_backoff(tentativa))
+                continue
+            if status >= 400:
+                raise BinanceErro(status, corpo)
+            return corpo
+
+        raise BinanceErro(status, corpo)
+
+
+def _json_ou_texto(resposta):
+    try:
+        return resposta.json()
+    except ValueError:
+        return resposta.text
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def criar_gateway(**kwargs):
+    """Constrói o gateway a partir do ambiente (BINANCE_API_KEY/SECRET e URLs opcionais)."""
+    kwargs.setdefault("api_key", os.getenv("BINANCE_API_KEY"))
+    kwargs.setdefault("api_secret", os.getenv("BINANCE_API_SECRET"))
+    kwargs.setdefault("base_url", os.getenv("BINANCE_BASE_URL", BASE_SPOT))
+    kwargs.setdefault("futures_url", os.getenv("BINANCE_FUTURES_URL", BASE_FUTURES))
+    return BinanceGateway(**kwargs)
+
+
+def obter_gateway():
+    """
+    Gateway compartilhado do processo. Os pontos de entrada o constroem explicitamente
+    com `ambiente.iniciar()`; sem isso, é construído no primeiro uso.
+    """
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            from ambiente import carregar_ambiente
+
+            carregar_ambiente()
+            _gateway = criar_gateway()
+        return _gateway
+
+
+def definir_gateway(gateway):
+    """Substitui o gateway compartilhado (ex.: apontando para um servidor falso)."""
+    global _gateway
+    with _gateway_lock:
+        _gateway = gateway
@@ -1,48 +1,190 @@
-import pandas as pd
+import threading
+from datetime import datetime, timezone
+
 import numpy as np
-from .supertrend import Supertrend
-from ta.momentum import RSIIndicator
-from ta.volume import OnBalanceVolumeIndicator
-from data import get_klines, get_current_price
 
+from .supertrend import supertrend_arrays
+from .momentum import rsi_wilder, rsi_inicio_ciclo, obv as obv_array
+import metricas
+from candles import Candles, CANDLE_DTYPE
+from data import get_klines, get_current_price, kline_cache
+from resample import Reamostrador, INTERVALO_MS, razao
 
-def analyze_indicators(symbol, interval):
-    klines = get_klines(symbol=symbol, interval=interval, limit=200)
-    if not klines or len(klines) < 50:
-        raise ValueError("Não há candles suficientes para análise.")
-
-    df = pd.DataFrame(klines, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'number_of_trades',
-        'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'
-    ])
-    df['close'] = pd.to_numeric(df['close'])
-    df['high'] = pd.to_numeric(df['high'])
-    df['low'] = pd.to_numeric(df['low'])
-    df['volume'] = pd.to_numeric(df['volume'])
-
-    rsi = RSIIndicator(close=df['close'], window=14).rsi().iloc[-1]
-    obv = OnBalanceVolumeIndicator(close=df['close'], volume=df['volume']).on_balance_volume().iloc[-1]
-
-    supertrend = Supertrend(
-        high=df['high'],
-        low=df['low'],
-        close=df['close'],
-        window=10,
-        multiplier=3.0
-    ).supertrend_direction().iloc[-1]
-
-    timestamp = pd.to_datetime(df['timestamp'].iloc[-1], unit='ms')
+
+def calcular_indicadores(candles, rsi_window=14, st_window=10, multiplier=3.0):
+    """
+    Calcula RSI, OBV e Supertrend direto sobre um `Candles` (sem montar DataFrame).
+    Retorna o mesmo dicionário de `analyze_indicators`.
+    """
+    with metricas.cronometro("indicador", indicador="rsi"):
+        rsi = rsi_wilder(candles.close, window=rsi_window)[-1]
+    with metricas.cronometro("indicador", indicador="obv"):
+        obv = obv_array(candles.close, candles.volume)[-1]
+    with metricas.cronometro("indicador", indicador="supertrend"):
+        supertrend = supertrend_arrays(
+            high=candles.high,
+            low=candles.low,
+            close=candles.close,
+            window=st_window,
+            multiplier=multiplier
+        ).direction[-1]
+
+    timestamp = datetime.fromtimestamp(candles.open_time[-1] / 1000, tz=timezone.utc)
 
     return {
-        'rsi': rsi,
-        'obv': obv,
-        'supertrend': supertrend,
-        'price': df['close'].iloc[-1],
+        'rsi': float(rsi),
+        'obv': float(obv),
+        'supertrend': int(supertrend),
+        'price': float(candles.close[-1]),
         'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S")
     }
 
 
+def carregar_candles(symbol, interval, limit=200):
+    """Os últimos `limit` candles do par como `Candles` (mínimo de 50 para análise)."""
+    with metricas.contexto(symbol=symbol, interval=interval):
+        klines = get_klines(symbol=symbol, interval=interval, limit=limit)
+        if not klines or len(klines) < 50:
+            raise ValueError("Não há candles suficientes para análise.")
+
+        with metricas.cronometro("candles_build"):
+            return Candles.from_klines(klines)
+
+
+def analyze_indicators(symbol, interval):
+    candles = carregar_candles(symbol, interval)
+    with metricas.contexto(symbol=symbol, interval=interval):
+        return calcular_indicadores(candles)
+
+
+class SerieMultiTempo:
+    """
+    Estado de `analyze_indicators_multi` para um símbolo: os candles base fechados recentes (já
+    em `Candles`) e um `Reamostrador` por intervalo. Cada chamada converte e agrega só os
+    candles base fechados desde a anterior; o candle base em formação fica à parte.
+    """
+
+    def __init__(self, base, intervals, historico):
+        self.base = base
+        self.intervals = tuple(intervals)
+        self.historico = historico
+        self.lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.ultimo_open = None
+        self._base = np.empty(0, dtype=CANDLE_DTYPE)
+        self._em_formacao = None
+        self._reamostradores = {i: Reamostrador(self.base, i, max_len=self.historico + 1) for i in self.intervals}
+
+    def continua(self, novos):
+        """False se `novos` não emenda no último candle base visto (ex.: série recarregada com buraco)."""
+        return self.ultimo_open is None or not len(novos) or \
+            int(novos.open_time[0]) <= self.ultimo_open + INTERVALO_MS[self.base]
+
+    def adicionar(self, fechados, em_formacao):
+        for reamostrador in self._reamostradores.values():
+            reamostrador.adicionar(fechados)
+        if len(fechados):
+            self._base = np.concatenate((self._base, fechados.data))[-(self.historico + 1):]
+            self.ultimo_open = int(self._base['open_time'][-1])
+        self._em_formacao = em_formacao
+
+    def candles(self, interval):
+        return self._reamostradores[interval].candles(self._em_formacao)
+
+    def candles_base(self):
+        if self._em_formacao is None:
+            return Candles(self._base)
+        return Candles(np.concatenate((self._base, self._em_formacao.data)))
+
+
+series_multi = {}   # (symbol, base) → SerieMultiTempo
+_series_lock = threading.Lock()
+
+
+def _serie_multi(symbol, base, intervals, historico):
+    with _series_lock:
+        serie = series_multi.get((symbol, base))
+        if serie is None or not set(intervals) <= set(serie.intervals) or serie.historico != historico:
+            serie = series_multi[(symbol, base)] = SerieMultiTempo(base, intervals, historico)
+        return serie
+
+
+def limite_base(base, intervals, historico=200):
+    """Candles `base` que `analyze_indicators_multi` mantém para reamostrar `historico` candles de cada intervalo."""
+    return max(razao(base, interval) for interval in intervals) * (historico + 1)
+
+
+def descartar_series(symbol):
+    """Esquece as séries reamostradas do par (ex.: saiu da lista de observação)."""
+    with _series_lock:
+        for chave in [c for c in series_multi if c[0] == symbol]:
+            del series_multi[chave]
+
+
+def candles_reamostrados(symbol, interval, base="5m"):
+    """Candles de `interval` já mantidos por `analyze_indicators_multi` (None se o par não foi analisado)."""
+    with _series_lock:
+        serie = series_multi.get((symbol, base))
+    if serie is None or interval not in serie.intervals:
+        return None
+    with serie.lock:
+        return serie.candles(interval)
+
+
+def analyze_indicators_multi(symbol, intervals, base="5m", historico=200, series=None):
+    """
+    Analisa vários timeframes a partir de uma única série `base` (uma chamada REST por símbolo).
+    Os candles maiores são reamostrados nos buckets UTC da Binance; o último fica em formação,
+    como na API. Depois da primeira carga, só os candles base fechados desde a chamada anterior
+    são lidos do cache, convertidos e agregados (`SerieMultiTempo`).
+    Retorna ({interval: resultado}, candles_base); com `series` (dict), os candles de cada
+    intervalo ficam nele.
+    """
+    limite = limite_base(base, intervals, historico)
+    kline_cache.set_max_len(symbol, base, limite)
+    serie = _serie_multi(symbol, base, intervals, historico)
+    with serie.lock:
+        with metricas.contexto(symbol=symbol, interval=base):
+            klines = get_klines(symbol=symbol, interval=base, limit=limite, apos=serie.ultimo_open)
+            if not klines:
+                raise ValueError(f"Não há candles {base} para reamostragem.")
+            with metricas.cronometro("candles_build"):
+                novos = Candles.from_klines(klines)
+            if not serie.continua(novos):
+                serie.reiniciar()
+                klines = get_klines(symbol=symbol, interval=base, limit=limite)
+                if not klines:
+                    raise ValueError(f"Não há candles {base} para reamostragem.")
+                with metricas.cronometro("candles_build"):
+                    novos = Candles.from_klines(klines)
+            # O último kline é o candle base em formação (o cache o devolve sempre por último)
+            with metricas.cronometro("reamostragem"):
+                serie.adicionar(novos[:-1], novos[-1:])
+        por_intervalo = {interval: serie.candles(interval)[-historico:] for interval in intervals}
+        candles_base = serie.candles_base()
+
+    resultados = {}
+    for interval in intervals:
+        candles = por_intervalo[interval]
+        if series is not None:
+            series[interval] = candles
+        with metricas.contexto(symbol=symbol, interval=interval):
+            if len(candles) < 50:
+                raise ValueError(f"Não há candles suficientes para análise em {interval}.")
+            resultados[interval] = calcular_indicadores(candles)
+    return resultados, candles_base
+
+
+def inicio_rsi_candles(candles_5m, candles=10):
+    """`verificar_inicio_rsi` sobre candles de 5m já carregados (sem nova chamada REST)."""
+    if len(candles_5m) < candles + 14:
+        raise ValueError("Não há dados suficientes para análise do RSI 5m.")
+    rsi = rsi_wilder(candles_5m.close[-(candles + 14):], window=14)
+    return bool(rsi_inicio_ciclo(rsi, candles)[-1])
+
+
 def verificar_inicio_rsi(symbol, candles=10):
     """
     Verifica se o RSI está fazendo curva ascendente nos últimos candles de 5m.
@@ -52,16 +194,7 @@ def verificar_inicio_rsi(symbol, candles=10):
     if not klines or len(klines) < candles + 14:
         raise ValueError("Não há dados suficientes para análise do RSI 5m.")
 
-    df = pd.DataFrame(klines, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'quote_asset_volume', 'number_of_trades',
-        'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'
-    ])
-    df['close'] = pd.to_numeric(df['close'])
-
-    rsi_series = RSIIndicator(close=df['close'], window=14).rsi()
-    ultimos_rsi = rsi_series.tail(candles)
-
-    tendencia_ascendente = all(x < y for x, y in zip(ultimos_rsi, ultimos_rsi[1:]))
+    close = Candles.from_klines(klines).close
+    rsi = rsi_wilder(close, window=14)
 
-    return tendencia_ascendente
+    return bool(rsi_inicio_ciclo(rsi, candles)[-1])
@@ -0,0 +1,149 @@
+import numpy as np
+
+
+def rsi_wilder(close, window=14):
+    """
+    RSI com suavização de Wilder sobre arrays (mesma definição do ta.RSIIndicator).
+    Os primeiros `window - 1` valores são NaN.
+    """
+    import pandas as pd  # sob demanda: o import do pandas domina o cold start do sentinel
+
+    close = np.asarray(close, dtype=np.float64)
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    alpha = 1 / window
+    ema_up = pd.Series(up).ewm(alpha=alpha, min_periods=window, adjust=False).mean().to_numpy()
+    ema_down = pd.Series(down).ewm(alpha=alpha, min_periods=window, adjust=False).mean().to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + ema_up / ema_down))
+    return np.where(ema_down == 0, 100.0, rsi)
+
+
+def obv(close, volume):
+    """
+    On-Balance Volume acumulado (mesma definição do ta.OnBalanceVolumeIndicator):
+    soma o volume quando o fechamento não cai e subtrai quando cai.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    sinal = np.ones(len(close))
+    sinal[1:] = np.where(close[1:] < close[:-1], -1.0, 1.0)
+    return np.cumsum(sinal * volume)
+
+
+def rsi_ascendente(rsi_values):
+    """True se cada valor de RSI for estritamente maior que o anterior."""
+    rsi_values = list(rsi_values)
+    return all(x < y for x, y in zip(rsi_values, rsi_values[1:]))
+
+
+def rsi_inicio_ciclo(rsi, candles=10):
+    """
+    `rsi_ascendente` como predicado móvel: para cada posição i, True se os `candles` valores
+    de RSI terminando em i sobem estritamente. As primeiras `candles - 1` posições são False.
+    """
+    rsi = np.asarray(rsi, dtype=np.float64)
+    n = len(rsi)
+    resultado = np.zeros(n, dtype=bool)
+    if n < candles:
+        return resultado
+    if candles < 2:
+        resultado[:] = True
+        return resultado
+
+    subiu = np.concatenate(([0], np.cumsum(rsi[1:] > rsi[:-1])))
+    # Subidas dentro da janela [i - candles + 1, i]: precisam ser todas as `candles - 1`
+    resultado[candles - 1:] = subiu[candles - 1:] - subiu[:n - candles + 1] == candles - 1
+    return resultado
+
+
+def rsi_janelado(close, window=14, janela=200):
+    """
+    RSI que `analyze_indicators` veria em cada posição: RSI de Wilder calculado só
+    sobre os últimos `janela` candles. Vetorizado entre janelas (janela passos sobre n posições).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    resultado = np.full(n, np.nan)
+    if n < janela or janela < window:
+        return resultado
+
+    ema_up, ema_down = _ema_janelas(close, window, janela)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + ema_up / ema_down))
+    resultado[janela - 1:] = np.where(ema_down == 0, 100.0, rsi)
+    return resultado
+
+
+def inicio_rsi_janelado(close, candles=10, window=14):
+    """
+    Versão vetorizada de `verificar_inicio_rsi`: para cada posição, True se o RSI calculado
+    sobre os últimos `candles + window` fechamentos subiu em todos os `candles` finais.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    janela = candles + window
+    resultado = np.zeros(n, dtype=bool)
+    if n < janela:
+        return resultado
+
+    m = n - janela + 1
+    up, down = _movimentos(close)
+    alpha = 1 / window
+    ema_up = np.zeros(m)
+    ema_down = np.zeros(m)
+    anterior = None
+    subindo = np.ones(m, dtype=bool)
+
+    for j in range(1, janela):
+        ema_up = (1 - alpha) * ema_up + alpha * up[j - 1:j - 1 + m]
+        ema_down = (1 - alpha) * ema_down + alpha * down[j - 1:j - 1 + m]
+        if j >= janela - candles:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsi = np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+            if anterior is not None:
+                subindo &= anterior < rsi
+            anterior = rsi
+
+    resultado[janela - 1:] = subindo
+    return resultado
+
+
+def obv_janelado(close, volume, janela=200):
+    """OBV que `analyze_indicators` veria em cada posição (acumulado só nos últimos `janela` candles)."""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    n = len(close)
+    resultado = np.full(n, np.nan)
+    if n < janela:
+        return resultado
+
+    assinado = volume.copy()
+    assinado[1:] = np.where(close[1:] < close[:-1], -volume[1:], volume[1:])
+    acumulado = np.concatenate(([0.0], np.cumsum(assinado)))
+    soma = acumulado[janela:] - acumulado[:-janela]
+    # O primeiro candle de cada janela sempre soma o volume (sem fechamento anterior)
+    resultado[janela - 1:] = soma - assinado[:n - janela + 1] + volume[:n - janela + 1]
+    return resultado
+
+
+def _movimentos(close):
+    diff = np.diff(close)
+    return np.where(diff > 0, diff, 0.0), np.where(diff < 0, -diff, 0.0)
+
+
+def _ema_janelas(close, window, janela):
+    m = len(close) - janela + 1
+    up, down = _movimentos(close)
+    alpha = 1 / window
+    ema_up = np.zeros(m)
+    ema_down = np.zeros(m)
+    for j in range(1, janela):
+        ema_up *= 1 - alpha
+        ema_up += alpha * up[j - 1:j - 1 + m]
+        ema_down *= 1 - alpha
+        ema_down += alpha * down[j - 1:j - 1 + m]
+    return ema_up, ema_down
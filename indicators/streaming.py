@@ -0,0 +1,169 @@
+import math
+from collections import deque
+
+_RESIDUO = 1e-12
+
+
+def _rsi(avg_up, avg_down, count, window):
+    if count < window:
+        return math.nan
+    if avg_down == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_up / avg_down))
+
+
+class IndicatorState:
+    """
+    Estado incremental de RSI (Wilder), OBV, ATR e Supertrend para um par (symbol, interval).
+    Semeado uma vez com o histórico e depois atualizado candle a candle em O(1).
+    Os valores batem com o cálculo em lote (ta / supertrend_arrays) dentro da tolerância numérica.
+
+    Com `obv_window`, o snapshot traz também 'obv_janela': o OBV que `analyze_indicators`
+    veria calculando sobre apenas os últimos `obv_window` candles.
+
+    Com `rsi_janela`, 'rsi' é o RSI que `analyze_indicators` (e `rsi_janelado`) veria sobre só
+    os últimos `rsi_janela` candles; o da série inteira fica em 'rsi_total'. A EMA da janela é
+    a EMA total menos a parte anterior à janela, decaída: (1 - α)^(janela - 1) · EMA[t - janela + 1].
+    """
+
+    def __init__(self, rsi_window=14, st_window=10, multiplier=3.0, obv_window=None, rsi_janela=None):
+        self.rsi_window = rsi_window
+        self.st_window = st_window
+        self.multiplier = multiplier
+        self.obv_window = obv_window
+        self.rsi_janela = rsi_janela
+
+        self.count = 0
+        self.prev_close = None
+        self.avg_up = 0.0
+        self.avg_down = 0.0
+        self.obv = 0.0
+        self.obv_itens = deque(maxlen=obv_window) if obv_window else None
+        self.obv_soma = 0.0
+        # EMAs (alta, baixa) dos últimos `rsi_janela - 1` candles: a mais antiga sai da janela
+        self.rsi_medias = deque(maxlen=rsi_janela - 1) if rsi_janela and rsi_janela > 1 else None
+        self.tr_window = deque(maxlen=st_window)
+        self.upper_band = math.nan
+        self.lower_band = math.nan
+        self.trend = True
+        self.last = None
+
+    def seed(self, high, low, close, volume):
+        """Alimenta o estado com o histórico de candles fechados (iteráveis do mesmo tamanho)."""
+        for h, l, c, v in zip(high, low, close, volume):
+            self.push(h, l, c, v)
+        return self.last
+
+    def seed_candles(self, candles):
+        """Semeia o estado a partir de um `Candles` (apenas candles fechados)."""
+        return self.seed(candles.high.tolist(), candles.low.tolist(), candles.close.tolist(), candles.volume.tolist())
+
+    def push(self, high, low, close, volume):
+        """Confirma um candle fechado e devolve o snapshot atualizado dos indicadores."""
+        return self._step(float(high), float(low), float(close), float(volume), commit=True)
+
+    def peek(self, high, low, close, volume):
+        """Calcula os indicadores com o candle em formação sem alterar o estado."""
+        return self._step(float(high), float(low), float(close), float(volume), commit=False)
+
+    def _step(self, high, low, close, volume, commit):
+        alpha = 1 / self.rsi_window
+
+        # --- RSI (EMA de Wilder, adjust=False) ---
+        if self.prev_close is None:
+            avg_up, avg_down = 0.0, 0.0
+            obv = volume
+            tr = high - low
+        else:
+            diff = close - self.prev_close
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+            avg_up = (1 - alpha) * self.avg_up + alpha * up
+            avg_down = (1 - alpha) * self.avg_down + alpha * down
+            obv = self.obv - volume if close < self.prev_close else self.obv + volume
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        count = self.count + 1
+        # --- OBV janelado: o primeiro candle da janela sempre soma o volume (como no ta) ---
+        assinado = -volume if self.prev_close is not None and close < self.prev_close else volume
+        obv_janela = None
+        if self.obv_itens is not None:
+            itens = self.obv_itens
+            cheio = len(itens) == itens.maxlen
+            removido = itens[0][0] if cheio else 0.0
+            if cheio:
+                primeiro = itens[1] if itens.maxlen > 1 else (assinado, volume)
+            else:
+                primeiro = itens[0] if itens else (assinado, volume)
+            obv_soma = self.obv_soma - removido + assinado
+            obv_janela = obv_soma - primeiro[0] + primeiro[1]
+
+        rsi = _rsi(avg_up, avg_down, count, self.rsi_window)
+        rsi_total = None
+        if self.rsi_medias is not None:
+            rsi_total = rsi
+            janela_up, janela_down = avg_up, avg_down
+            if len(self.rsi_medias) == self.rsi_medias.maxlen:
+                decaimento = (1 - alpha) ** self.rsi_medias.maxlen
+                antiga_up, antiga_down = self.rsi_medias[0]
+                janela_up = max(avg_up - decaimento * antiga_up, 0.0)
+                janela_down = max(avg_down - decaimento * antiga_down, 0.0)
+                if janela_down <= _RESIDUO * avg_down:
+                    janela_down = 0.0  # só resíduo de arredondamento: nenhuma queda na janela
+            rsi = _rsi(janela_up, janela_down, count, self.rsi_window)
+
+        # --- ATR (média simples do TR, como no Supertrend) ---
+        trs = list(self.tr_window)
+        trs.append(tr)
+        trs = trs[-self.st_window:]
+        atr = sum(trs) / self.st_window if len(trs) == self.st_window else math.nan
+
+        # --- Supertrend (recorrência de carregamento das bandas) ---
+        hl2 = (high + low) / 2
+        upper = hl2 + self.multiplier * atr
+        lower = hl2 - self.multiplier * atr
+        trend = True
+        if self.prev_close is not None:
+            if close > self.upper_band:
+                trend = True
+            elif close < self.lower_band:
+                trend = False
+            else:
+                trend = self.trend
+                if trend and lower < self.lower_band:
+                    lower = self.lower_band
+                if not trend and upper > self.upper_band:
+                    upper = self.upper_band
+
+        snapshot = {
+            'rsi': rsi,
+            'obv': obv,
+            'atr': atr,
+            'upper_band': upper,
+            'lower_band': lower,
+            'supertrend': 1 if trend else -1,
+            'price': close,
+        }
+        if obv_janela is not None:
+            snapshot['obv_janela'] = obv_janela
+        if rsi_total is not None:
+            snapshot['rsi_total'] = rsi_total
+
+        if commit:
+            self.count = count
+            self.prev_close = close
+            self.avg_up = avg_up
+            self.avg_down = avg_down
+            if self.rsi_medias is not None:
+                self.rsi_medias.append((avg_up, avg_down))
+            self.obv = obv
+            if self.obv_itens is not None:
+                self.obv_itens.append((assinado, volume))
+                self.obv_soma = obv_soma
+            self.tr_window.append(tr)
+            self.upper_band = upper
+            self.lower_band = lower
+            self.trend = trend
+            self.last = snapshot
+
+        return snapshot
@@ -1,7 +1,134 @@
-import pandas as pd
+from collections import namedtuple
+
+import numpy as np
+
+# Resultado do motor vetorial: todas as séries são arrays NumPy do mesmo tamanho da entrada.
+SupertrendResult = namedtuple("SupertrendResult", ["upper_band", "lower_band", "trend", "direction", "atr"])
+
+
+def true_range(high, low, close):
+    """
+    True Range sobre arrays float64. O primeiro candle usa apenas high - low,
+    igual ao comportamento do pandas (max ignorando NaN).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    tr = high - low
+    if len(tr) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.fmax(tr[1:], np.fmax(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    return tr
+
+
+def atr_sma(high, low, close, window=10):
+    """
+    ATR por média móvel simples do True Range (mesma definição do Supertrend original).
+    Os primeiros `window - 1` valores são NaN.
+    """
+    tr = true_range(high, low, close)
+    atr = np.full(len(tr), np.nan)
+    if len(tr) >= window:
+        atr[window - 1:] = np.lib.stride_tricks.sliding_window_view(tr, window).mean(axis=1)
+    return atr
+
+
+def supertrend_bands(hl2, atr, close, multiplier=3.0):
+    """
+    Recorrência de carregamento das bandas do Supertrend sobre buffers simples.
+    Recebe hl2 e ATR já calculados (permite reaproveitar o ATR entre multiplicadores).
+    """
+    upper = (hl2 + multiplier * atr).tolist()
+    lower = (hl2 - multiplier * atr).tolist()
+    closes = np.asarray(close, dtype=np.float64).tolist()
+    n = len(closes)
+    trend = [True] * n
+
+    # Loop sobre floats nativos: comparações com NaN são False, como no .loc original
+    prev_up, prev_low, prev_trend = (upper[0], lower[0], True) if n else (0.0, 0.0, True)
+    for i in range(1, n):
+        c = closes[i]
+        if c > prev_up:
+            t = True
+        elif c < prev_low:
+            t = False
+        else:
+            t = prev_trend
+            if t and lower[i] < prev_low:
+                lower[i] = prev_low
+            if not t and upper[i] > prev_up:
+                upper[i] = prev_up
+        trend[i] = t
+        prev_up, prev_low, prev_trend = upper[i], lower[i], t
+
+    upper = np.array(upper, dtype=np.float64)
+    lower = np.array(lower, dtype=np.float64)
+    trend = np.array(trend, dtype=bool)
+    direction = np.where(trend, 1, -1).astype(np.int8)
+    return upper, lower, trend, direction
+
+
+def supertrend_arrays(high, low, close, window=10, multiplier=3.0):
+    """
+    Motor Supertrend baseado em arrays NumPy.
+    Retorna SupertrendResult com bandas, tendência (bool) e direção (1 / -1).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    hl2 = (high + low) / 2
+    atr = atr_sma(high, low, close, window)
+    upper, lower, trend, direction = supertrend_bands(hl2, atr, close, multiplier)
+    return SupertrendResult(upper, lower, trend, direction, atr)
+
+
+def supertrend_lote(high, low, close, window=10, multiplier=3.0):
+    """
+    Direção do Supertrend (1 / -1) para várias séries de mesmo tamanho de uma vez.
+    Recebe matrizes (séries × candles); a recorrência anda no tempo e cada passo é
+    vetorizado entre as séries — mesmo resultado de `supertrend_arrays` linha a linha.
+    """
+    high = np.atleast_2d(np.asarray(high, dtype=np.float64))
+    low = np.atleast_2d(np.asarray(low, dtype=np.float64))
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    series, n = close.shape
+
+    tr = high - low
+    if n > 1:
+        prev_close = close[:, :-1]
+        tr[:, 1:] = np.fmax(tr[:, 1:], np.fmax(np.abs(high[:, 1:] - prev_close), np.abs(low[:, 1:] - prev_close)))
+    atr = np.full((series, n), np.nan)
+    if n >= window:
+        atr[:, window - 1:] = np.lib.stride_tricks.sliding_window_view(tr, window, axis=1).mean(axis=2)
+
+    hl2 = (high + low) / 2
+    upper = hl2 + multiplier * atr
+    lower = hl2 - multiplier * atr
+    trend = np.ones((series, n), dtype=bool)
+    if not n:
+        return trend.astype(np.int8)
+
+    prev_up, prev_low, prev_trend = upper[:, 0], lower[:, 0], trend[:, 0]
+    for i in range(1, n):
+        c = close[:, i]
+        acima = c > prev_up
+        abaixo = ~acima & (c < prev_low)
+        mantem = ~acima & ~abaixo
+        t = acima | (mantem & prev_trend)
+        np.copyto(lower[:, i], prev_low, where=mantem & t & (lower[:, i] < prev_low))
+        np.copyto(upper[:, i], prev_up, where=mantem & ~t & (upper[:, i] > prev_up))
+        trend[:, i] = t
+        prev_up, prev_low, prev_trend = upper[:, i], lower[:, i], t
+
+    return np.where(trend, 1, -1).astype(np.int8)
+
 
 class Supertrend:
     def __init__(self, high, low, close, window=10, multiplier=3.0):
+        import pandas as pd
+
         self.high = high
         self.low = low
         self.close = close
@@ -10,36 +137,16 @@ class Supertrend:
         self.df = pd.DataFrame({'high': high, 'low': low, 'close': close})
         self._calculate()
 
+    @classmethod
+    def from_candles(cls, candles, window=10, multiplier=3.0):
+        return cls(high=candles.high, low=candles.low, close=candles.close, window=window, multiplier=multiplier)
+
     def _calculate(self):
-        hl2 = (self.df['high'] + self.df['low']) / 2
-        atr = self._atr()
-        self.df['upper_band'] = hl2 + (self.multiplier * atr)
-        self.df['lower_band'] = hl2 - (self.multiplier * atr)
-        self.df['trend'] = True
-
-        for i in range(1, len(self.df)):
-            if self.df.loc[i, 'close'] > self.df.loc[i - 1, 'upper_band']:
-                self.df.loc[i, 'trend'] = True
-            elif self.df.loc[i, 'close'] < self.df.loc[i - 1, 'lower_band']:
-                self.df.loc[i, 'trend'] = False
-            else:
-                self.df.loc[i, 'trend'] = self.df.loc[i - 1, 'trend']
-                if self.df.loc[i, 'trend'] and self.df.loc[i, 'lower_band'] < self.df.loc[i - 1, 'lower_band']:
-                    self.df.loc[i, 'lower_band'] = self.df.loc[i - 1, 'lower_band']
-                if not self.df.loc[i, 'trend'] and self.df.loc[i, 'upper_band'] > self.df.loc[i - 1, 'upper_band']:
-                    self.df.loc[i, 'upper_band'] = self.df.loc[i - 1, 'upper_band']
-
-        self.df['supertrend'] = self.df['trend'].apply(lambda x: 1 if x else -1)
-
-    def _atr(self):
-        high = self.df['high']
-        low = self.df['low']
-        close = self.df['close']
-        tr1 = high - low
-        tr2 = (high - close.shift()).abs()
-        tr3 = (low - close.shift()).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(self.window).mean()
+        result = supertrend_arrays(self.df['high'], self.df['low'], self.df['close'], self.window, self.multiplier)
+        self.df['upper_band'] = result.upper_band
+        self.df['lower_band'] = result.lower_band
+        self.df['trend'] = result.trend
+        self.df['supertrend'] = result.direction.astype(np.int64)
 
     def supertrend_direction(self):
         return self.df['supertrend']
@@ -0,0 +1,239 @@
+# kline_cache.py 🗃️ CharlieCore Kline Cache — candles fechados em memória com gap-fill incremental
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import metricas
+from candles import Candles
+from resample import INTERVALO_MS
+
+LIMITE_PAGINA = 1000   # máximo de candles por requisição na Binance
+LIMITE_DELTA = 99      # por página de gap-fill; o delta de uma varredura cabe em uma
+MAX_LEN_PADRAO = 1000
+
+
+class KlineCache:
+    """
+    Cache por (symbol, interval) na frente de `get_klines`.
+    Guarda apenas candles fechados e, a cada chamada, busca só os candles mais novos
+    que o último `close_time` em cache. O candle em formação (o último que a API devolve)
+    é sempre buscado de novo.
+
+    `buscar` segue a assinatura de `BinanceGateway.get_klines(symbol=, interval=, limit=, startTime=, endTime=)`.
+
+    Com um `armazem` (`CandleStore`), todo candle fechado novo é gravado em disco e,
+    num miss, a série é recarregada do disco e só o intervalo desde o último candle
+    gravado é buscado — um restart não refaz a carga completa pela API. Se o disco tem um
+    buraco ou ficou defasado demais, a janela vem da API e substitui o arquivo.
+    """
+
+    def __init__(self, buscar, max_len=MAX_LEN_PADRAO, relogio=time.time, armazem=None):
+        self._buscar = buscar
+        self.armazem = armazem
+        self.max_len = max_len
+        self._relogio = relogio
+        self._series = {}
+        self._max_len_serie = {}
+        self._lock = threading.Lock()
+        self._locks_serie = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.disco = 0
+        self.requests = 0
+        self.bytes_fetched = 0
+
+    def set_max_len(self, symbol, interval, max_len):
+        """Define o tamanho máximo (em candles fechados) de uma série específica."""
+        with self._lock:
+            chave = (symbol, interval)
+            if self._max_len_serie.get(chave) == max_len:
+                return
+            self._max_len_serie[chave] = max_len
+            if chave in self._series:
+                self._series[chave] = deque(self._series[chave], maxlen=max_len)
+
+    def get(self, symbol="BTCUSDT", interval="15m", limit=200, apos=None):
+        """
+        Retorna os últimos `limit` klines (fechados + candle em formação), como a API.
+        Com `apos` (open_time), só os fechados mais novos que ele vêm na resposta — quem já
+        tem a série recebe apenas o delta, sem copiar a janela inteira.
+        """
+        chave = (symbol, interval)
+        # Lock por série: pares diferentes podem buscar em paralelo
+        with self._lock_serie(chave):
+            with self._lock:
+                serie = self._series.get(chave)
+                max_len = self._max_len_serie.get(chave, self.max_len)
+                hit = bool(serie) and len(serie) >= limit - 1
+                if hit:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+            regravar = False
+            if hit:
+                novos = self._buscar_desde(symbol, interval, serie[-1][6] + 1)
+            else:
+                serie = deque(maxlen=max_len)
+                novos, regravar = self._carregar_armazem(serie, symbol, interval, limit) if self.armazem else (None, False)
+                if novos is None:
+                    novos = self._buscar_historico(symbol, interval, limit)
+
+            em_formacao, anexados = self._mesclar(serie, novos)
+            if self.armazem is not None and anexados:
+                self._gravar(symbol, interval, anexados, regravar)
+            with self._lock:
+                self._series[chave] = serie
+                if apos is None:
+                    fechados = list(serie)
+                else:
+                    fechados = []
+                    for kline in reversed(serie):
+                        if kline[0] <= apos:
+                            break
+                        fechados.append(kline)
+                    fechados.reverse()
+
+            if em_formacao is None:
+                return fechados[-limit:]
+            return (fechados[-(limit - 1):] if limit > 1 else []) + [em_formacao]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disco': self.disco,
+                'requests': self.requests,
+                'bytes_fetched': self.bytes_fetched,
+                'series': len(self._series),
+                'candles': sum(len(s) for s in self._series.values()),
+            }
+
+    def em_cache(self, symbol, interval):
+        """Candles fechados já em memória, sem nenhuma chamada à API (lista vazia se a série não existe)."""
+        with self._lock:
+            return list(self._series.get((symbol, interval), ()))
+
+    def simbolos(self):
+        """Símbolos com alguma série em memória."""
+        with self._lock:
+            return {symbol for (symbol, _), serie in self._series.items() if serie}
+
+    def tamanho(self, symbol, interval):
+        """Quantos candles fechados da série estão em memória (0 se ela não existe)."""
+        with self._lock:
+            return len(self._series.get((symbol, interval), ()))
+
+    def esquecer(self, symbol):
+        """
+        Descarta as séries do par em memória e, com `armazem`, os arquivos em disco (ex.: o par
+        saiu da rotação do scanner). Voltando, ele passa por uma carga normal. Retorna quantas séries.
+        """
+        with self._lock:
+            chaves = [c for c in self._series if c[0] == symbol]
+            for chave in chaves:
+                del self._series[chave]
+                self._max_len_serie.pop(chave, None)
+        if self.armazem is not None:
+            self.armazem.remover(symbol)
+        return len(chaves)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    # --- internos ---
+
+    def _lock_serie(self, chave):
+        with self._lock:
+            return self._locks_serie.setdefault(chave, threading.Lock())
+
+    def _chamar(self, **params):
+        with metricas.cronometro("kline_fetch", symbol=params.get('symbol'), interval=params.get('interval')):
+            pagina = self._buscar(**params) or []
+        tamanho = len(json.dumps(pagina))
+        metricas.contar("kline_bytes", tamanho, symbol=params.get('symbol'), interval=params.get('interval'))
+        with self._lock:
+            self.requests += 1
+            self.bytes_fetched += tamanho
+        return pagina
+
+    def _buscar_desde(self, symbol, interval, inicio):
+        """Gap-fill: pagina para frente a partir de `inicio` até alcançar o candle atual."""
+        klines = []
+        while True:
+            pagina = self._chamar(symbol=symbol, interval=interval, limit=LIMITE_DELTA, startTime=inicio)
+            klines.extend(pagina)
+            if len(pagina) < LIMITE_DELTA:
+                return klines
+            inicio = pagina[-1][6] + 1
+
+    def _buscar_historico(self, symbol, interval, limit):
+        """Carga inicial: pagina para trás quando `limit` excede o máximo por requisição."""
+        pagina = self._chamar(symbol=symbol, interval=interval, limit=min(limit, LIMITE_PAGINA))
+        klines = list(pagina)
+        while len(klines) < limit and len(pagina) == LIMITE_PAGINA:
+            faltam = min(limit - len(klines), LIMITE_PAGINA)
+            pagina = self._chamar(symbol=symbol, interval=interval, limit=faltam, endTime=klines[0][0] - 1)
+            klines = list(pagina) + klines
+        return klines
+
+    def _carregar_armazem(self, serie, symbol, interval, limit):
+        """
+        Warm start: preenche `serie` com os candles em disco e devolve (delta buscado desde o último, False).
+        Retorna (None, regravar) — carga normal pela API — se o disco não cobre `limit`, está
+        defasado demais ou tem um buraco; `regravar` pede que a janela nova substitua o arquivo.
+        """
+        disco = self.armazem.ultimos(symbol, interval, serie.maxlen or limit)
+        if len(disco) < limit - 1 or not len(disco):
+            return None, False
+        duracao = INTERVALO_MS.get(interval)
+        if duracao is None:
+            return None, False
+        if np.any(np.diff(disco.open_time) != duracao):
+            print(f"⚠️ Buraco nos candles em disco [{symbol} {interval}]. Recarregando pela API.")
+            return None, True
+        defasagem = int(self._relogio() * 1000) - int(disco.close_time[-1])
+        if defasagem // duracao > limit:
+            return None, True  # mais barato rebuscar a janela inteira do que paginar o buraco
+
+        serie.extend(list(registro) for registro in disco.data.tolist())
+        with self._lock:
+            self.disco += 1
+        return self._buscar_desde(symbol, interval, serie[-1][6] + 1), False
+
+    def _gravar(self, symbol, interval, klines, regravar=False):
+        try:
+            if regravar:
+                self.armazem.substituir(symbol, interval, Candles.from_klines(klines))
+            else:
+                self.armazem.anexar(symbol, interval, Candles.from_klines(klines))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Falha ao gravar candles em disco [{symbol} {interval}]: {e}")
+
+    def _mesclar(self, serie, klines):
+        """
+        Anexa candles fechados inéditos (dedupe por open_time).
+        O kline mais novo da resposta é sempre o candle em formação — a API o devolve por último —
+        e nunca entra na série: o relógio local não decide o fechamento, então um relógio
+        adiantado não grava um candle pela metade.
+        Retorna (candle em formação, lista dos fechados anexados).
+        """
+        ordenados = sorted(klines, key=lambda k: k[0])
+        em_formacao = ordenados.pop() if ordenados else None
+        ultimo_open = serie[-1][0] if serie else None
+        anexados = []
+
+        for kline in ordenados:
+            if ultimo_open is not None and kline[0] <= ultimo_open:
+                continue
+            serie.append(kline)
+            anexados.append(kline)
+            ultimo_open = kline[0]
+
+        return em_formacao, anexados
@@ -0,0 +1,197 @@
+# kline_stream.py 📶 CharlieCore Kline Stream — sentinela orientada a eventos via WebSocket
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from candles import Candles
+from estrategia import classificar_estrategia, renderizar_sinal, ENTRADAS
+from indicators.momentum import rsi_ascendente
+from indicators.streaming import IndicatorState
+from resample import INTERVALO_MS
+
+WS_URL = "wss://stream.binance.com:9443/stream?streams="
+HISTORICO_CANDLES = 200     # mesma janela usada por analyze_indicators
+CANDLES_INICIO_RSI = 10     # mesma janela usada por verificar_inicio_rsi
+BACKOFF_MAXIMO = 60
+
+
+def nome_stream(symbol, interval):
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+def url_combinada(symbols, intervals):
+    return WS_URL + "/".join(nome_stream(s, i) for s in symbols for i in intervals)
+
+
+async def replay_jsonl(caminho, atraso=0.0):
+    """Fonte local de mensagens: um payload de stream combinado por linha (JSONL)."""
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if linha:
+                yield linha
+                if atraso:
+                    await asyncio.sleep(atraso)
+
+
+class KlineStream:
+    """
+    Assina os streams combinados de kline de todos os pares e atualiza um `IndicatorState`
+    por (symbol, interval) a cada candle fechado, avaliando a estratégia imediatamente.
+
+    `fonte` (opcional) substitui o WebSocket: qualquer async iterável de mensagens
+    (ex.: `replay_jsonl`). Sem `fonte`, conecta na Binance e reconecta com backoff,
+    preenchendo via REST os candles perdidos durante a queda (sem disparar sinais).
+    """
+
+    def __init__(self, symbols, intervals, ao_sinal=None, fonte=None, buscar_klines=None, relogio=time.time):
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.ao_sinal = ao_sinal
+        self.fonte = fonte
+        self._buscar_klines = buscar_klines
+        self._relogio = relogio
+
+        self.estados = {}
+        self.rsi_recentes = {}
+        self.ultimo_open = {}
+        self.latencias_ms = deque(maxlen=1000)
+        self.reconexoes = 0
+
+    # --- histórico / backfill ---
+
+    def _buscar(self, symbol, interval, limit):
+        if self._buscar_klines is None:
+            from data import get_klines
+            self._buscar_klines = get_klines
+        return self._buscar_klines(symbol=symbol, interval=interval, limit=limit) or []
+
+    def _fechados(self, klines):
+        agora_ms = int(self._relogio() * 1000)
+        return Candles.from_klines([k for k in klines if k[6] < agora_ms])
+
+    def semear(self):
+        """Carga inicial via REST de todos os pares (candles fechados)."""
+        for symbol in self.symbols:
+            for interval in self.intervals:
+                candles = self._fechados(self._buscar(symbol, interval, HISTORICO_CANDLES + 1))
+                self._semear_par((symbol, interval), candles)
+
+    def _semear_par(self, chave, candles):
+        """Estado novo do par, alimentado com `candles` do zero."""
+        estado = IndicatorState(obv_window=HISTORICO_CANDLES, rsi_janela=HISTORICO_CANDLES)
+        self.estados[chave] = estado
+        self.rsi_recentes[chave] = deque(maxlen=CANDLES_INICIO_RSI)
+        for i in range(len(candles)):
+            snap = estado.push(candles.high[i], candles.low[i], candles.close[i], candles.volume[i])
+            self.rsi_recentes[chave].append(snap['rsi'])
+        if len(candles):
+            self.ultimo_open[chave] = int(candles.open_time[-1])
+
+    def backfill(self):
+        """
+        Após reconectar: aplica os candles fechados perdidos desde o último recebido, só
+        atualizando o estado — sinais de candles antigos não são emitidos. Se a queda foi mais
+        longa que a janela buscada, a série teria um buraco: o estado do par é semeado de novo.
+        """
+        for chave, ultimo in list(self.ultimo_open.items()):
+            symbol, interval = chave
+            candles = self._fechados(self._buscar(symbol, interval, HISTORICO_CANDLES + 1))
+            if not len(candles):
+                continue
+            duracao = INTERVALO_MS.get(interval)
+            if duracao is None or int(candles.open_time[0]) > ultimo + duracao:
+                print(f"⚠️ Queda maior que a janela em {symbol} [{interval}]. Semeando o estado de novo.")
+                self._semear_par(chave, candles)
+                continue
+            for i in range(len(candles)):
+                if candles.open_time[i] > ultimo:
+                    self._aplicar(symbol, interval, int(candles.open_time[i]), int(candles.close_time[i]),
+                                  candles.high[i], candles.low[i], candles.close[i], candles.volume[i],
+                                  emitir=False)
+
+    # --- processamento ---
+
+    def processar_mensagem(self, mensagem):
+        """Trata um payload do stream combinado. Retorna o snapshot se um candle fechou."""
+        if isinstance(mensagem, (str, bytes)):
+            mensagem = json.loads(mensagem)
+        dados = mensagem.get("data", mensagem)
+        if dados.get("e") != "kline":
+            return None
+
+        k = dados["k"]
+        if not k.get("x"):
+            return None
+        return self._aplicar(k["s"], k["i"], int(k["t"]), int(k["T"]),
+                             float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+
+    def _aplicar(self, symbol, interval, open_time, close_time, high, low, close, volume, emitir=True):
+        chave = (symbol, interval)
+        estado = self.estados.get(chave)
+        if estado is None:
+            estado = IndicatorState(obv_window=HISTORICO_CANDLES, rsi_janela=HISTORICO_CANDLES)
+            self.estados[chave] = estado
+            self.rsi_recentes[chave] = deque(maxlen=CANDLES_INICIO_RSI)
+        if open_time <= self.ultimo_open.get(chave, -1):
+            return None  # duplicado (ex.: backfill + stream)
+
+        snap = estado.push(high, low, close, volume)
+        snap['timestamp'] = datetime.fromtimestamp(open_time / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.ultimo_open[chave] = open_time
+        self.rsi_recentes[chave].append(snap['rsi'])
+        if not emitir:
+            return snap  # replay do backfill: só o estado
+
+        sinal = classificar_estrategia(snap['rsi'], snap.get('obv_janela', snap['obv']), snap['supertrend'], interval)
+        decisao = renderizar_sinal(sinal)
+        inicio_rsi = False
+        if sinal in ENTRADAS:
+            rsi_5m = self.rsi_recentes.get((symbol, "5m"), ())
+            inicio_rsi = len(rsi_5m) == CANDLES_INICIO_RSI and rsi_ascendente(rsi_5m)
+
+        latencia = self._relogio() * 1000 - close_time
+        self.latencias_ms.append(latencia)
+
+        if self.ao_sinal:
+            self.ao_sinal(symbol, interval, snap, decisao, inicio_rsi)
+        return snap
+
+    # --- conexão ---
+
+    async def _mensagens_ws(self):
+        import websockets
+
+        async with websockets.connect(url_combinada(self.symbols, self.intervals), ping_interval=20) as ws:
+            async for mensagem in ws:
+                yield mensagem
+
+    async def executar(self):
+        """Loop principal. Com `fonte`, termina quando a fonte se esgota."""
+        if self.fonte is not None:
+            async for mensagem in self.fonte:
+                self.processar_mensagem(mensagem)
+            return
+
+        espera = 1
+        while True:
+            try:
+                async for mensagem in self._mensagens_ws():
+                    self.processar_mensagem(mensagem)
+                    espera = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Stream de klines caiu: {e}")
+
+            self.reconexoes += 1
+            await asyncio.sleep(espera + random.uniform(0, 1))
+            espera = min(espera * 2, BACKOFF_MAXIMO)
+            print("🔁 Reconectando stream e preenchendo candles perdidos via REST...")
+            try:
+                await asyncio.to_thread(self.backfill)
+            except Exception as e:
+                print(f"❌ Erro no backfill: {e}")
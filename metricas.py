@@ -0,0 +1,266 @@
+# metricas.py 📊 CharlieCore Métricas — timers, contadores e histogramas com tags (custo ~zero desligado)
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+AMOSTRAS_POR_SERIE = 2048   # reservatório por (nome, tags) para os percentis
+PORTA_PADRAO = 9108
+INTERVALO_DUMP = 60
+PREFIXO = "charlie_"
+
+ativo = os.getenv("CHARLIE_METRICAS", "0") == "1"
+
+
+class _Nulo:
+    """Cronômetro/contexto que não faz nada: o caminho quente quando as métricas estão desligadas."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _Nulo()
+
+
+class _Serie:
+    __slots__ = ("amostras", "contagem", "soma")
+
+    def __init__(self):
+        self.amostras = deque(maxlen=AMOSTRAS_POR_SERIE)
+        self.contagem = 0
+        self.soma = 0.0
+
+
+class Registro:
+    """Histogramas (últimas amostras + contagem/soma totais) e contadores por (nome, tags)."""
+
+    def __init__(self):
+        self._series = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def observar(self, nome, valor, tags):
+        with self._lock:
+            serie = self._series.get((nome, tags))
+            if serie is None:
+                serie = self._series[(nome, tags)] = _Serie()
+            serie.amostras.append(valor)
+            serie.contagem += 1
+            serie.soma += valor
+
+    def contar(self, nome, valor, tags):
+        with self._lock:
+            self._contadores[(nome, tags)] = self._contadores.get((nome, tags), 0) + valor
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+            self._contadores.clear()
+
+    def snapshot(self):
+        """Lista de dicts: histogramas com p50/p95/p99 (segundos) e contadores."""
+        with self._lock:
+            series = [(nome, tags, list(s.amostras), s.contagem, s.soma) for (nome, tags), s in self._series.items()]
+            contadores = list(self._contadores.items())
+
+        saida = []
+        for nome, tags, amostras, contagem, soma in sorted(series):
+            ordenadas = sorted(amostras)
+            saida.append({
+                'nome': nome, 'tipo': 'histograma', 'tags': dict(tags), 'contagem': contagem, 'soma': soma,
+                'p50': _percentil(ordenadas, 50), 'p95': _percentil(ordenadas, 95), 'p99': _percentil(ordenadas, 99),
+            })
+        for (nome, tags), valor in sorted(contadores):
+            saida.append({'nome': nome, 'tipo': 'contador', 'tags': dict(tags), 'valor': valor})
+        return saida
+
+
+registro = Registro()
+_local = threading.local()
+
+
+def _percentil(ordenadas, p):
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))]
+
+
+def _tags(extras):
+    contexto = getattr(_local, "tags", None)
+    if contexto:
+        extras = {**contexto, **extras}
+    return tuple(sorted((k, str(v)) for k, v in extras.items()))
+
+
+class _Cronometro:
+    __slots__ = ("nome", "tags", "inicio")
+
+    def __init__(self, nome, tags):
+        self.nome = nome
+        self.tags = tags
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registro.observar(self.nome, time.perf_counter() - self.inicio, self.tags)
+        return False
+
+
+class _Contexto:
+    __slots__ = ("tags", "anterior")
+
+    def __init__(self, tags):
+        self.tags = tags
+
+    def __enter__(self):
+        self.anterior = getattr(_local, "tags", None)
+        _local.tags = {**(self.anterior or {}), **self.tags}
+        return self
+
+    def __exit__(self, *exc):
+        _local.tags = self.anterior
+        return False
+
+
+# === API === #
+
+def cronometro(nome, **tags):
+    """`with cronometro("kline_fetch", symbol=...)`: mede o bloco e registra no histograma `nome`."""
+    if not ativo:
+        return _NULO
+    return _Cronometro(nome, _tags(tags))
+
+
+def contexto(**tags):
+    """Tags herdadas por todas as métricas registradas no bloco (na mesma thread)."""
+    if not ativo:
+        return _NULO
+    return _Contexto(tags)
+
+
+def observar(nome, valor, **tags):
+    """Registra um valor já medido (ex.: latência sinal → ack, em segundos)."""
+    if ativo:
+        registro.observar(nome, valor, _tags(tags))
+
+
+def contar(nome, valor=1, **tags):
+    if ativo:
+        registro.contar(nome, valor, _tags(tags))
+
+
+def ativar(ligado=True):
+    global ativo
+    ativo = ligado
+
+
+def snapshot():
+    return registro.snapshot()
+
+
+def texto_prometheus():
+    """Formato de exposição de texto do Prometheus (summary para histogramas)."""
+    linhas = []
+    vistos = set()
+    for item in registro.snapshot():
+        if item['tipo'] == 'histograma':
+            nome = f"{PREFIXO}{item['nome']}_seconds"
+            if nome not in vistos:
+                linhas.append(f"# TYPE {nome} summary")
+                vistos.add(nome)
+            for quantil, chave in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                linhas.append(f"{nome}{_rotulos(item['tags'], quantile=quantil)} {item[chave]:.6f}")
+            linhas.append(f"{nome}_count{_rotulos(item['tags'])} {item['contagem']}")
+            linhas.append(f"{nome}_sum{_rotulos(item['tags'])} {item['soma']:.6f}")
+        else:
+            nome = f"{PREFIXO}{item['nome']}_total"
+            if nome not in vistos:
+                linhas.append(f"# TYPE {nome} counter")
+                vistos.add(nome)
+            linhas.append(f"{nome}{_rotulos(item['tags'])} {item['valor']}")
+    return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(tags, **extras):
+    tags = {**tags, **extras}
+    if not tags:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in sorted(tags.items())) + "}"
+
+
+def despejar_jsonl(caminho):
+    """Anexa um snapshot (uma linha por série) ao arquivo JSONL."""
+    momento = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    itens = registro.snapshot()
+    if not itens:
+        return 0
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    with open(caminho, "a", encoding="utf-8") as f:
+        for item in itens:
+            f.write(json.dumps({'momento': momento, **item}, ensure_ascii=False) + "\n")
+    return len(itens)
+
+
+def iniciar_servidor(porta=PORTA_PADRAO, host="0.0.0.0"):
+    """Endpoint local `/metrics` em uma thread daemon. Retorna o servidor (porta real em `server_port`)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            corpo = texto_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, porta), _Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True, name="metricas-http").start()
+    print(f"📊 Métricas em http://{host}:{servidor.server_port}/metrics")
+    return servidor
+
+
+def iniciar_dump_jsonl(caminho, intervalo=INTERVALO_DUMP):
+    """Thread daemon que despeja um snapshot no JSONL a cada `intervalo` segundos."""
+    def _loop():
+        while True:
+            time.sleep(intervalo)
+            try:
+                despejar_jsonl(caminho)
+            except OSError as e:
+                print(f"⚠️ Falha ao despejar métricas: {e}")
+
+    threading.Thread(target=_loop, daemon=True, name="metricas-jsonl").start()
+
+
+def configurar_por_ambiente():
+    """
+    CHARLIE_METRICAS=1 liga a coleta; CHARLIE_METRICAS_PORTA sobe o endpoint Prometheus;
+    CHARLIE_METRICAS_JSONL (+ CHARLIE_METRICAS_INTERVALO) liga o dump periódico.
+    """
+    ativar(os.getenv("CHARLIE_METRICAS", "0") == "1")
+    if not ativo:
+        return
+    porta = os.getenv("CHARLIE_METRICAS_PORTA")
+    if porta:
+        iniciar_servidor(int(porta))
+    caminho = os.getenv("CHARLIE_METRICAS_JSONL")
+    if caminho:
+        iniciar_dump_jsonl(caminho, float(os.getenv("CHARLIE_METRICAS_INTERVALO", INTERVALO_DUMP)))
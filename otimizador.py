@@ -0,0 +1,275 @@
+# otimizador.py 🧬 CharlieCore Optimizer — varredura paralela de parâmetros Supertrend/RSI
+import argparse
+import csv
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backtest import carregar_candles, JANELA_ANALISE, CANDLES_INICIO_RSI, TAXA_PADRAO, SLIPPAGE_PADRAO, VALOR_ORDEM_PADRAO
+from estrategia import avaliar_estrategia_vetorizada, direcao_entrada
+from indicators.momentum import rsi_janelado, obv_janelado, inicio_rsi_janelado
+from indicators.supertrend import atr_sma, supertrend_bands
+
+# Grade padrão (valores atuais da estratégia incluídos: 10 / 3.0 / 14 / 35 / 65)
+GRADE_PADRAO = {
+    'st_window': [7, 10, 14, 20],
+    'multiplier': [2.0, 2.5, 3.0, 3.5, 4.0],
+    'rsi_window': [10, 14, 21],
+    'limiar_long': [30, 35, 40, 45],
+    'limiar_short': [55, 60, 65, 70],
+}
+TAMANHO_LOTE = 64  # combinações por tarefa enviada ao pool
+
+
+# === 📦 Entradas compartilhadas (memmap) === #
+
+def preparar_dados(candles, grade, pasta):
+    """
+    Calcula uma única vez por dataset tudo que é compartilhado entre as combinações
+    (hl2, ATR por janela, RSI/início de ciclo por janela, OBV) e grava em .npy na `pasta`.
+    Os workers abrem esses arquivos com mmap — nada de DataFrame serializado via pickle.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    close = np.ascontiguousarray(candles.close)
+
+    arrays = {
+        'close': close,
+        'open': np.ascontiguousarray(candles.open),
+        'hl2': (candles.high + candles.low) / 2,
+        'obv': obv_janelado(close, candles.volume, janela=JANELA_ANALISE),
+    }
+    for w in grade['st_window']:
+        arrays[f'atr_{w}'] = atr_sma(candles.high, candles.low, close, w)
+    for w in grade['rsi_window']:
+        arrays[f'rsi_{w}'] = rsi_janelado(close, window=w, janela=JANELA_ANALISE)
+        arrays[f'inicio_rsi_{w}'] = inicio_rsi_janelado(close, candles=CANDLES_INICIO_RSI, window=w)
+
+    for nome, valores in arrays.items():
+        np.save(os.path.join(pasta, f"{nome}.npy"), valores)
+    return pasta
+
+
+_ABERTOS = {}
+_DIRECOES = {}
+MAX_DIRECOES = 32  # Supertrends em cache por processo (combinações vizinhas compartilham)
+
+
+def _abrir(pasta, nome):
+    chave = (pasta, nome)
+    if chave not in _ABERTOS:
+        _ABERTOS[chave] = np.load(os.path.join(pasta, f"{nome}.npy"), mmap_mode="r")
+    return _ABERTOS[chave]
+
+
+# === ⚡ Avaliação de uma combinação === #
+
+def sinais_entrada(rsi, obv, direcao, inicio_rsi, limiar_long=35, limiar_short=65):
+    """
+    Regra de entrada do 5m de `avaliar_estrategia`, vetorizada e com limiares configuráveis.
+    Retorna 1 (LONG), -1 (SHORT) ou 0 por candle. A confirmação de `verificar_inicio_rsi` já entra aqui.
+    """
+    codigos = avaliar_estrategia_vetorizada(rsi, obv, direcao, "5m", limiar_long, limiar_short)
+    return direcao_entrada(codigos) * np.asarray(inicio_rsi, dtype=np.int8)
+
+
+def simular_sinais(sinal, direcao, abertura, fechamento, taxa=TAXA_PADRAO, slippage=SLIPPAGE_PADRAO,
+                   valor_ordem=VALOR_ORDEM_PADRAO, inicio=JANELA_ANALISE - 1):
+    """
+    Mesmas regras de posição de `backtest.executar_backtest`, mas saltando direto entre
+    eventos (sinais e viradas do Supertrend) em vez de percorrer candle a candle.
+    """
+    n = len(sinal)
+    ultimo = n - 2  # último candle avaliado (o fill acontece no seguinte)
+    indices = np.flatnonzero(sinal[:n - 1] != 0)
+    indices = indices[indices >= inicio]
+    viradas = np.flatnonzero(direcao[1:] != direcao[:-1]) + 1
+
+    pnls = []
+    pos = np.searchsorted(indices, inicio)
+    while pos < len(indices):
+        i = int(indices[pos])
+        lado = int(sinal[i])
+        preco_entrada = abertura[i + 1] * (1 + slippage * lado)
+        quantidade = valor_ordem / abertura[i + 1]
+        taxa_entrada = preco_entrada * quantidade * taxa
+
+        k = np.searchsorted(viradas, i, side="right")
+        j = int(viradas[k]) if k < len(viradas) else None
+        if j is None or j > ultimo:
+            preco_saida = fechamento[-1] * (1 - slippage * lado)
+            proximo = n
+        else:
+            preco_saida = abertura[j + 1] * (1 - slippage * lado)
+            proximo = j
+
+        liquido = lado * (preco_saida - preco_entrada) * quantidade - taxa_entrada - preco_saida * quantidade * taxa
+        pnls.append(liquido)
+        pos = np.searchsorted(indices, proximo)
+
+    pnls = np.array(pnls)
+    equity = np.cumsum(pnls) if len(pnls) else np.zeros(1)
+    return {
+        'pnl': float(pnls.sum()) if len(pnls) else 0.0,
+        'trades': len(pnls),
+        'hit_rate': float((pnls > 0).mean()) if len(pnls) else 0.0,
+        'max_dd_trades': float((np.maximum.accumulate(np.maximum(equity, 0)) - equity).max()),
+    }
+
+
+def _direcao(pasta, st_window, multiplier):
+    """A recorrência do Supertrend é o passo caro: calcula uma vez por (janela, multiplicador)."""
+    chave = (pasta, st_window, multiplier)
+    if chave not in _DIRECOES:
+        if len(_DIRECOES) >= MAX_DIRECOES:
+            _DIRECOES.pop(next(iter(_DIRECOES)))
+        atr = _abrir(pasta, f"atr_{st_window}")
+        _DIRECOES[chave] = supertrend_bands(_abrir(pasta, 'hl2'), atr, _abrir(pasta, 'close'), multiplier)[3]
+    return _DIRECOES[chave]
+
+
+def avaliar_combinacao(pasta, params):
+    close = _abrir(pasta, 'close')
+    direcao = _direcao(pasta, params['st_window'], params['multiplier'])
+    sinal = sinais_entrada(
+        _abrir(pasta, f"rsi_{params['rsi_window']}"),
+        _abrir(pasta, 'obv'),
+        direcao,
+        _abrir(pasta, f"inicio_rsi_{params['rsi_window']}"),
+        params['limiar_long'],
+        params['limiar_short'],
+    )
+    return simular_sinais(sinal, direcao, _abrir(pasta, 'open'), close)
+
+
+def _avaliar_lote(symbol, pasta, lote):
+    return [dict(params, symbol=symbol, **avaliar_combinacao(pasta, params)) for params in lote]
+
+
+# === 🧭 Geração das combinações === #
+
+def combinacoes_grade(grade):
+    nomes = list(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[n] for n in nomes))]
+
+
+def combinacoes_aleatorias(grade, quantidade, seed=0):
+    rng = random.Random(seed)
+    todas = combinacoes_grade(grade)
+    amostra = rng.sample(todas, min(quantidade, len(todas)))
+    # Agrupa por Supertrend para aproveitar o cache de direções dentro de cada lote
+    return sorted(amostra, key=lambda c: (c['st_window'], c['multiplier']))
+
+
+# === 🚀 Execução === #
+
+def otimizar(datasets, combinacoes, workers=None, pasta_trabalho=None):
+    """
+    Avalia todas as `combinacoes` em cada dataset ({symbol: Candles}).
+    `workers=1` roda no processo atual (linha de base de um núcleo).
+    Retorna a lista de resultados ordenada por PnL total entre os símbolos.
+    """
+    grade = {
+        'st_window': sorted({c['st_window'] for c in combinacoes}),
+        'rsi_window': sorted({c['rsi_window'] for c in combinacoes}),
+    }
+    temporaria = pasta_trabalho is None
+    pasta_trabalho = pasta_trabalho or tempfile.mkdtemp(prefix="charlie_otimizador_")
+
+    try:
+        pastas = {
+            symbol: preparar_dados(candles, grade, os.path.join(pasta_trabalho, symbol))
+            for symbol, candles in datasets.items()
+        }
+        lotes = [
+            (symbol, pasta, combinacoes[i:i + TAMANHO_LOTE])
+            for symbol, pasta in pastas.items()
+            for i in range(0, len(combinacoes), TAMANHO_LOTE)
+        ]
+
+        resultados = []
+        if workers == 1:
+            for lote in lotes:
+                resultados.extend(_avaliar_lote(*lote))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for parcial in pool.map(_avaliar_lote, *zip(*lotes)):
+                    resultados.extend(parcial)
+    finally:
+        _ABERTOS.clear()
+        _DIRECOES.clear()
+        if temporaria:
+            shutil.rmtree(pasta_trabalho, ignore_errors=True)
+
+    return ranquear(resultados)
+
+
+def ranquear(resultados):
+    """Agrega por combinação (soma entre símbolos) e ordena por PnL decrescente."""
+    agregados = {}
+    for r in resultados:
+        chave = tuple((k, r[k]) for k in GRADE_PADRAO)
+        a = agregados.setdefault(chave, dict(chave, pnl=0.0, trades=0, vencedores=0.0, max_dd_trades=0.0))
+        a['pnl'] += r['pnl']
+        a['trades'] += r['trades']
+        a['vencedores'] += r['hit_rate'] * r['trades']
+        a['max_dd_trades'] = max(a['max_dd_trades'], r['max_dd_trades'])
+
+    tabela = []
+    for a in agregados.values():
+        a['hit_rate'] = a.pop('vencedores') / a['trades'] if a['trades'] else 0.0
+        tabela.append(a)
+    tabela.sort(key=lambda a: a['pnl'], reverse=True)
+    for posicao, a in enumerate(tabela, 1):
+        a['rank'] = posicao
+    return tabela
+
+
+def salvar_tabela(tabela, caminho):
+    colunas = ['rank', *GRADE_PADRAO, 'pnl', 'trades', 'hit_rate', 'max_dd_trades']
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=colunas, extrasaction="ignore")
+        escritor.writeheader()
+        escritor.writerows(tabela)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Otimizador de parâmetros Supertrend/RSI da CharlieCore")
+    parser.add_argument("arquivos", nargs="+", help="klines históricos (CSV/Parquet/NPY), um por símbolo")
+    parser.add_argument("--workers", type=int, default=None, help="processos (1 = linha de base de um núcleo)")
+    parser.add_argument("--aleatorio", type=int, default=0, help="amostra N combinações em vez da grade completa")
+    parser.add_argument("--saida", default="otimizacao.csv")
+    parser.add_argument("--comparar", action="store_true", help="roda também com 1 núcleo e mostra o speedup")
+    args = parser.parse_args()
+
+    datasets = {
+        os.path.basename(c).split("_")[0].split(".")[0].upper(): carregar_candles(c) for c in args.arquivos
+    }
+    combinacoes = (combinacoes_aleatorias(GRADE_PADRAO, args.aleatorio) if args.aleatorio
+                   else combinacoes_grade(GRADE_PADRAO))
+    print(f"🧬 Avaliando {len(combinacoes)} combinações em {len(datasets)} símbolo(s)...")
+
+    inicio = time.perf_counter()
+    tabela = otimizar(datasets, combinacoes, workers=args.workers)
+    paralelo = time.perf_counter() - inicio
+    print(f"⚡ {args.workers or os.cpu_count()} worker(s): {paralelo:.2f}s")
+
+    if args.comparar:
+        inicio = time.perf_counter()
+        otimizar(datasets, combinacoes, workers=1)
+        serial = time.perf_counter() - inicio
+        print(f"🐢 1 núcleo: {serial:.2f}s | speedup: {serial / paralelo:.1f}x")
+
+    salvar_tabela(tabela, args.saida)
+    melhor = tabela[0]
+    print(f"🏆 Melhor: {({k: melhor[k] for k in GRADE_PADRAO})} | PnL: {melhor['pnl']:.2f} | Trades: {melhor['trades']}")
+    print(f"📄 Tabela salva em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
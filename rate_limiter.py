@@ -0,0 +1,61 @@
+# rate_limiter.py ⏱️ CharlieCore Rate Limiter — orçamento de peso da API Binance
+import threading
+import time
+
+# Limite padrão de peso de requisições da Binance (spot) por minuto
+PESO_MAXIMO_MINUTO = 1200
+
+
+class TokenBucket:
+    """
+    Balde de tokens thread-safe: `capacidade` tokens, repostos a `taxa` tokens/segundo.
+    `consumir(peso)` bloqueia até haver saldo (ou até `timeout`, retornando False).
+    """
+
+    def __init__(self, capacidade=PESO_MAXIMO_MINUTO, taxa=PESO_MAXIMO_MINUTO / 60, relogio=time.monotonic):
+        self.capacidade = float(capacidade)
+        self.taxa = float(taxa)
+        self._relogio = relogio
+        self._saldo = float(capacidade)
+        self._ultimo = relogio()
+        self._lock = threading.Lock()
+
+    def _repor(self):
+        agora = self._relogio()
+        self._saldo = min(self.capacidade, self._saldo + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def saldo(self):
+        with self._lock:
+            self._repor()
+            return self._saldo
+
+    def reservar(self, peso=1):
+        """Tenta consumir sem bloquear. Retorna 0 se consumiu, ou os segundos a esperar."""
+        peso = min(peso, self.capacidade)
+        with self._lock:
+            self._repor()
+            if self._saldo >= peso:
+                self._saldo -= peso
+                return 0.0
+            return (peso - self._saldo) / self.taxa
+
+    def sincronizar(self, usado):
+        """Ajusta o saldo ao peso já usado informado pelo servidor (ex.: X-MBX-USED-WEIGHT-1M)."""
+        with self._lock:
+            self._repor()
+            self._saldo = min(self._saldo, max(0.0, self.capacidade - float(usado)))
+
+    def consumir(self, peso=1, timeout=None):
+        limite = None if timeout is None else self._relogio() + timeout
+        while True:
+            espera = self.reservar(peso)
+            if not espera:
+                return True
+
+            if limite is not None:
+                restante = limite - self._relogio()
+                if restante <= 0:
+                    return False
+                espera = min(espera, restante)
+            time.sleep(espera)
@@ -0,0 +1,128 @@
+# resample.py 🔀 CharlieCore Resample — timeframes maiores derivados de uma única série base
+import numpy as np
+
+import metricas
+from candles import Candles, CANDLE_DTYPE
+
+# Duração dos intervalos da Binance em ms (buckets alinhados em UTC a partir da época Unix)
+INTERVALO_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+}
+
+
+def razao(base, destino):
+    """Quantos candles `base` cabem em um candle `destino` (destino precisa ser múltiplo)."""
+    if INTERVALO_MS[destino] % INTERVALO_MS[base]:
+        raise ValueError(f"{destino} não é múltiplo de {base}.")
+    return INTERVALO_MS[destino] // INTERVALO_MS[base]
+
+
+def reamostrar(candles, base, destino, incluir_parcial=True, descartar_inicial=True):
+    """
+    Agrega `candles` do intervalo `base` em candles `destino` alinhados aos buckets UTC da Binance.
+    O bucket inicial é descartado se não começa no início do bucket (abertura desconhecida),
+    a menos que `descartar_inicial=False` (continuação de uma série já agregada).
+    O último bucket, se incompleto, é mantido como candle em formação quando `incluir_parcial` —
+    igual à API REST. Um bucket intermediário com candles base faltando (ex.: manutenção da
+    corretora) é mantido, agregado só com os candles presentes, e contado na métrica
+    `reamostragem_incompleta` — descartá-lo abriria um buraco na série `destino`.
+    """
+    if base == destino:
+        return candles
+    n_base = razao(base, destino)
+    duracao = INTERVALO_MS[destino]
+    if not len(candles):
+        return Candles(np.empty(0, dtype=CANDLE_DTYPE))
+
+    buckets = candles.open_time - candles.open_time % duracao
+    inicios = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    fins = np.concatenate((inicios[1:], [len(candles)])) - 1
+    contagem = fins - inicios + 1
+
+    data = np.empty(len(inicios), dtype=CANDLE_DTYPE)
+    data['open_time'] = buckets[inicios]
+    data['open'] = candles.open[inicios]
+    data['high'] = np.maximum.reduceat(candles.high, inicios)
+    data['low'] = np.minimum.reduceat(candles.low, inicios)
+    data['close'] = candles.close[fins]
+    data['volume'] = np.add.reduceat(candles.volume, inicios)
+    data['close_time'] = buckets[inicios] + duracao - 1
+
+    completos = contagem == n_base
+    manter = np.ones(len(inicios), dtype=bool)
+    manter[0] = not descartar_inicial or candles.open_time[0] == buckets[0]
+    if not incluir_parcial and not completos[-1]:
+        manter[-1] = False
+
+    incompletos = manter & ~completos
+    incompletos[-1] = False  # o último é o candle em formação, não um buraco
+    if incompletos.any():
+        metricas.contar("reamostragem_incompleta", int(incompletos.sum()), base=base, destino=destino)
+    return Candles(data[manter])
+
+
+class Reamostrador:
+    """
+    Versão incremental de `reamostrar`: recebe só os candles base fechados novos e agrega só
+    os buckets que eles fecham. Guarda os últimos `max_len` candles `destino` fechados e os
+    candles base do bucket ainda aberto; o resultado é o mesmo da reamostragem em lote.
+    """
+
+    def __init__(self, base, destino, max_len=1000):
+        razao(base, destino)
+        self.base = base
+        self.destino = destino
+        self.max_len = max_len
+        self.duracao = INTERVALO_MS[destino]
+        self.ultimo_open = None
+        self._fechados = np.empty(0, dtype=CANDLE_DTYPE)
+        self._pendentes = np.empty(0, dtype=CANDLE_DTYPE)
+        self._primeiro = True   # o primeiro bucket ainda não foi decidido (pode ter abertura desconhecida)
+
+    def adicionar(self, candles):
+        """Anexa candles base fechados; os já vistos são ignorados. Retorna quantos candles `destino` fecharam."""
+        novos = candles.data
+        if self.ultimo_open is not None:
+            novos = novos[novos['open_time'] > self.ultimo_open]
+        if not len(novos):
+            return 0
+        self.ultimo_open = int(novos['open_time'][-1])
+
+        lote = np.concatenate((self._pendentes, novos))
+        ultimo_bucket = lote['open_time'][-1] - lote['open_time'][-1] % self.duracao
+        if lote['close_time'][-1] == ultimo_bucket + self.duracao - 1:
+            corte = len(lote)   # o último candle base fecha o bucket
+        else:
+            corte = int(np.searchsorted(lote['open_time'], ultimo_bucket, side="left"))
+        self._pendentes = lote[corte:].copy()
+        if not corte:
+            return 0
+
+        fechados = reamostrar(Candles(lote[:corte]), self.base, self.destino, descartar_inicial=self._primeiro).data
+        self._primeiro = False
+        self._fechados = np.concatenate((self._fechados, fechados))[-self.max_len:]
+        return len(fechados)
+
+    def candles(self, em_formacao=None):
+        """Candles `destino` fechados e, por último, o bucket em formação (com o candle base `em_formacao`)."""
+        parcial = self._pendentes
+        if em_formacao is not None and len(em_formacao):
+            extra = em_formacao.data
+            if self.ultimo_open is not None:
+                extra = extra[extra['open_time'] > self.ultimo_open]
+            parcial = np.concatenate((parcial, extra))
+        if not len(parcial):
+            return Candles(self._fechados)
+        agregado = reamostrar(Candles(parcial), self.base, self.destino, descartar_inicial=self._primeiro).data
+        return Candles(np.concatenate((self._fechados, agregado))[-self.max_len:])
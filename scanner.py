@@ -0,0 +1,260 @@
+# scanner.py 🔭 CharlieCore Scanner — triagem do universo USDT-M e promoção para a lista de observação
+"""
+Duas camadas:
+1. Triagem barata de todo o universo: uma chamada de tickers 24h (todos os pares), filtros
+   vetorizados de volume e volatilidade e, para os melhores pré-candidatos, viradas de
+   Supertrend sobre candles curtos do cache (klines do spot, peso 2 cada), calculadas em lote.
+2. Os `promover` melhores entram na lista completa do Sentinel (`analyze_indicators` + estratégia).
+
+O custo da triagem é limitado por um orçamento de peso de API e de tempo, que também cobre a
+carga fria (`custo_promocao`) de cada par promovido que ainda não está em cache.
+Os candles do pipeline vêm do spot, então só entram na triagem os pares USDT-M que também
+negociam no spot (pares só de futuros, ex.: 1000PEPEUSDT, ficam de fora).
+"""
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+import analytics
+import metricas
+from gateway import obter_gateway, peso_klines
+from indicators.supertrend import supertrend_lote
+
+SUFIXO = "USDT"
+VOLUME_MINIMO = float(os.getenv("SCANNER_VOLUME_MINIMO", "20000000"))        # volume 24h em USDT
+VOLATILIDADE_MINIMA = float(os.getenv("SCANNER_VOLATILIDADE_MINIMA", "0.03"))  # (máx - mín) / último
+PROMOVER = int(os.getenv("SCANNER_PROMOVER", "5"))
+ORCAMENTO_PESO = int(os.getenv("SCANNER_ORCAMENTO_PESO", "200"))
+ORCAMENTO_SEGUNDOS = float(os.getenv("SCANNER_ORCAMENTO_SEGUNDOS", "20"))
+INTERVALO = os.getenv("SCANNER_INTERVALO", "15m")
+HISTORICO = 60          # candles por símbolo na triagem
+JANELA_VIRADA = 3       # virada de Supertrend nos últimos N candles
+BONUS_VIRADA = 1.0      # somado à pontuação (volume e volatilidade valem 0..1 cada)
+MAX_WORKERS = 8
+
+PESO_TICKERS = 40       # /fapi/v1/ticker/24hr sem symbol
+PESO_LISTADOS = 20      # /api/v3/exchangeInfo
+TTL_LISTADOS = 3600     # segundos; listagens mudam raramente
+
+# Uma linha por candidato aprovado nos filtros, em ordem de pontuação
+Candidato = namedtuple(
+    "Candidato",
+    ["symbol", "volume", "volatilidade", "variacao", "direcao", "virada", "pontuacao"],
+)
+
+
+def _campo(tickers, nome):
+    return np.array([float(t.get(nome) or "nan") for t in tickers], dtype=np.float64)
+
+
+def triar_tickers(tickers, volume_minimo=VOLUME_MINIMO, volatilidade_minima=VOLATILIDADE_MINIMA, sufixo=SUFIXO):
+    """
+    Filtros vetorizados sobre o payload de tickers 24h. Pares sem negociação recente
+    (closeTime mais de um dia atrás do mais novo, ex.: deslistados) ficam de fora.
+    Retorna (simbolos, volume, volatilidade, variacao) só dos aprovados.
+    """
+    tickers = [t for t in tickers if t.get('symbol', "").endswith(sufixo)]
+    if not tickers:
+        vazio = np.empty(0)
+        return [], vazio, vazio, vazio
+    simbolos = np.array([t['symbol'] for t in tickers], dtype=object)
+    volume = _campo(tickers, 'quoteVolume')
+    ultimo = _campo(tickers, 'lastPrice')
+    variacao = _campo(tickers, 'priceChangePercent') / 100
+    fechamento = _campo(tickers, 'closeTime')
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatilidade = (_campo(tickers, 'highPrice') - _campo(tickers, 'lowPrice')) / ultimo
+    recente = ~(fechamento < np.nanmax(fechamento) - 86_400_000) if np.isfinite(fechamento).any() else True
+    aprovados = recente & (volume >= volume_minimo) & (volatilidade >= volatilidade_minima)
+    return simbolos[aprovados].tolist(), volume[aprovados], volatilidade[aprovados], variacao[aprovados]
+
+
+def viradas_supertrend(series, janela=JANELA_VIRADA):
+    """
+    `{symbol: Candles}` → ({symbol: direção atual}, {symbol: virou nos últimos `janela` candles}).
+    As séries são cortadas no mesmo tamanho e o Supertrend roda em lote.
+    """
+    tamanho = min((len(c) for c in series.values()), default=0)
+    if tamanho <= janela:
+        return {}, {}
+    simbolos = list(series)
+    high = np.stack([series[s].high[-tamanho:] for s in simbolos])
+    low = np.stack([series[s].low[-tamanho:] for s in simbolos])
+    close = np.stack([series[s].close[-tamanho:] for s in simbolos])
+
+    direcao = supertrend_lote(high, low, close)
+    virou = (direcao[:, -janela:] != direcao[:, -janela - 1:-1]).any(axis=1)
+    return dict(zip(simbolos, direcao[:, -1].tolist())), dict(zip(simbolos, virou.tolist()))
+
+
+def _listados_spot():
+    """Símbolos negociando no spot — o mercado de onde o pipeline lê os candles."""
+    info = obter_gateway().get_exchange_info(symbolStatus="TRADING", showPermissionSets="false")
+    return {s['symbol'] for s in info.get('symbols', []) if s.get('status', "TRADING") == "TRADING"}
+
+
+class Scanner:
+    """
+    `buscar_tickers()` devolve a lista de tickers 24h; `buscar_candles(symbol, interval, limit)`
+    devolve `Candles` (por padrão, o mesmo cache de klines do pipeline); `buscar_listados()`
+    devolve os símbolos do mercado de onde esses candles vêm (None desliga o filtro).
+    `custo_promocao(symbol)` é o peso da primeira varredura completa do par no Sentinel (None = grátis):
+    os `promover` melhores fora de `fixos` só são devolvidos se essa carga cabe no orçamento.
+    """
+
+    def __init__(self, buscar_tickers=None, buscar_candles=None, intervalo=INTERVALO,
+                 orcamento_peso=ORCAMENTO_PESO, orcamento_segundos=ORCAMENTO_SEGUNDOS,
+                 volume_minimo=VOLUME_MINIMO, volatilidade_minima=VOLATILIDADE_MINIMA, workers=MAX_WORKERS,
+                 buscar_listados=_listados_spot, ttl_listados=TTL_LISTADOS,
+                 fixos=(), promover=PROMOVER, custo_promocao=None):
+        self._buscar_tickers = buscar_tickers or (lambda: obter_gateway().futures_ticker_24h())
+        self._buscar_candles = buscar_candles or _candles_do_cache
+        self._buscar_listados = buscar_listados
+        self.ttl_listados = ttl_listados
+        self._listados = None
+        self._validade_listados = 0.0
+        self.intervalo = intervalo
+        self.orcamento_peso = orcamento_peso
+        self.orcamento_segundos = orcamento_segundos
+        self.volume_minimo = volume_minimo
+        self.volatilidade_minima = volatilidade_minima
+        self.workers = workers
+        self.fixos = set(fixos)
+        self.promover = promover
+        self._custo_promocao = custo_promocao
+        self.ultima = {}
+
+    def varrer(self):
+        """Triagem completa dentro do orçamento. Retorna a lista de `Candidato` ordenada."""
+        inicio = time.monotonic()
+        with metricas.cronometro("scanner", etapa="tickers"):
+            tickers = self._buscar_tickers()
+        peso = PESO_TICKERS
+        universo = len(tickers)
+        if self._buscar_listados is not None:
+            listados, custo = self._obter_listados()
+            peso += custo
+            tickers = [t for t in tickers if t.get('symbol') in listados]
+
+        simbolos, volume, volatilidade, variacao = triar_tickers(
+            tickers, self.volume_minimo, self.volatilidade_minima)
+        if not simbolos:
+            self.ultima = {'universo': universo, 'aprovados': 0, 'com_candles': 0, 'peso': peso, 'promocao': 0,
+                           'segundos': time.monotonic() - inicio}
+            return []
+
+        # Pré-pontuação só com os tickers: define quem recebe candles primeiro
+        base = (analytics.ranquear(np.log(volume)[:, None])[:, 0]
+                + analytics.ranquear(volatilidade[:, None])[:, 0])
+        base = np.nan_to_num(base, nan=1.0)  # com um único aprovado não há ranking
+        ordem = np.argsort(-base, kind="stable")
+
+        # Reserva a carga fria dos prováveis promovidos antes de gastar com candles da triagem
+        reserva = 0
+        for symbol in [simbolos[i] for i in ordem if simbolos[i] not in self.fixos][:self.promover]:
+            custo = self._custo(symbol)
+            if peso + reserva + custo <= self.orcamento_peso:  # o que não cabe nem sozinho não trava a triagem
+                reserva += custo
+        custo = peso_klines(HISTORICO)
+        cabem = max(0, (self.orcamento_peso - peso - reserva) // custo)
+        escolhidos = [simbolos[i] for i in ordem[:cabem]]
+        series = self._coletar(escolhidos, inicio + self.orcamento_segundos - time.monotonic())
+        peso += len(escolhidos) * custo
+
+        with metricas.cronometro("scanner", etapa="supertrend"):
+            direcoes, viradas = viradas_supertrend(series)
+        virou = np.array([viradas.get(s, False) for s in simbolos])
+        pontuacao = base + BONUS_VIRADA * virou
+
+        candidatos = [
+            Candidato(simbolos[i], float(volume[i]), float(volatilidade[i]), float(variacao[i]),
+                      direcoes.get(simbolos[i]), bool(virou[i]), float(pontuacao[i]))
+            for i in np.argsort(-pontuacao, kind="stable")
+        ]
+        candidatos, promocao = self._orcar_promocao(candidatos, peso)
+        peso += promocao
+        self.ultima = {'universo': universo, 'aprovados': len(simbolos), 'com_candles': len(series),
+                       'peso': peso, 'promocao': promocao, 'segundos': time.monotonic() - inicio}
+        metricas.contar("scanner_peso", peso)
+        return candidatos
+
+    def _custo(self, symbol):
+        return self._custo_promocao(symbol) if self._custo_promocao is not None else 0
+
+    def _orcar_promocao(self, candidatos, peso):
+        """
+        Cobra a carga fria dos `promover` melhores candidatos fora de `fixos`; quem não cabe no
+        que resta do orçamento sai da lista e a vaga passa ao próximo. Retorna (candidatos, peso cobrado).
+        """
+        aceitos, promovidos, cobrado = [], 0, 0
+        for c in candidatos:
+            if c.symbol not in self.fixos and promovidos < self.promover:
+                custo = self._custo(c.symbol)
+                if peso + cobrado + custo > self.orcamento_peso:
+                    continue
+                cobrado += custo
+                promovidos += 1
+            aceitos.append(c)
+        return aceitos, cobrado
+
+    def _obter_listados(self):
+        """(símbolos listados, peso gasto): renovados só depois de `ttl_listados` segundos."""
+        if self._listados is not None and time.monotonic() < self._validade_listados:
+            return self._listados, 0
+        self._listados = set(self._buscar_listados())
+        self._validade_listados = time.monotonic() + self.ttl_listados
+        return self._listados, PESO_LISTADOS
+
+    def _coletar(self, simbolos, restante):
+        """Candles dos `simbolos` em paralelo; o que não chegar dentro de `restante` segundos fica de fora."""
+        if not simbolos or restante <= 0:
+            return {}
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futuros = {pool.submit(self._buscar_candles, s, self.intervalo, HISTORICO): s for s in simbolos}
+            prontos, _ = wait(futuros, timeout=restante)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        series = {}
+        for futuro in prontos:
+            try:
+                candles = futuro.result()
+            except Exception as e:
+                print(f"⚠️ Scanner sem candles de {futuros[futuro]}: {e}")
+                continue
+            if candles is not None and len(candles) > JANELA_VIRADA:
+                series[futuros[futuro]] = candles
+        return series
+
+
+def _candles_do_cache(symbol, interval, limit):
+    from indicators.indicators import carregar_candles
+
+    return carregar_candles(symbol, interval, limit=limit)
+
+
+def promover(candidatos, fixos, quantidade=PROMOVER):
+    """Lista de observação: os `fixos` e, em seguida, os `quantidade` melhores candidatos novos."""
+    novos = [c.symbol for c in candidatos if c.symbol not in fixos][:quantidade]
+    return list(fixos) + novos
+
+
+def resumo_varredura(candidatos, scanner, promovidos):
+    """Linhas do relatório com o custo da triagem e os candidatos promovidos."""
+    u = scanner.ultima
+    linhas = [
+        f"🔭 Scanner: {u.get('aprovados', 0)}/{u.get('universo', 0)} pares nos filtros | "
+        f"{u.get('com_candles', 0)} com Supertrend | peso {u.get('peso', 0)} | {u.get('segundos', 0):.1f}s"
+    ]
+    for c in (c for c in candidatos if c.symbol in promovidos):
+        tendencia = {1: "Alta", -1: "Baixa"}.get(c.direcao, "?")
+        linhas.append(
+            f"   • {c.symbol}: vol {c.volume / 1e6:.0f}M | amplitude {c.volatilidade:.1%} | "
+            f"24h {c.variacao:+.1%} | Trend {tendencia}{' 🔁 virou' if c.virada else ''}"
+        )
+    return linhas
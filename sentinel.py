@@ -1,75 +1,390 @@
 # sentinel.py 🚨 CharlieCore Sentinel + Emotional Voice Ops v5.0
 
+import os
+import sys
 import time
-from indicators.indicators import analyze_indicators, verificar_inicio_rsi
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from indicators.indicators import (
+    carregar_candles, calcular_indicadores, analyze_indicators_multi, verificar_inicio_rsi, inicio_rsi_candles,
+    limite_base, descartar_series,
+)
+from data import kline_cache
+from kline_cache import LIMITE_PAGINA
+from gateway import peso_klines
 from discord_bot import enviar_relatorio, enviar_alerta_entrada
-from estrategia import avaliar_estrategia
+from estrategia import classificar_estrategia, renderizar_sinal, ENTRADAS
 from charlie_voice import falar
+from voice_logger import registrar_evento, SINAL, ALERTA, RELATORIO
+from estado_sinais import EstadoSinais, relatorio_delta, ERRO
+import analytics
+from ambiente import iniciar
+import metricas
 
 SYMBOLS = ["BTCUSDT", "ETHUSDT", "SUIUSDT", "XRPUSDT", "DOGEUSDT", "PEPEUSDT", "SOLUSDT"]
 INTERVALS = ["15m", "1h", "4h"]
 INTERVALO_SEGUNDOS = 900  # 15 minutos
+INTERVALS_STREAM = ["5m"] + INTERVALS  # entradas só são autorizadas no 5m
+
+# ⚙️ Varredura concorrente
+MODO_CONCORRENTE = os.getenv("SENTINEL_CONCORRENTE", "1") != "0"
+MAX_WORKERS = int(os.getenv("SENTINEL_WORKERS", "6"))
+# Prazo único da varredura, contado do envio ao pool: pares na fila não consomem o prazo uns dos
+# outros e a varredura nunca passa disso. Cada chamada HTTP já tem o próprio timeout no gateway.
+TIMEOUT_VARREDURA_SEGUNDOS = float(os.getenv("SENTINEL_TIMEOUT_VARREDURA", "60"))
+
+# 🔀 Reamostragem: 15m/1h/4h derivados de uma única série 5m por símbolo
+MODO_REAMOSTRAGEM = os.getenv("SENTINEL_REAMOSTRAR", "1") != "0"
+INTERVALO_BASE = "5m"
+
+# 🧭 Só transições: relatório, alertas e voz saem apenas quando decisão/regime/alerta mudam
+MODO_TRANSICOES = os.getenv("SENTINEL_SO_TRANSICOES", "1") != "0"
+
+# 🔭 Scanner do universo USDT-M: os melhores candidatos entram na varredura junto com SYMBOLS
+MODO_SCANNER = os.getenv("SENTINEL_SCANNER", "0") == "1"
+
+# 🔗 Correlação/beta contra o BTC e força relativa, sobre os mesmos candles já analisados
+INTERVALO_CRUZADO = os.getenv("SENTINEL_INTERVALO_CRUZADO", "1h")
+JANELA_CRUZADA = int(os.getenv("SENTINEL_JANELA_CRUZADA", str(analytics.JANELA_PADRAO)))
+
+
+def _analisar_par(symbol, interval, coleta=None):
+    """
+    Busca e analisa um par (symbol, interval). Não fala nem envia nada:
+    apenas devolve (result, decisao, inicio_rsi) para montagem do relatório.
+    Os candles de `INTERVALO_CRUZADO` ficam em `coleta` para a análise cruzada.
+    """
+    candles = carregar_candles(symbol, interval)
+    if coleta is not None and interval == INTERVALO_CRUZADO:
+        coleta[symbol] = candles
+    with metricas.contexto(symbol=symbol, interval=interval):
+        result = calcular_indicadores(candles)
+    with metricas.cronometro("estrategia", symbol=symbol, interval=interval):
+        sinal = classificar_estrategia(result['rsi'], result['obv'], result['supertrend'], interval)
+    decisao = renderizar_sinal(sinal)
+
+    inicio_rsi = False
+    if sinal in ENTRADAS:
+        inicio_rsi = verificar_inicio_rsi(symbol)
+
+    return result, decisao, inicio_rsi
+
+
+def _analisar_simbolo(symbol, coleta=None):
+    """
+    Uma única busca da série base por símbolo; todos os INTERVALS são reamostrados dela
+    e o início de ciclo do RSI 5m usa os mesmos candles. Erros ficam por intervalo.
+    """
+    series = {}
+    resultados, candles_base = analyze_indicators_multi(symbol, INTERVALS, base=INTERVALO_BASE, series=series)
+    if coleta is not None and INTERVALO_CRUZADO in INTERVALS:
+        coleta[symbol] = series[INTERVALO_CRUZADO]
+
+    saida = {}
+    for interval in INTERVALS:
+        try:
+            result = resultados[interval]
+            with metricas.cronometro("estrategia", symbol=symbol, interval=interval):
+                sinal = classificar_estrategia(result['rsi'], result['obv'], result['supertrend'], interval)
+            decisao = renderizar_sinal(sinal)
+            inicio_rsi = False
+            if sinal in ENTRADAS:
+                inicio_rsi = inicio_rsi_candles(candles_base)
+            saida[interval] = (result, decisao, inicio_rsi)
+        except Exception as e:
+            saida[interval] = e
+    return saida
+
+
+def _do_simbolo(saida, interval):
+    resultado = saida[interval]
+    if isinstance(resultado, Exception):
+        raise resultado
+    return resultado
+
+
+def _registrar_par(relatorio, symbol, interval, obter_resultado, estado=None):
+    """
+    Linha do par no relatório completo. Com `estado`, evento, alerta e voz só saem
+    se o par mudou de decisão/regime ou se o alerta acabou de ligar (fora do cooldown).
+    """
+    try:
+        result, decisao, inicio_rsi = obter_resultado()
+
+        linha = (
+            f"   ⏱ Intervalo: {interval} | "
+            f"RSI: {result['rsi']:.2f} | "
+            f"OBV: {result['obv']:.2f} | "
+            f"Trend: {'Alta ✅' if result['supertrend'] > 0 else 'Baixa ⚠️'}"
+        )
+
+        print(linha)
+        relatorio.append(linha)
+        relatorio.append(f"   💡 Estratégia sugerida: {decisao}")
+
+        mudanca = None
+        if estado is not None:
+            mudanca = estado.avaliar(symbol, interval, decisao, estado.regime(symbol, interval, result), inicio_rsi)
+        if mudanca is None or mudanca.mudou:
+            registrar_evento(SINAL, decisao, symbol=symbol, interval=interval, rsi=result['rsi'],
+                             obv=result['obv'], supertrend=result['supertrend'], price=result['price'])
+
+        # ⚡ Alerta com voz confiante e envio pro Discord
+        alertar = inicio_rsi if mudanca is None else mudanca.alertar
+        if alertar:
+            mensagem_alerta = (
+                f"🎯 {symbol} | Intervalo: {interval} | "
+                f"Preço: {result['price']:.4f} | "
+                f"{decisao} | ⏱ {result['timestamp']}"
+            )
+            enviar_alerta_entrada(mensagem_alerta)
+            registrar_evento(ALERTA, mensagem_alerta, emocao="confiante", symbol=symbol, interval=interval)
+            falar(f"Alerta de entrada autorizado para {symbol} no intervalo {interval}.", emocao="confiante")
+
+    except Exception as e:
+        if isinstance(e, FuturesTimeout):
+            e = f"varredura excedeu o prazo de {TIMEOUT_VARREDURA_SEGUNDOS:.0f}s"
+        erro = f"   ❌ Erro em {symbol} [{interval}]: {e}"
+        print(erro)
+        relatorio.append(erro)
+        # Erro persistente (ex.: API fora) é falado só na primeira vez
+        if estado is None or estado.avaliar(symbol, interval, ERRO, ERRO).mudou:
+            falar(f"Ocorreu um erro crítico ao analisar {symbol} em {interval}.", emocao="tensa")
+
+
+def _analise_cruzada(relatorio, posicoes, coleta, simbolos):
+    """
+    Correlação/beta contra o BTC e força relativa de todos os símbolos coletados em uma passada
+    vetorizada; preenche a linha de cada altcoin no relatório e publica a análise para a estratégia.
+    """
+    series = {symbol: coleta[symbol] for symbol in simbolos if symbol in coleta}
+    analise = None
+    if analytics.BENCHMARK in series:
+        try:
+            with metricas.cronometro("analise_cruzada", interval=INTERVALO_CRUZADO):
+                analise = analytics.analisar_universo(series, janela=JANELA_CRUZADA)
+            analytics.publicar(INTERVALO_CRUZADO, analise)
+        except Exception as e:
+            print(f"⚠️ Falha na análise cruzada: {e}")
+
+    for symbol, posicao in posicoes.items():
+        dados = analytics.resumo(analise, symbol) if analise and symbol in analise.simbolos else None
+        relatorio[posicao] = analytics.linha_relatorio(symbol, dados, janela=JANELA_CRUZADA, interval=INTERVALO_CRUZADO)
+    return analise
+
+
+_scanner = None
+_vigiados = set()
+
+
+def custo_promocao(symbol):
+    """
+    Peso de API da primeira varredura de um par promovido pelo scanner: a carga fria das séries
+    que `run_analysis` lê. Séries já em memória só custam o delta, como as dos pares fixos (0 aqui).
+    """
+    if MODO_REAMOSTRAGEM:
+        series = [(INTERVALO_BASE, limite_base(INTERVALO_BASE, INTERVALS))]
+    else:
+        series = [(interval, 200) for interval in INTERVALS]
+    custo = 0
+    for interval, limite in series:
+        if kline_cache.tamanho(symbol, interval) < limite - 1:
+            paginas = -(-limite // LIMITE_PAGINA)
+            custo += paginas * peso_klines(min(limite, LIMITE_PAGINA))
+    return custo
+
+
+def liberar_fora_de_rotacao(simbolos):
+    """
+    Descarta cache de klines, candles em disco e séries reamostradas dos pares que saíram da
+    lista de observação desde a chamada anterior. Retorna esses pares.
+    """
+    global _vigiados
+    fora = _vigiados - set(simbolos)
+    _vigiados = set(simbolos)
+    for symbol in fora:
+        kline_cache.esquecer(symbol)
+        descartar_series(symbol)
+    return fora
+
+
+def lista_observacao():
+    """
+    SYMBOLS mais os candidatos promovidos pelo scanner (se `MODO_SCANNER`).
+    Retorna (simbolos, linhas do resumo da triagem). Falha no scanner mantém só SYMBOLS.
+    """
+    global _scanner
+    if not MODO_SCANNER:
+        return list(SYMBOLS), []
+    from scanner import Scanner, promover, resumo_varredura
+
+    if _scanner is None:
+        _scanner = Scanner(fixos=SYMBOLS, custo_promocao=custo_promocao)
+    try:
+        with metricas.cronometro("ciclo_scanner"):
+            candidatos = _scanner.varrer()
+    except Exception as e:
+        print(f"⚠️ Scanner indisponível: {e}")
+        return list(SYMBOLS), []
+    simbolos = promover(candidatos, SYMBOLS)
+    return simbolos, resumo_varredura(candidatos, _scanner, simbolos[len(SYMBOLS):])
+
+
+def run_analysis(concorrente=None, reamostrar=None, simbolos=None, triagem=None, estado=None):
+    """
+    Executa a varredura de todos os pares. No modo concorrente, as buscas e análises
+    rodam num pool limitado de threads e o relatório é montado na ordem fixa symbol/interval.
+    Com `reamostrar`, cada símbolo faz uma única busca 5m e deriva os demais intervalos.
+    `simbolos` (padrão SYMBOLS) vem de `lista_observacao`; `triagem` são as linhas do scanner.
+    Com `estado` (`EstadoSinais`), as transições do ciclo ficam em `estado.mudancas` e a voz
+    só anuncia o ciclo quando algo mudou.
+    """
+    if concorrente is None:
+        concorrente = MODO_CONCORRENTE
+    if reamostrar is None:
+        reamostrar = MODO_REAMOSTRAGEM
+    simbolos = list(simbolos or SYMBOLS)
 
-def run_analysis():
     relatorio = []
     relatorio.append("=" * 60)
     relatorio.append("📡 CharlieCore Sentinel Report Iniciado")
     relatorio.append("=" * 60)
+    relatorio.extend(triagem or [])
 
-    falar("Iniciando varredura de ativos. Relatório tático em andamento.", emocao="neutra")
-
-    for symbol in SYMBOLS:
-        relatorio.append(f"\n🧠 Ativo Monitorado: {symbol}")
-        if symbol != "BTCUSDT":
-            relatorio.append("   🔄 Altcoin em foco: possível desacoplamento em análise.")
-
-        for interval in INTERVALS:
-            try:
-                result = analyze_indicators(symbol, interval)
-                decisao = avaliar_estrategia(result['rsi'], result['obv'], result['supertrend'], interval)
-
-                linha = (
-                    f"   ⏱ Intervalo: {interval} | "
-                    f"RSI: {result['rsi']:.2f} | "
-                    f"OBV: {result['obv']:.2f} | "
-                    f"Trend: {'Alta ✅' if result['supertrend'] > 0 else 'Baixa ⚠️'}"
-                )
-
-                print(linha)
-                relatorio.append(linha)
-                relatorio.append(f"   💡 Estratégia sugerida: {decisao}")
-
-                # ⚡ Alerta com voz confiante e envio pro Discord
-                if ("entrada LONG" in decisao or "entrada SHORT" in decisao) and verificar_inicio_rsi(symbol):
-                    mensagem_alerta = (
-                        f"🎯 {symbol} | Intervalo: {interval} | "
-                        f"Preço: {result['price']:.4f} | "
-                        f"{decisao} | ⏱ {result['timestamp']}"
-                    )
-                    enviar_alerta_entrada(mensagem_alerta)
-                    falar(f"Alerta de entrada autorizado para {symbol} no intervalo {interval}.", emocao="confiante")
-
-            except Exception as e:
-                erro = f"   ❌ Erro em {symbol} [{interval}]: {e}"
-                print(erro)
-                relatorio.append(erro)
-                falar(f"Ocorreu um erro crítico ao analisar {symbol} em {interval}.", emocao="tensa")
-
-    falar("Varredura finalizada. Aguardando o próximo ciclo.", emocao="neutra")
+    if estado is None:
+        falar("Iniciando varredura de ativos. Relatório tático em andamento.", emocao="neutra")
+
+    coleta = {}      # symbol → candles de INTERVALO_CRUZADO
+    posicoes = {}    # symbol → linha do relatório preenchida pela análise cruzada
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS) if concorrente else None
+    futuros = {}
+    prazo = time.monotonic() + TIMEOUT_VARREDURA_SEGUNDOS
+    restante = lambda: max(0.0, prazo - time.monotonic())
+    if pool:
+        for symbol in simbolos:
+            if reamostrar:
+                futuros[symbol] = pool.submit(_analisar_simbolo, symbol, coleta)
+            else:
+                for interval in INTERVALS:
+                    futuros[(symbol, interval)] = pool.submit(_analisar_par, symbol, interval, coleta)
+
+    try:
+        for symbol in simbolos:
+            relatorio.append(f"\n🧠 Ativo Monitorado: {symbol}")
+            if symbol != analytics.BENCHMARK:
+                posicoes[symbol] = len(relatorio)
+                relatorio.append("")
+
+            saida_simbolo = []
+            for interval in INTERVALS:
+                if reamostrar:
+                    def obter(s=symbol, i=interval):
+                        if not saida_simbolo:
+                            try:
+                                saida_simbolo.append(futuros[s].result(timeout=restante()) if pool
+                                                     else _analisar_simbolo(s, coleta))
+                            except Exception as e:
+                                saida_simbolo.append({intervalo: e for intervalo in INTERVALS})
+                        return _do_simbolo(saida_simbolo[0], i)
+                elif pool:
+                    futuro = futuros[(symbol, interval)]
+                    obter = lambda f=futuro: f.result(timeout=restante())
+                else:
+                    obter = lambda s=symbol, i=interval: _analisar_par(s, i, coleta)
+                _registrar_par(relatorio, symbol, interval, obter, estado)
+    finally:
+        if pool:
+            # Pares travados não seguram a próxima varredura
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    _analise_cruzada(relatorio, posicoes, coleta, simbolos)
+    if estado is None:
+        falar("Varredura finalizada. Aguardando o próximo ciclo.", emocao="neutra")
+    elif estado.mudancas:
+        falar(f"Varredura finalizada com {len(estado.mudancas)} mudanças de sinal.", emocao="neutra")
     relatorio.append("\n⚡ CharlieCore em alerta. Aguardando próximo comando.")
     return "\n".join(relatorio)
 
+estado_sinais = None
+
+
+def obter_estado():
+    """Estado dos sinais compartilhado (recarregado do disco), ou None com SENTINEL_SO_TRANSICOES=0."""
+    global estado_sinais
+    if MODO_TRANSICOES and estado_sinais is None:
+        estado_sinais = EstadoSinais()
+    return estado_sinais
+
+
 def main():
+    iniciar()
+    metricas.configurar_por_ambiente()
+    estado = obter_estado()
     while True:
         print("\n" + "=" * 50)
         print("🚨 CharlieCore Sentinel: Nova varredura iniciada")
         print("=" * 50)
 
-        relatorio = run_analysis()
-        enviar_relatorio(relatorio)
+        primeiro_ciclo = estado is not None and not len(estado)
+        simbolos, triagem = lista_observacao()
+        if estado is not None:
+            estado.podar(simbolos)  # pares que saíram da rotação do scanner não ficam no estado
+        liberar_fora_de_rotacao(simbolos)  # nem no cache de klines ou em disco
+        with metricas.cronometro("ciclo_varredura"):
+            relatorio = run_analysis(simbolos=simbolos, triagem=triagem, estado=estado)
+        if estado is not None:
+            mudancas = estado.fechar_ciclo()
+            metricas.contar("transicoes", len(mudancas))
+            if not primeiro_ciclo:
+                relatorio = relatorio_delta(mudancas, total=len(simbolos) * len(INTERVALS))
+                if not mudancas:
+                    relatorio = None
+                    print("💤 Nenhuma transição de sinal: nada enviado.")
+        if relatorio:
+            enviar_relatorio(relatorio)
+            registrar_evento(RELATORIO, relatorio)
 
         print("⏳ Aguardando 15 minutos até a próxima varredura...")
         time.sleep(INTERVALO_SEGUNDOS)
 
+def _ao_sinal_stream(symbol, interval, snap, decisao, inicio_rsi):
+    print(
+        f"📶 {symbol} [{interval}] fechou | RSI: {snap['rsi']:.2f} | "
+        f"Trend: {'Alta ✅' if snap['supertrend'] > 0 else 'Baixa ⚠️'} | {decisao}"
+    )
+    if estado_sinais is not None:
+        regime_atual = estado_sinais.regime(symbol, interval, snap)
+        mudanca = estado_sinais.avaliar(symbol, interval, decisao, regime_atual, inicio_rsi)
+        if mudanca.mudou or mudanca.alertar:
+            estado_sinais.fechar_ciclo()
+        inicio_rsi = mudanca.alertar
+    if inicio_rsi:
+        mensagem_alerta = (
+            f"🎯 {symbol} | Intervalo: {interval} | "
+            f"Preço: {snap['price']:.4f} | "
+            f"{decisao} | ⏱ {snap['timestamp']}"
+        )
+        enviar_alerta_entrada(mensagem_alerta)
+        registrar_evento(ALERTA, mensagem_alerta, emocao="confiante", symbol=symbol, interval=interval)
+        falar(f"Alerta de entrada autorizado para {symbol} no intervalo {interval}.", emocao="confiante")
+
+def main_stream(fonte=None):
+    """
+    Modo orientado a eventos: estado dos indicadores atualizado a cada candle fechado
+    recebido pelo WebSocket (ou por uma fonte de replay local).
+    """
+    import asyncio
+    from kline_stream import KlineStream
+
+    iniciar()
+    metricas.configurar_por_ambiente()
+    obter_estado()
+    print("📶 CharlieCore Sentinel: modo stream (WebSocket) iniciado")
+    stream = KlineStream(SYMBOLS, INTERVALS_STREAM, ao_sinal=_ao_sinal_stream, fonte=fonte)
+    stream.semear()
+    asyncio.run(stream.executar())
+
 if __name__ == "__main__":
-    main()
+    if "--stream" in sys.argv or os.getenv("SENTINEL_MODO") == "stream":
+        main_stream()
+    else:
+        main()
@@ -0,0 +1,83 @@
+# test_analytics.py 🧪 Correlação/beta móveis e força relativa contra referências diretas
+import numpy as np
+import pytest
+
+import analytics
+from candles import Candles, CANDLE_DTYPE
+
+
+def _candles(open_time, close):
+    data = np.zeros(len(close), dtype=CANDLE_DTYPE)
+    data['open_time'] = open_time
+    data['close'] = close
+    return Candles(data)
+
+
+def _universo(n=300, simbolos=5, seed=7):
+    rng = np.random.default_rng(seed)
+    btc = rng.normal(0, 0.01, n)
+    retornos = [btc] + [0.8 * btc * (i + 1) / simbolos + rng.normal(0, 0.01, n) for i in range(simbolos - 1)]
+    tempos = np.arange(n, dtype=np.int64) * 3_600_000
+    nomes = ["BTCUSDT"] + [f"ALT{i}USDT" for i in range(1, simbolos)]
+    return {nome: _candles(tempos, 100 * np.exp(np.cumsum(r))) for nome, r in zip(nomes, retornos)}
+
+
+def test_correlacao_e_beta_batem_com_calculo_direto():
+    series = _universo()
+    analise = analytics.analisar_universo(series, janela=48)
+
+    btc = np.diff(np.log(series["BTCUSDT"].close))
+    for i, nome in enumerate(analise.simbolos):
+        r = np.diff(np.log(series[nome].close))
+        for t in (48, 120, 299):
+            x, y = r[t - 48:t], btc[t - 48:t]
+            assert analise.correlacao[i, t] == pytest.approx(np.corrcoef(x, y)[0, 1], abs=1e-9)
+            assert analise.beta[i, t] == pytest.approx(np.cov(x, y, bias=True)[0, 1] / np.var(y), abs=1e-9)
+    assert np.isnan(analise.correlacao[:, :48]).all()
+    assert analise.correlacao[0, -1] == pytest.approx(1.0)
+
+
+def test_forca_relativa_ordena_pelo_retorno_da_janela():
+    analise = analytics.analisar_universo(_universo(), janela=24)
+    retorno = analise.retorno[:, -1]
+    forca = analise.forca_relativa[:, -1]
+
+    assert forca[np.argmax(retorno)] == 1.0
+    assert forca[np.argmin(retorno)] == 0.0
+    assert (np.argsort(forca) == np.argsort(retorno)).all()
+
+
+def test_alinhamento_com_listagem_tardia_e_lacuna():
+    tempos = np.arange(10, dtype=np.int64) * 60_000
+    series = {
+        "BTCUSDT": _candles(tempos, np.arange(1.0, 11.0)),
+        "NOVOUSDT": _candles(tempos[[4, 5, 7, 8, 9]], np.array([5.0, 6.0, 8.0, 9.0, 10.0])),
+    }
+    universo = analytics.alinhar_closes(series)
+
+    assert universo.open_time.tolist() == tempos.tolist()
+    assert np.isnan(universo.close[1, :4]).all()
+    assert universo.close[1, 4:].tolist() == [5.0, 6.0, 6.0, 8.0, 9.0, 10.0]
+
+    analise = analytics.analisar_universo(universo, janela=3)
+    assert np.isnan(analise.correlacao[1, :7]).all()
+    assert np.isfinite(analise.correlacao[1, 7:]).all()
+
+
+def test_universo_sem_benchmark():
+    series = _universo()
+    del series["BTCUSDT"]
+    with pytest.raises(ValueError):
+        analytics.analisar_universo(series)
+
+
+def test_resumo_e_linha_do_relatorio():
+    analise = analytics.analisar_universo(_universo(), janela=48)
+    analytics.publicar("1h", analise)
+
+    dados = analytics.contexto_simbolo("ALT1USDT", "1h")
+    assert dados == analytics.resumo(analise, "ALT1USDT")
+    assert dados['desacoplado'] == (dados['correlacao'] < analytics.LIMIAR_DESACOPLAMENTO)
+    assert "corr" in analytics.linha_relatorio("ALT1USDT", dados, interval="1h")
+    assert "dados insuficientes" in analytics.linha_relatorio("ALT1USDT", None)
+    assert analytics.contexto_simbolo("ALT1USDT", "4h") is None
@@ -0,0 +1,70 @@
+# test_backtest.py 🧪 Backtest offline com a estratégia real
+import numpy as np
+
+from backtest import carregar_candles, executar_backtest, precomputar_indicadores, SimuladorExecucao
+from candles import Candles, CANDLE_DTYPE
+from estrategia import avaliar_estrategia
+from indicators.momentum import rsi_wilder, obv, rsi_ascendente
+
+
+def gerar_dados(n, seed=21):
+    rng = np.random.default_rng(seed)
+    passos = rng.normal(0, 0.1, n) + np.sin(np.arange(n) / 25) * 0.12
+    close = 50 + np.cumsum(passos)
+    data = np.empty(n, dtype=CANDLE_DTYPE)
+    data['open_time'] = 1_700_000_000_000 + np.arange(n) * 300_000
+    data['close_time'] = data['open_time'] + 299_999
+    data['open'] = np.concatenate(([close[0]], close[:-1]))
+    data['close'] = close
+    data['high'] = np.maximum(data['open'], close) + 0.05
+    data['low'] = np.minimum(data['open'], close) - 0.05
+    data['volume'] = rng.uniform(100, 500, n)
+    return data
+
+
+def test_carrega_npy_e_csv(tmp_path):
+    data = gerar_dados(300)
+    np.save(tmp_path / "BTCUSDT_5m.npy", data)
+    candles = carregar_candles(str(tmp_path / "BTCUSDT_5m.npy"))
+    assert len(candles) == 300
+
+    candles.to_pandas().to_csv(tmp_path / "BTCUSDT_5m.csv", index=False)
+    do_csv = carregar_candles(str(tmp_path / "BTCUSDT_5m.csv"))
+    np.testing.assert_allclose(do_csv.close, data['close'])
+    assert do_csv.open_time[-1] == data['open_time'][-1]
+
+
+def test_precomputado_igual_chamadas_ao_vivo():
+    data = gerar_dados(1500)
+    candles = Candles(data)
+    ind = precomputar_indicadores(candles)
+
+    for i in (199, 700, 1499):
+        janela = candles[i - 199:i + 1]
+        assert abs(ind['rsi'][i] - rsi_wilder(janela.close)[-1]) < 1e-9
+        assert abs(ind['obv'][i] - obv(janela.close, janela.volume)[-1]) < 1e-6
+        ultimos = rsi_wilder(candles.close[i - 23:i + 1])[-10:]
+        assert ind['inicio_rsi'][i] == rsi_ascendente(ultimos)
+
+
+def test_backtest_gera_trades_e_metricas():
+    candles = Candles(gerar_dados(5000))
+    res = executar_backtest(candles, symbol="BTCUSDT")
+
+    assert res['trades'] > 0
+    assert 0.0 <= res['hit_rate'] <= 1.0
+    assert res['max_drawdown'] >= 0.0
+    assert abs(res['pnl'] - res['curva'][-1]) < 1e-6
+    for trade in res['lista_trades']:
+        assert trade['saida_ms'] > trade['entrada_ms']
+
+
+def test_simulador_aplica_taxa_e_slippage():
+    sim = SimuladorExecucao(taxa=0.001, slippage=0.01)
+    compra = sim.enviar_ordem("BTCUSDT", "BUY", 2, 100.0)
+    venda = sim.enviar_ordem("BTCUSDT", "SELL", 2, 100.0)
+
+    assert compra['avgPrice'] == 101.0 and venda['avgPrice'] == 99.0
+    assert abs(sim.taxas_pagas - (0.202 + 0.198)) < 1e-12
+    assert avaliar_estrategia(40, 1, 1, "5m").endswith("LONG autorizada")
+
@@ -0,0 +1,26 @@
+# test_benchmarks.py 🧪 Fixtures determinísticas e varredura completa offline do benchmark
+import json
+import sys
+
+sys.path.insert(0, "benchmarks")
+from bench_pipeline import main, comparar  # noqa: E402
+from fixtures import gerar_candles, impressao_digital  # noqa: E402
+
+
+def test_fixtures_deterministicas():
+    a = gerar_candles("PEPEUSDT", 500)
+    assert impressao_digital(a) == impressao_digital(gerar_candles("PEPEUSDT", 500))
+    assert impressao_digital(a) != impressao_digital(gerar_candles("BTCUSDT", 500))
+    assert (a.high >= a.close).all() and (a.low <= a.open).all()
+
+
+def test_suite_offline_e_comparacao(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    argumentos = ["--tamanhos", "200", "--repeticoes", "1", "--casos", r"supertrend\[|run_analysis",
+                  "--baseline", str(baseline)]
+    assert main(argumentos + ["--salvar-baseline"]) == 0
+
+    dados = json.loads(baseline.read_text())
+    assert {"supertrend[200]", "run_analysis[serial]", "run_analysis[concorrente+reamostragem]"} <= set(dados['casos'])
+    lento = {caso: dict(r, min_ms=r['min_ms'] * 3 + 1) for caso, r in dados['casos'].items()}
+    assert comparar(lento, dados, 0.25) and not comparar(dados['casos'], dados, 0.25)
@@ -0,0 +1,101 @@
+# test_candle_store.py 🧪 Armazém de candles em disco: append, recuperação, consultas e warm start
+import numpy as np
+
+from candle_store import CandleStore, TAMANHO_REGISTRO
+from candles import Candles, CANDLE_DTYPE
+from kline_cache import KlineCache
+from test_kline_cache import BinanceFalsa, INTERVALO_MS
+
+
+def gerar(n, inicio_ms=1_700_000_000_000, passo=300_000):
+    data = np.zeros(n, dtype=CANDLE_DTYPE)
+    data['open_time'] = inicio_ms + np.arange(n) * passo
+    data['close_time'] = data['open_time'] + passo - 1
+    data['close'] = np.arange(n, dtype=np.float64)
+    return Candles(data)
+
+
+def test_append_monotonico_e_consulta(tmp_path):
+    armazem = CandleStore(str(tmp_path))
+    candles = gerar(1000)
+
+    assert armazem.anexar("BTCUSDT", "5m", candles[:600]) == 600
+    assert armazem.anexar("BTCUSDT", "5m", candles[500:]) == 400  # sobreposição ignorada
+    assert armazem.anexar("BTCUSDT", "5m", candles[:10]) == 0
+    assert armazem.tamanho("BTCUSDT", "5m") == 1000
+
+    faixa = armazem.ler("BTCUSDT", "5m", inicio=candles.open_time[100], fim=candles.open_time[199])
+    assert len(faixa) == 100 and faixa.close[0] == 100 and faixa.close[-1] == 199
+    assert isinstance(faixa.data.base, np.memmap) or isinstance(faixa.data, np.memmap)
+    assert np.array_equal(armazem.ultimos("BTCUSDT", "5m", 5).close, [995, 996, 997, 998, 999])
+
+
+def test_registro_parcial_truncado_na_abertura(tmp_path):
+    CandleStore(str(tmp_path)).anexar("ETHUSDT", "5m", gerar(10))
+    caminho = CandleStore(str(tmp_path)).caminho("ETHUSDT", "5m")
+    with open(caminho, "ab") as f:
+        f.write(b"\x00" * 20)  # queda no meio de uma escrita
+
+    armazem = CandleStore(str(tmp_path))
+    assert armazem.anexar("ETHUSDT", "5m", gerar(12)) == 2
+    with open(caminho, "rb") as f:
+        assert len(f.read()) == 12 * TAMANHO_REGISTRO
+    assert np.array_equal(armazem.ler("ETHUSDT", "5m").close, np.arange(12))
+
+
+def test_warm_start_busca_so_o_delta(tmp_path):
+    api = BinanceFalsa(agora_ms=10_000 * INTERVALO_MS + 30_000)
+    cache = KlineCache(api.get_klines, relogio=api.relogio, armazem=CandleStore(str(tmp_path)))
+    cache.get("BTCUSDT", "1m", 200)
+
+    # Restart: cache em memória novo, mesmo diretório; 5 candles se passaram
+    api.agora_ms += 5 * INTERVALO_MS
+    api.chamadas.clear()
+    reiniciado = KlineCache(api.get_klines, relogio=api.relogio, armazem=CandleStore(str(tmp_path)))
+    klines = reiniciado.get("BTCUSDT", "1m", 200)
+
+    assert reiniciado.stats()['disco'] == 1
+    assert len(api.chamadas) == 1 and api.chamadas[0]['startTime'] is not None
+    esperado = api.get_klines("BTCUSDT", "1m", 200)
+    assert [k[0] for k in klines] == [k[0] for k in esperado]
+    assert [float(k[4]) for k in klines] == [float(k[4]) for k in esperado]
+
+
+def test_disco_defasado_ou_com_buraco_e_regravado(tmp_path):
+    api = BinanceFalsa(agora_ms=10_000 * INTERVALO_MS + 30_000)
+    KlineCache(api.get_klines, relogio=api.relogio, armazem=CandleStore(str(tmp_path))).get("BTCUSDT", "1m", 100)
+
+    # Restart depois de 500 candles: mais que `limit`, a janela vem inteira da API
+    api.agora_ms += 500 * INTERVALO_MS
+    armazem = CandleStore(str(tmp_path))
+    klines = KlineCache(api.get_klines, relogio=api.relogio, armazem=armazem).get("BTCUSDT", "1m", 100)
+    em_disco = armazem.ler("BTCUSDT", "1m")
+
+    assert np.all(np.diff(em_disco.open_time) == INTERVALO_MS)
+    assert list(em_disco.open_time) == [k[0] for k in klines[:-1]]
+
+    # Buraco no meio do arquivo: não carrega através dele, recarrega e regrava
+    armazem.substituir("BTCUSDT", "1m", np.concatenate([em_disco.data[:40], em_disco.data[45:]]))
+    api.chamadas.clear()
+    reiniciado = KlineCache(api.get_klines, relogio=api.relogio, armazem=CandleStore(str(tmp_path)))
+    klines = reiniciado.get("BTCUSDT", "1m", 90)
+
+    assert reiniciado.stats()['disco'] == 0 and api.chamadas[0]['startTime'] is None
+    assert [k[0] for k in klines] == [k[0] for k in api.get_klines("BTCUSDT", "1m", 90)]
+    assert np.all(np.diff(CandleStore(str(tmp_path)).ler("BTCUSDT", "1m").open_time) == INTERVALO_MS)
+
+
+def test_par_esquecido_sai_da_memoria_e_do_disco(tmp_path):
+    api = BinanceFalsa(agora_ms=10_000 * INTERVALO_MS + 30_000)
+    armazem = CandleStore(str(tmp_path))
+    cache = KlineCache(api.get_klines, relogio=api.relogio, armazem=armazem)
+    cache.get("BTCUSDT", "1m", 100)
+    cache.get("ETHUSDT", "1m", 100)
+
+    assert cache.esquecer("BTCUSDT") == 1
+    assert cache.tamanho("BTCUSDT", "1m") == 0 and armazem.tamanho("BTCUSDT", "1m") == 0
+    assert cache.tamanho("ETHUSDT", "1m") == 99 and armazem.tamanho("ETHUSDT", "1m") == 99
+
+    api.chamadas.clear()
+    cache.get("BTCUSDT", "1m", 100)   # voltou à rotação: carga normal, sem warm start
+    assert api.chamadas[0]['startTime'] is None and armazem.tamanho("BTCUSDT", "1m") == 99
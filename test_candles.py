@@ -0,0 +1,52 @@
+# test_candles.py 🧪 Container colunar de candles
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+
+from candles import Candles
+from indicators.momentum import rsi_wilder
+from indicators.supertrend import Supertrend
+
+
+def gerar_klines(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 30 + np.cumsum(rng.normal(0, 0.2, n))
+    klines = []
+    for i, c in enumerate(close):
+        t = 1_700_000_000_000 + i * 900_000
+        klines.append([t, f"{c:.4f}", f"{c + 0.3:.4f}", f"{c - 0.3:.4f}", f"{c:.4f}", f"{100 + i:.2f}",
+                       t + 899_999, "0", 10, "0", "0", "0"])
+    return klines
+
+
+def test_parse_em_lote():
+    klines = gerar_klines(200)
+    candles = Candles.from_klines(klines)
+
+    assert len(candles) == 200
+    assert candles.open_time[0] == klines[0][0]
+    assert candles.close_time[-1] == klines[-1][6]
+    assert candles.close[5] == float(klines[5][4])
+    assert candles.volume.dtype == np.float64
+
+
+def test_fatia_sem_copia():
+    candles = Candles.from_klines(gerar_klines(100))
+    janela = candles[50:80]
+
+    assert len(janela) == 30
+    assert np.shares_memory(janela.close, candles.close)
+    assert janela.open_time[0] == candles.open_time[50]
+
+
+def test_to_pandas_e_indicadores():
+    klines = gerar_klines(200)
+    candles = Candles.from_klines(klines)
+    df = candles.to_pandas()
+
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+    rsi_ta = RSIIndicator(close=pd.to_numeric(pd.Series([k[4] for k in klines])), window=14).rsi()
+    assert abs(rsi_wilder(candles.close)[-1] - rsi_ta.iloc[-1]) < 1e-9
+
+    direcao = Supertrend.from_candles(candles).supertrend_direction()
+    assert set(direcao.unique()) <= {1, -1}
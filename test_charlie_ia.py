@@ -0,0 +1,172 @@
+# test_charlie_ia.py 🧪 Cliente da IA contra endpoint stub local: cache, coalescência e contexto
+import asyncio
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import charlie_ia
+import data
+from kline_cache import KlineCache
+
+
+class StubOpenAI(BaseHTTPRequestHandler):
+    pedidos = []
+    atraso = 0.0
+    status = 200
+
+    def do_POST(self):
+        corpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        StubOpenAI.pedidos.append(corpo)
+        time.sleep(self.atraso)
+        if self.status == 200:
+            pergunta = corpo["messages"][-1]["content"]
+            resposta = json.dumps({"choices": [{"message": {"content": f" resposta {len(StubOpenAI.pedidos)}: {pergunta} "}}]})
+        else:
+            resposta = json.dumps({"error": {"message": "x" * 5000}})
+        saida = resposta.encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(saida)))
+        self.end_headers()
+        self.wfile.write(saida)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAI)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    StubOpenAI.pedidos = []
+    StubOpenAI.atraso = 0.0
+    StubOpenAI.status = 200
+    for nome in ("OPENAI_URL", "OPENAI_API_KEY", "CACHE_TTL"):
+        monkeypatch.setattr(charlie_ia, nome, getattr(charlie_ia, nome))
+    monkeypatch.setattr(charlie_ia, "_cliente", None)
+    monkeypatch.setattr(data, "kline_cache", KlineCache(lambda **k: []))
+    charlie_ia.configurar(url=f"http://127.0.0.1:{servidor.server_port}/v1/chat/completions", chave="teste")
+    yield StubOpenAI
+    charlie_ia.encerrar()
+    servidor.shutdown()
+
+
+def test_cache_por_pergunta_normalizada(stub):
+    primeira = charlie_ia.responder_mensagem("Como está o SUI?", contexto=False)
+    segunda = charlie_ia.responder_mensagem("  como   está o sui ", contexto=False)
+    outro_modelo = charlie_ia.responder_mensagem("Como está o SUI?", modelo="gpt-4o-mini", contexto=False)
+
+    assert primeira == segunda == "resposta 1: Como está o SUI?"
+    assert outro_modelo.startswith("resposta 2")
+    assert len(stub.pedidos) == 2
+
+
+def test_validade_do_cache(stub):
+    charlie_ia.configurar(ttl=0.2)
+    charlie_ia.responder_mensagem("status", contexto=False)
+    time.sleep(0.3)
+    charlie_ia.responder_mensagem("status", contexto=False)
+    assert len(stub.pedidos) == 2
+
+
+def test_perguntas_identicas_em_voo_coalescem(stub):
+    stub.atraso = 0.3
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        respostas = list(pool.map(lambda _: charlie_ia.responder_mensagem("E o BTC?", contexto=False), range(6)))
+
+    assert len(stub.pedidos) == 1
+    assert len(set(respostas)) == 1
+    assert charlie_ia.obter_cliente()[0].coalescidas >= 1
+
+
+def test_cancelar_a_lider_nao_cancela_quem_espera(stub):
+    stub.atraso = 0.3
+    cliente = charlie_ia.ClienteIA()
+
+    async def cenario():
+        lider = asyncio.create_task(cliente.perguntar("E o ETH?"))
+        await asyncio.sleep(0.05)
+        espera = asyncio.create_task(cliente.perguntar("E o ETH?"))
+        await asyncio.sleep(0.05)
+        lider.cancel()
+        try:
+            return await espera
+        finally:
+            await cliente.fechar()
+
+    assert asyncio.run(cenario()).endswith("E o ETH?")
+    assert cliente.coalescidas == 1 and len(stub.pedidos) == 2
+
+
+def test_responder_prepara_fora_do_event_loop(stub, monkeypatch):
+    threads = []
+    original = charlie_ia._preparar
+
+    def preparar(*args):
+        threads.append(threading.current_thread())
+        return original(*args)
+
+    monkeypatch.setattr(charlie_ia, "_preparar", preparar)
+    resposta = asyncio.run(charlie_ia.responder("status?", contexto=False))
+
+    assert resposta.startswith("resposta 1")
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_erro_nao_entra_no_cache_e_corpo_e_truncado(stub, capsys):
+    stub.status = 500
+    resposta = charlie_ia.responder_mensagem("falha?", contexto=False)
+    stub.status = 200
+    charlie_ia.responder_mensagem("falha?", contexto=False)
+
+    assert resposta.startswith("❌ Erro 500")
+    assert len(resposta) < charlie_ia.TRECHO_ERRO + 20
+    assert "x" * 300 not in capsys.readouterr().out
+    assert len(stub.pedidos) == 2
+
+
+def test_contexto_vem_do_cache_de_klines(stub, monkeypatch):
+    chamadas = []
+
+    def buscar(symbol, interval, limit, startTime=None, endTime=None):
+        chamadas.append(symbol)
+        klines = []
+        for i in range(limit):
+            preco = str(1 + 0.1 * math.sin(i / 7))
+            klines.append([i * 900_000, preco, preco, preco, preco, "10", i * 900_000 + 899_999, "0", 1, "0", "0", "0"])
+        return klines
+
+    cache = KlineCache(buscar)
+    monkeypatch.setattr(data, "kline_cache", cache)
+    cache.get("SUIUSDT", "15m", 200)
+    buscas = len(chamadas)
+
+    assert charlie_ia.simbolos_citados("e o sui agora?") == ["SUIUSDT"]
+    charlie_ia.responder_mensagem("E o SUI agora?")
+
+    contexto = stub.pedidos[0]["messages"][1]["content"]
+    assert "SUIUSDT 15m" in contexto and "RSI" in contexto
+    assert len(chamadas) == buscas  # nenhuma kline buscada de novo
+
+
+def test_contexto_so_e_montado_num_miss(stub, monkeypatch):
+    montagens = []
+
+    def contexto_mercado(pergunta, symbol=None):
+        montagens.append(symbol)
+        return f"{symbol} 1h: RSI 50"
+
+    monkeypatch.setattr(charlie_ia, "contexto_mercado", contexto_mercado)
+    stub.atraso = 0.2
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(lambda _: charlie_ia.responder_mensagem("E o SUI?", symbol="SUIUSDT"), range(3)))
+    charlie_ia.responder_mensagem("e o sui", symbol="SUIUSDT")        # hit: nada é montado
+    charlie_ia.responder_mensagem("E o SUI?", symbol="ETHUSDT")       # outro par, outra chave
+
+    assert montagens == ["SUIUSDT", "ETHUSDT"]
+    assert len(stub.pedidos) == 2 and stub.pedidos[0]["messages"][1]["content"].endswith("SUIUSDT 1h: RSI 50")
@@ -0,0 +1,84 @@
+# test_charlie_voice.py 🧪 Pipeline de voz contra servidor stub local
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import charlie_voice
+import voice_logger
+from discord_dispatcher import obter_dispatcher
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    chamadas = {"tts": 0, "webhook": 0}
+    atraso = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.atraso)
+        if self.path.startswith("/tts/"):
+            StubHandler.chamadas["tts"] += 1
+            corpo = b"ID3" + b"\x00" * 1024
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+        else:
+            StubHandler.chamadas["webhook"] += 1
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_stub():
+    servidor = HTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def test_falar_nao_bloqueia_e_usa_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for nome in ("TTS_URL", "WEBHOOK_AUDIO", "PASTA_AUDIO"):
+        monkeypatch.setattr(charlie_voice, nome, getattr(charlie_voice, nome))
+    monkeypatch.setattr(voice_logger, "_registro", voice_logger.RegistroEventos(str(tmp_path / "eventos")))
+    servidor, base = iniciar_stub()
+    StubHandler.chamadas = {"tts": 0, "webhook": 0}
+    StubHandler.atraso = 0.3
+    charlie_voice.configurar(tts_url=base + "/tts/{voz}", webhook_audio=base + "/webhook",
+                             pasta_audio=str(tmp_path / "audios"))
+    try:
+        inicio = time.perf_counter()
+        charlie_voice.falar("Iniciando varredura de ativos.", emocao="neutra")
+        charlie_voice.falar("Iniciando varredura de ativos.", emocao="neutra")
+        assert time.perf_counter() - inicio < 0.1
+
+        charlie_voice.aguardar_falas()
+        obter_dispatcher().aguardar()
+        assert StubHandler.chamadas == {"tts": 1, "webhook": 2}
+
+        charlie_voice.falar("Iniciando varredura de ativos.", emocao="tensa")
+        charlie_voice.aguardar_falas()
+        assert StubHandler.chamadas["tts"] == 2
+    finally:
+        servidor.shutdown()
+
+
+def test_limpeza_por_tamanho(tmp_path, monkeypatch):
+    monkeypatch.setattr(charlie_voice, "PASTA_AUDIO", charlie_voice.PASTA_AUDIO)
+    pasta = tmp_path / "audios"
+    pasta.mkdir()
+    charlie_voice.configurar(pasta_audio=str(pasta))
+    for i in range(5):
+        caminho = pasta / f"{i}.mp3"
+        caminho.write_bytes(b"x" * 100)
+        os.utime(caminho, (1000 + i, 1000 + i))
+    (pasta / charlie_voice.FALLBACK).write_bytes(b"x" * 100)
+
+    restante = charlie_voice.limpar_cache(limite_bytes=250)
+
+    assert restante == 200
+    assert sorted(os.listdir(pasta)) == ["3.mp3", "4.mp3", charlie_voice.FALLBACK]
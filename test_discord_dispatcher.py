@@ -0,0 +1,129 @@
+# test_discord_dispatcher.py 🧪 Dispatcher do Discord contra webhook stub local
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import metricas
+from discord_dispatcher import DiscordDispatcher, dividir_em_linhas
+
+
+class WebhookStub(BaseHTTPRequestHandler):
+    recebidos = []
+    caminhos = []
+    rate_limit_pendente = 0
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if WebhookStub.rate_limit_pendente:
+            WebhookStub.rate_limit_pendente -= 1
+            resposta = json.dumps({"message": "You are being rate limited.", "retry_after": 0.2}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(resposta)))
+            self.end_headers()
+            self.wfile.write(resposta)
+            return
+        WebhookStub.recebidos.append(json.loads(corpo))
+        WebhookStub.caminhos.append(self.path)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_stub():
+    WebhookStub.recebidos = []
+    WebhookStub.caminhos = []
+    servidor = HTTPServer(("127.0.0.1", 0), WebhookStub)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}/webhook"
+
+
+def test_divide_em_quebras_de_linha():
+    linhas = [f"   ⏱ Intervalo: 15m | RSI: {i:.2f} | OBV: 123.45" for i in range(200)]
+    partes = dividir_em_linhas("\n".join(linhas), limite=500)
+
+    assert all(len(p) <= 500 for p in partes)
+    assert "\n".join(partes).split("\n") == linhas
+    assert dividir_em_linhas("x" * 1200, limite=500) == ["x" * 500, "x" * 500, "x" * 200]
+
+    # Linha em branco exatamente na fronteira entre partes não some
+    texto = "a" * 10 + "\n\n" + "b" * 10 + "\n\nc"
+    partes = dividir_em_linhas(texto, limite=10)
+    assert "\n".join(partes) == texto and all(len(p) <= 10 for p in partes)
+
+
+def test_descartes_e_rate_limits_viram_metricas(monkeypatch):
+    monkeypatch.setattr(metricas, "ativo", True)
+    metricas.registro.limpar()
+    dispatcher = DiscordDispatcher(fila_maxima=1)
+    monkeypatch.setattr(dispatcher, "_garantir_worker", lambda: None)   # ninguém consome a fila
+    dispatcher.enviar_alerta("http://127.0.0.1:9/webhook", "primeiro")
+    dispatcher.enviar_alerta("http://127.0.0.1:9/webhook", "segundo")
+
+    servidor, url = iniciar_stub()
+    WebhookStub.rate_limit_pendente = 1
+    try:
+        DiscordDispatcher()._entregar("json", url, {"content": "oi"}, 0.0)
+    finally:
+        servidor.shutdown()
+    contadores = {i['nome']: i['valor'] for i in metricas.snapshot() if i['tipo'] == 'contador'}
+    metricas.registro.limpar()
+
+    assert dispatcher.descartados == 1
+    assert contadores['discord_descartada'] == 1 and contadores['discord_rate_limit'] == 1
+
+
+def test_relatorio_com_rate_limit():
+    servidor, url = iniciar_stub()
+    WebhookStub.rate_limit_pendente = 1
+    try:
+        dispatcher = DiscordDispatcher(janela_alertas=0.1)
+        texto = "\n".join(f"linha {i}" for i in range(600))
+        partes = dispatcher.enviar_texto(url, texto, bloco_codigo=True)
+        dispatcher.aguardar()
+
+        assert len(WebhookStub.recebidos) == partes > 1
+        conteudo = "".join(m["content"].strip("`") + "\n" for m in WebhookStub.recebidos)
+        assert conteudo.rstrip("\n") == texto
+        metricas = dispatcher.metricas()
+        assert metricas['rate_limits'] == 1 and metricas['enviados'] == partes
+        assert metricas['descartados'] == 0
+    finally:
+        servidor.shutdown()
+
+
+def test_alertas_agrupados_na_janela():
+    servidor, url = iniciar_stub()
+    try:
+        dispatcher = DiscordDispatcher(janela_alertas=0.3)
+        for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+            dispatcher.enviar_alerta(url, f"🎯 {symbol} | entrada LONG autorizada")
+        dispatcher.aguardar()
+
+        assert len(WebhookStub.recebidos) == 1
+        assert WebhookStub.recebidos[0]["content"].count("🎯") == 3
+    finally:
+        servidor.shutdown()
+
+
+def test_alertas_de_dois_webhooks_na_mesma_janela():
+    servidor, url = iniciar_stub()
+    outro = url.replace("/webhook", "/outro")
+    try:
+        dispatcher = DiscordDispatcher(janela_alertas=0.3)
+        dispatcher.enviar_alerta(url, "🎯 BTCUSDT | entrada LONG autorizada")
+        dispatcher.enviar_alerta(outro, "🎯 SUIUSDT | entrada LONG autorizada")
+        dispatcher.enviar_texto(url, "relatório")
+        dispatcher.enviar_alerta(url, "🎯 ETHUSDT | entrada LONG autorizada")
+        dispatcher.aguardar()
+
+        assert WebhookStub.caminhos == ["/webhook", "/outro", "/webhook"]
+        conteudos = [m["content"] for m in WebhookStub.recebidos]
+        assert conteudos[0].startswith("🚀") and conteudos[0].count("🎯") == 2
+        assert conteudos[1].startswith("🚀") and "SUIUSDT" in conteudos[1]
+        assert conteudos[2] == "relatório"
+        assert dispatcher.metricas()['falhas'] == 0
+    finally:
+        servidor.shutdown()
@@ -0,0 +1,147 @@
+# test_estado_sinais.py 🧪 Transições, cooldown de alerta e persistência do estado dos sinais
+import contextlib
+import io
+import json
+import sys
+
+import estado_sinais
+from estado_sinais import EstadoSinais, regime, relatorio_delta
+
+sys.path.insert(0, "benchmarks")
+from bench_pipeline import fonte_local  # noqa: E402
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1_000.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_so_transicoes_sao_emitidas(tmp_path):
+    estado = EstadoSinais(str(tmp_path / "estado.json"), cooldown_regime=0)
+
+    assert estado.avaliar("SUIUSDT", "1h", "Alta", "alta/neutro").mudou
+    assert not estado.avaliar("SUIUSDT", "1h", "Alta", "alta/neutro").mudou
+    assert estado.avaliar("SUIUSDT", "1h", "Alta", "alta/sobrecomprado").mudou
+    assert estado.avaliar("SUIUSDT", "1h", "Baixa", "alta/sobrecomprado").mudou
+    assert len(estado.fechar_ciclo()) == 3
+    assert estado.fechar_ciclo() == []
+
+
+def test_alerta_persistente_nao_repete_e_respeita_cooldown(tmp_path):
+    relogio = Relogio()
+    estado = EstadoSinais(str(tmp_path / "estado.json"), cooldown=600, relogio=relogio)
+    entrada = ("SOLUSDT", "15m", "✅ entrada LONG autorizada", "alta/neutro")
+
+    assert estado.avaliar(*entrada, alerta=True).alertar
+    relogio.agora += 300
+    assert not estado.avaliar(*entrada, alerta=True).alertar       # condição persistente
+
+    relogio.agora += 60
+    estado.avaliar(*entrada, alerta=False)
+    relogio.agora += 60
+    assert not estado.avaliar(*entrada, alerta=True).alertar       # religou dentro do cooldown
+
+    estado.avaliar(*entrada, alerta=False)
+    relogio.agora += 600
+    assert estado.avaliar(*entrada, alerta=True).alertar
+
+
+def test_histerese_e_cooldown_de_regime(tmp_path):
+    assert regime({'supertrend': 1, 'rsi': 69.0}, "alta/sobrecomprado") == "alta/sobrecomprado"
+    assert regime({'supertrend': 1, 'rsi': 64.0}, "alta/sobrecomprado") == "alta/neutro"
+    assert regime({'supertrend': -1, 'rsi': 31.0}, "baixa/sobrevendido") == "baixa/sobrevendido"
+    assert regime({'supertrend': 1, 'rsi': 69.0}, "alta/neutro") == "alta/neutro"
+
+    relogio = Relogio()
+    estado = EstadoSinais(str(tmp_path / "estado.json"), cooldown_regime=900, relogio=relogio)
+    rsi_oscilando = [71.0, 69.0, 71.5, 68.0, 70.5]
+    emitidas = []
+    for rsi in rsi_oscilando:
+        relogio.agora += 60
+        resultado = {'supertrend': 1, 'rsi': rsi}
+        emitidas.append(estado.avaliar("SUIUSDT", "15m", "Alta", estado.regime("SUIUSDT", "15m", resultado)).mudou)
+    assert emitidas == [True, False, False, False, False]
+
+    relogio.agora += 60
+    assert not estado.avaliar("SUIUSDT", "15m", "Alta", "alta/neutro").mudou      # só regime, em cooldown
+    assert estado.ultimo("SUIUSDT", "15m")['regime'] == "alta/sobrecomprado"
+    assert estado.avaliar("SUIUSDT", "15m", "Baixa", "alta/neutro").mudou         # decisão passa na hora
+    relogio.agora += 900
+    assert estado.avaliar("SUIUSDT", "15m", "Baixa", "baixa/neutro").mudou
+
+
+def test_pares_fora_da_rotacao_sao_podados(tmp_path):
+    caminho = tmp_path / "estado.json"
+    estado = EstadoSinais(str(caminho))
+    for symbol in ("BTCUSDT", "WIFUSDT"):
+        for interval in ("15m", "1h"):
+            estado.avaliar(symbol, interval, "Alta", "alta/neutro")
+    estado.fechar_ciclo()
+
+    assert estado.podar(["BTCUSDT", "ETHUSDT"]) == 2
+    assert estado.podar(["BTCUSDT"]) == 0
+    estado.salvar()
+    assert sorted(json.loads(caminho.read_text())) == ["BTCUSDT|15m", "BTCUSDT|1h"]
+
+
+def test_estado_sobrevive_ao_restart(tmp_path):
+    caminho = tmp_path / "dados" / "estado.json"
+    estado = EstadoSinais(str(caminho))
+    estado.avaliar("BTCUSDT", "4h", "Alta", "alta/neutro", alerta=True)
+    estado.fechar_ciclo()
+
+    assert json.loads(caminho.read_text())["BTCUSDT|4h"]["decisao"] == "Alta"
+    assert not (tmp_path / "dados" / "estado.json.tmp").exists()
+
+    reiniciado = EstadoSinais(str(caminho))
+    mudanca = reiniciado.avaliar("BTCUSDT", "4h", "Alta", "alta/neutro", alerta=True)
+    assert not mudanca.mudou and not mudanca.alertar
+    assert reiniciado.salvar() is False  # nada novo para gravar
+
+    caminho.write_text("{corrompido")
+    assert len(EstadoSinais(str(caminho))) == 0
+
+
+def test_regime_e_relatorio_delta(tmp_path):
+    assert regime({'supertrend': 1, 'rsi': 75.0}) == "alta/sobrecomprado"
+    assert regime({'supertrend': -1, 'rsi': 25.0}) == "baixa/sobrevendido"
+    assert regime(None) == estado_sinais.ERRO
+
+    estado = EstadoSinais(str(tmp_path / "estado.json"))
+    estado.avaliar("XRPUSDT", "1h", "Alta", "alta/neutro")
+    estado.fechar_ciclo()
+    estado.avaliar("XRPUSDT", "1h", "Baixa", "baixa/neutro")
+    estado.avaliar("ETHUSDT", "1h", "Alta", "alta/neutro", alerta=True)
+    texto = relatorio_delta(estado.fechar_ciclo(), total=21)
+
+    assert texto.splitlines() == [
+        "📡 CharlieCore Sentinel — 2 mudança(s) em 21 pares",
+        "🔁 XRPUSDT [1h]: Alta → Baixa | regime alta/neutro → baixa/neutro",
+        "🆕 ETHUSDT [1h]: Alta | alta/neutro | 🎯 alerta de entrada",
+    ]
+    assert "sem mudanças" in relatorio_delta([], total=21)
+
+
+def test_varredura_repetida_nao_reenvia_nada(tmp_path):
+    import sentinel
+
+    estado = EstadoSinais(str(tmp_path / "estado.json"))
+    falas, alertas = [], []
+    with fonte_local(), contextlib.redirect_stdout(io.StringIO()):
+        sentinel.falar = lambda texto, **k: falas.append(texto)
+        sentinel.enviar_alerta_entrada = alertas.append
+
+        completo = sentinel.run_analysis(concorrente=False, reamostrar=True, estado=estado)
+        primeiro = estado.fechar_ciclo()
+        falas_primeiro, alertas_primeiro = len(falas), len(alertas)
+
+        sentinel.run_analysis(concorrente=False, reamostrar=True, estado=estado)
+        segundo = estado.fechar_ciclo()
+
+    assert len(primeiro) == len(sentinel.SYMBOLS) * len(sentinel.INTERVALS)
+    assert "Ativo Monitorado" in completo
+    assert segundo == []
+    assert len(falas) == falas_primeiro and len(alertas) == alertas_primeiro
@@ -0,0 +1,52 @@
+# test_estrategia.py 🧪 Estratégia vetorizada: códigos de sinal e predicado móvel do RSI
+import numpy as np
+
+from estrategia import (Sinal, avaliar_estrategia, avaliar_estrategia_vetorizada, direcao_entrada,
+                        renderizar_sinal)
+from indicators.momentum import rsi_ascendente, rsi_inicio_ciclo
+
+
+def referencia(rsi, obv, supertrend, intervalo):
+    """Regra escalar original, campo a campo."""
+    if intervalo != "5m":
+        if supertrend > 0 and rsi > 50:
+            return "Tendência de Alta - Acompanhar possível entrada"
+        elif supertrend < 0 and rsi < 50:
+            return "Tendência de Baixa - Acompanhar possível entrada"
+        return "Sem sinal claro - Observar evolução"
+    if rsi > 35 and supertrend > 0 and obv > 0:
+        return "✅ entrada LONG autorizada"
+    elif rsi < 65 and supertrend < 0 and obv < 0:
+        return "⚠️ entrada SHORT autorizada"
+    return "⏸ Sem confirmação de entrada - Monitorando 5m"
+
+
+def test_vetorizada_igual_a_regra_escalar():
+    rng = np.random.default_rng(15)
+    n = 5000
+    rsi = rng.uniform(0, 100, n)
+    rsi[rng.random(n) < 0.05] = np.nan
+    obv = rng.normal(0, 1000, n)
+    supertrend = rng.choice([-1, 1], n)
+
+    for intervalo in ("5m", "15m", "4h"):
+        codigos = avaliar_estrategia_vetorizada(rsi, obv, supertrend, intervalo)
+        assert codigos.dtype == np.int8
+        for i in range(n):
+            esperado = referencia(rsi[i], obv[i], supertrend[i], intervalo)
+            assert renderizar_sinal(codigos[i]) == esperado
+            assert avaliar_estrategia(rsi[i], obv[i], supertrend[i], intervalo) == esperado
+
+    codigos = np.array([Sinal.ENTRADA_LONG, Sinal.ENTRADA_SHORT, Sinal.SEM_CONFIRMACAO, Sinal.TENDENCIA_ALTA])
+    assert direcao_entrada(codigos).tolist() == [1, -1, 0, 0]
+
+
+def test_inicio_ciclo_movel_igual_a_rsi_ascendente():
+    rng = np.random.default_rng(3)
+    rsi = 50 + np.cumsum(rng.normal(0, 1, 3000))
+    rsi[100] = np.nan
+    predicado = rsi_inicio_ciclo(rsi, candles=4)
+
+    assert not predicado[:3].any()
+    for i in range(3, len(rsi)):
+        assert predicado[i] == rsi_ascendente(rsi[i - 3:i + 1])
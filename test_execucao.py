@@ -0,0 +1,170 @@
+# test_execucao.py 🧪 Motor de execução contra uma corretora falsa local
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+
+import pytest
+
+import executor
+from execucao import MotorExecucao, dimensionar, extrair_filtros, PREENCHIDA, NAO_ENVIADA
+from gateway import BinanceGateway
+
+EXCHANGE_INFO = {"symbols": [{
+    "symbol": "BTCUSDT",
+    "filters": [
+        {"filterType": "PRICE_FILTER", "tickSize": "0.10"},
+        {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "1000"},
+        {"filterType": "MARKET_LOT_SIZE", "stepSize": "0.001", "minQty": "0.001", "maxQty": "120"},
+        {"filterType": "MIN_NOTIONAL", "notional": "100"},
+    ],
+}]}
+
+
+class CorretoraFalsa(BaseHTTPRequestHandler):
+    ordens = {}
+    envios = []
+    exchange_info = 0
+    atrasar_envio = 0.0        # aceita a ordem mas responde depois do timeout do cliente
+    preencher_na_consulta = False
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _tratar(self):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        if url.path == "/fapi/v1/exchangeInfo":
+            CorretoraFalsa.exchange_info += 1
+            return self._responder(200, EXCHANGE_INFO)
+        if url.path == "/api/v3/ticker/price":
+            return self._responder(200, {"symbol": params["symbol"], "price": "64000"})
+        if url.path == "/fapi/v1/order" and self.command == "POST":
+            CorretoraFalsa.envios.append(params)
+            client_id = params["newClientOrderId"]
+            if client_id in CorretoraFalsa.ordens:
+                return self._responder(400, {"code": -4116, "msg": "ClientOrderId is duplicated."})
+            status = "NEW" if CorretoraFalsa.preencher_na_consulta else "FILLED"
+            ordem = {"orderId": len(CorretoraFalsa.ordens) + 1, "clientOrderId": client_id, "symbol": params["symbol"],
+                     "side": params["side"], "origQty": params["quantity"], "status": status,
+                     "executedQty": params["quantity"] if status == "FILLED" else "0", "avgPrice": "64010.5"}
+            CorretoraFalsa.ordens[client_id] = ordem
+            if CorretoraFalsa.atrasar_envio:
+                time.sleep(CorretoraFalsa.atrasar_envio)
+            return self._responder(200, ordem)
+        if url.path == "/fapi/v1/order":
+            ordem = CorretoraFalsa.ordens.get(params["origClientOrderId"])
+            if ordem is None:
+                return self._responder(400, {"code": -2013, "msg": "Order does not exist."})
+            ordem.update(status="FILLED", executedQty=ordem["origQty"])
+            return self._responder(200, ordem)
+        return self._responder(404, {"code": -1, "msg": "?"})
+
+    do_GET = _tratar
+    do_POST = _tratar
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def motor(tmp_path):
+    CorretoraFalsa.ordens = {}
+    CorretoraFalsa.envios = []
+    CorretoraFalsa.exchange_info = 0
+    CorretoraFalsa.atrasar_envio = 0.0
+    CorretoraFalsa.preencher_na_consulta = False
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), CorretoraFalsa)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_port}"
+    gateway = BinanceGateway("chave", "segredo", base_url=url, futures_url=url, timeout=0.3)
+    motor = MotorExecucao(gateway=gateway, diario=str(tmp_path / "ordens.jsonl"), intervalo_reconciliacao=0.05)
+    yield motor
+    motor.encerrar()
+    servidor.shutdown()
+
+
+def test_dimensionamento_pelos_filtros():
+    filtros = extrair_filtros(EXCHANGE_INFO["symbols"][0])
+    assert filtros.qtd_maxima == Decimal("120") and filtros.notional_minimo == Decimal("100")
+    assert dimensionar(filtros, 64000, valor=150) == Decimal("0.002")
+    assert dimensionar(filtros, 64000, quantidade=500) == Decimal("120")
+    with pytest.raises(ValueError):
+        dimensionar(filtros, 64000, valor=90)
+
+
+def test_exchange_info_em_cache_e_diario(motor):
+    futuros = [motor.submeter("BTCUSDT", "BUY", valor=150, id_sinal=i) for i in range(5)]
+    registros = [f.result(timeout=10) for f in futuros]
+    abaixo = motor.submeter("BTCUSDT", "SELL", valor=50, id_sinal="pequena").result(timeout=10)
+
+    assert all(r['estado'] == PREENCHIDA and r['quantidade'] == "0.002" for r in registros)
+    assert abaixo['estado'] == NAO_ENVIADA and len(CorretoraFalsa.envios) == 5
+    assert CorretoraFalsa.exchange_info == 1
+    assert all(r['latencia_ack'] >= r['latencia_envio'] >= 0 for r in registros)
+    with open(motor.diario) as f:
+        assert len(f.readlines()) == 6
+
+
+def test_sinal_repetido_nao_duplica_ordem(motor):
+    primeiro = motor.submeter("BTCUSDT", "BUY", quantidade=0.01, preco=64000, id_sinal="BTC-5m-1")
+    segundo = motor.submeter("BTCUSDT", "BUY", quantidade=0.01, preco=64000, id_sinal="BTC-5m-1")
+    assert primeiro is segundo
+    primeiro.result(timeout=10)
+    assert len(CorretoraFalsa.envios) == 1
+    assert CorretoraFalsa.envios[0]["newClientOrderId"].startswith("cc-")
+
+
+def test_timeout_reconciliado_pelo_client_id(motor):
+    CorretoraFalsa.atrasar_envio = 0.6
+    registro = motor.submeter("BTCUSDT", "SELL", quantidade=0.01, preco=64000, id_sinal="x").result(timeout=10)
+
+    assert registro['estado'] == PREENCHIDA and registro['orderId'] == 1
+    assert len(CorretoraFalsa.envios) == 1  # nenhuma segunda ordem após o timeout
+
+
+def test_ordem_nova_acompanhada_ate_o_fill(motor):
+    CorretoraFalsa.preencher_na_consulta = True
+    registro = motor.submeter("BTCUSDT", "BUY", quantidade=0.01, preco=64000, id_sinal="y").result(timeout=10)
+    assert registro['estado'] == PREENCHIDA and registro['executado'] == "0.01"
+
+
+def test_sinal_repetido_apos_restart_reaproveita_a_ordem(motor):
+    primeiro = motor.submeter("BTCUSDT", "BUY", quantidade=0.01, preco=64000, id_sinal="z").result(timeout=10)
+
+    reiniciado = MotorExecucao(gateway=motor.gateway, diario=motor.diario)        # diário sobrevive
+    sem_diario = MotorExecucao(gateway=motor.gateway, diario=None)               # só a corretora sabe
+    try:
+        pelo_diario = reiniciado.submeter("BTCUSDT", "BUY", quantidade=0.01, preco=64000, id_sinal="z").result(timeout=10)
+        pela_corretora = sem_diario.submeter("BTCUSDT", "BUY", quantidade=0.01, preco=64000, id_sinal="z").result(timeout=10)
+    finally:
+        reiniciado.encerrar()
+        sem_diario.encerrar()
+
+    assert len(CorretoraFalsa.envios) == 1
+    assert pelo_diario['reaproveitada'] and pelo_diario['orderId'] == primeiro['orderId']
+    assert pela_corretora['reaproveitada'] and pela_corretora['estado'] == PREENCHIDA
+    with pytest.raises(ValueError):
+        motor.submeter("BTCUSDT", "BUY", quantidade=0.01)
+
+
+def test_enviar_ordem_repetido_devolve_a_mesma_ordem(motor, monkeypatch, capsys):
+    monkeypatch.setattr(executor, "obter_motor", lambda: motor)
+    primeira = executor.enviar_ordem("BTCUSDT", "BUY", id_sinal="s1")
+    motor._ordens.clear()  # como após um restart: só o diário e a corretora lembram
+    segunda = executor.enviar_ordem("BTCUSDT", "BUY", id_sinal="s1")
+
+    assert primeira['orderId'] == segunda['orderId'] and len(CorretoraFalsa.envios) == 1
+    assert "Ordem já existente" in capsys.readouterr().out
+    with pytest.raises(TypeError):
+        executor.enviar_ordem("BTCUSDT", "BUY")
@@ -0,0 +1,108 @@
+# test_gateway.py 🧪 Gateway Binance contra servidor REST falso local
+import hashlib
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+import pytest
+
+from gateway import BinanceGateway, BinanceErro, peso_klines
+
+
+class BinanceFalsa(BaseHTTPRequestHandler):
+    recebidos = []
+    rate_limit_pendente = 0
+    peso_usado = 0
+
+    def _responder(self, status, corpo, headers=None):
+        dados = json.dumps(corpo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.send_header("X-MBX-USED-WEIGHT-1M", str(BinanceFalsa.peso_usado))
+        for chave, valor in (headers or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _tratar(self):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        BinanceFalsa.recebidos.append((self.command, url.path, params, dict(self.headers)))
+        if BinanceFalsa.rate_limit_pendente:
+            BinanceFalsa.rate_limit_pendente -= 1
+            return self._responder(429, {"code": -1003, "msg": "Too many requests."}, {"Retry-After": "0"})
+        if url.path == "/api/v3/ticker/price":
+            return self._responder(200, {"symbol": params["symbol"], "price": "64000.10"})
+        if url.path == "/api/v3/klines":
+            return self._responder(200, [[1, "1", "2", "0.5", "1.5", "10", 2]] * int(params["limit"]))
+        if url.path == "/fapi/v1/order":
+            return self._responder(200, {"symbol": params["symbol"], "side": params["side"], "origQty": params["quantity"]})
+        return self._responder(400, {"code": -1121, "msg": "Invalid symbol."})
+
+    do_GET = _tratar
+    do_POST = _tratar
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    BinanceFalsa.recebidos = []
+    BinanceFalsa.rate_limit_pendente = 0
+    BinanceFalsa.peso_usado = 0
+    servidor = HTTPServer(("127.0.0.1", 0), BinanceFalsa)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_port}"
+    yield url
+    servidor.shutdown()
+
+
+def test_repete_apos_429(servidor):
+    BinanceFalsa.rate_limit_pendente = 2
+    gateway = BinanceGateway(base_url=servidor, futures_url=servidor)
+
+    assert gateway.get_symbol_ticker(symbol="BTCUSDT")["price"] == "64000.10"
+    assert gateway.repeticoes == 2 and len(BinanceFalsa.recebidos) == 3
+
+
+def test_erro_4xx_nao_repete(servidor):
+    gateway = BinanceGateway(base_url=servidor, futures_url=servidor)
+    with pytest.raises(BinanceErro) as erro:
+        gateway.get_ticker_24h(symbol="XXX")
+    assert erro.value.codigo == -1121 and len(BinanceFalsa.recebidos) == 1
+
+
+def test_peso_sincronizado_com_servidor(servidor):
+    BinanceFalsa.peso_usado = 1100
+    gateway = BinanceGateway(base_url=servidor, futures_url=servidor)
+
+    klines = gateway.get_klines(symbol="BTCUSDT", interval="5m", limit=150)
+    assert len(klines) == 150
+    assert BinanceFalsa.recebidos[0][2] == {"symbol": "BTCUSDT", "interval": "5m", "limit": "150"}
+    assert gateway.governador_spot.saldo() <= 100 + 1  # capacidade − peso informado (+ reposição)
+    assert peso_klines(150) == peso_klines(1000) == 2                     # spot: fixo
+    assert peso_klines(150, "futures") == 2 and peso_klines(1000, "futures") == 5
+
+
+def test_ordem_sem_segredo_falha_antes_de_enviar(servidor):
+    gateway = BinanceGateway("chave", None, base_url=servidor, futures_url=servidor)
+    with pytest.raises(ValueError, match="BINANCE_API_SECRET"):
+        gateway.futures_create_order(symbol="SOLUSDT", side="BUY", type="MARKET", quantity=1)
+    assert not BinanceFalsa.recebidos and gateway.governador_futures.saldo() == gateway.governador_futures.capacidade
+
+
+def test_ordem_assinada(servidor):
+    gateway = BinanceGateway("chave", "segredo", base_url=servidor, futures_url=servidor)
+    ordem = gateway.futures_create_order(symbol="SOLUSDT", side="BUY", type="MARKET", quantity=1)
+
+    assert ordem["origQty"] == "1"
+    metodo, caminho, params, headers = BinanceFalsa.recebidos[0]
+    assert metodo == "POST" and caminho == "/fapi/v1/order"
+    assert headers["X-MBX-APIKEY"] == "chave"
+    assinatura = params.pop("signature")
+    esperado = hmac.new(b"segredo", urlencode(params).encode(), hashlib.sha256).hexdigest()
+    assert assinatura == esperado
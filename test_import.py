@@ -0,0 +1,11 @@
+# test_import.py 🧪 Importar os pontos de entrada não carrega dependências pesadas nem rede
+import sys
+
+sys.path.insert(0, "benchmarks")
+from bench_import import medir  # noqa: E402
+
+
+def test_import_sentinel_sem_pesados():
+    for modulo in ("sentinel", "indicators.indicators"):
+        _, pesados = medir(modulo, repeticoes=1)
+        assert pesados == [], f"{modulo} importou {pesados}"
@@ -1,5 +1,5 @@
 # test_indicators.py 🚀
-import pandas as pd
+from candles import Candles
 from indicators import analyze_indicators
 from binance_connector import get_klines
 
@@ -14,13 +14,8 @@ def main():
         print("❌ Falha ao obter os candles.")
         return
 
-    df = pd.DataFrame(klines, columns=[
-        "timestamp", "open", "high", "low", "close", "volume",
-        "close_time", "quote_asset_volume", "number_of_trades",
-        "taker_buy_base_volume", "taker_buy_quote_volume", "ignore"
-    ])
-
-    df[["open", "high", "low", "close", "volume"]] = df[["open", "high", "low", "close", "volume"]].astype(float)
+    candles = Candles.from_klines(klines)
+    print(f"🕯️ {len(candles)} candles carregados. Último fechamento: {candles.close[-1]}")
 
     result = analyze_indicators(symbol, interval)
     print("✅ Resultado da análise:")
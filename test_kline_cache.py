@@ -0,0 +1,91 @@
+# test_kline_cache.py 🧪 Cache de klines com gap-fill incremental (sem rede)
+from kline_cache import KlineCache
+
+INTERVALO_MS = 60_000
+
+
+class BinanceFalsa:
+    """Gera klines de 1m determinísticos até o instante `agora` (último candle em formação)."""
+
+    def __init__(self, agora_ms):
+        self.agora_ms = agora_ms
+        self.chamadas = []
+
+    def kline(self, open_time):
+        preco = str(100 + (open_time // INTERVALO_MS) % 17)
+        return [open_time, preco, preco, preco, preco, "1.0", open_time + INTERVALO_MS - 1,
+                "0", 1, "0", "0", "0"]
+
+    def get_klines(self, symbol, interval, limit, startTime=None, endTime=None):
+        self.chamadas.append({'limit': limit, 'startTime': startTime, 'endTime': endTime})
+        atual = self.agora_ms - self.agora_ms % INTERVALO_MS
+        if startTime is not None:
+            primeiro = startTime - startTime % INTERVALO_MS
+            if startTime % INTERVALO_MS:
+                primeiro += INTERVALO_MS
+            abertos = range(primeiro, atual + 1, INTERVALO_MS)
+            return [self.kline(t) for t in abertos][:limit]
+        fim = atual if endTime is None else min(atual, endTime - endTime % INTERVALO_MS)
+        return [self.kline(fim - i * INTERVALO_MS) for i in reversed(range(limit))]
+
+    def relogio(self):
+        return self.agora_ms / 1000
+
+
+def test_miss_depois_hit_com_delta():
+    api = BinanceFalsa(agora_ms=10_000 * INTERVALO_MS + 30_000)
+    cache = KlineCache(api.get_klines, relogio=api.relogio)
+
+    primeiro = cache.get("BTCUSDT", "1m", 200)
+    assert len(primeiro) == 200
+
+    api.agora_ms += 3 * INTERVALO_MS
+    segundo = cache.get("BTCUSDT", "1m", 200)
+    delta = api.chamadas[1]
+
+    assert primeiro[-1][0] == segundo[-4][0]
+    assert segundo == api.get_klines("BTCUSDT", "1m", 200)
+    assert delta['startTime'] == primeiro[-2][6] + 1
+    assert delta['limit'] < 100
+
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 1
+    assert stats['bytes_fetched'] > 0
+
+
+def test_eviction_por_serie():
+    api = BinanceFalsa(agora_ms=5_000 * INTERVALO_MS + 1)
+    cache = KlineCache(api.get_klines, relogio=api.relogio)
+    cache.set_max_len("ETHUSDT", "1m", 50)
+
+    cache.get("ETHUSDT", "1m", 40)
+    api.agora_ms += 30 * INTERVALO_MS
+    klines = cache.get("ETHUSDT", "1m", 40)
+
+    assert cache.stats()['candles'] == 50
+    assert klines == api.get_klines("ETHUSDT", "1m", 40)
+
+
+def test_historico_paginado():
+    api = BinanceFalsa(agora_ms=50_000 * INTERVALO_MS + 1)
+    cache = KlineCache(api.get_klines, max_len=3000, relogio=api.relogio)
+
+    klines = cache.get("SOLUSDT", "1m", 2500)
+    assert len(klines) == 2500
+    abertos = [k[0] for k in klines]
+    assert abertos == sorted(set(abertos))
+    assert len(api.chamadas) == 3
+
+
+def test_relogio_local_defasado_nao_grava_candle_em_formacao():
+    api = BinanceFalsa(agora_ms=8_000 * INTERVALO_MS + 30_000)
+    em_formacao = api.agora_ms - api.agora_ms % INTERVALO_MS
+
+    adiantado = KlineCache(api.get_klines, relogio=lambda: api.relogio() + 120)
+    atrasado = KlineCache(api.get_klines, relogio=lambda: api.relogio() - 120)
+    for cache in (adiantado, atrasado):
+        klines = cache.get("BTCUSDT", "1m", 100)
+        fechados = cache.em_cache("BTCUSDT", "1m")
+
+        assert klines[-1][0] == em_formacao
+        assert len(fechados) == 99 and fechados[-1][0] == em_formacao - INTERVALO_MS
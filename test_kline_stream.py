@@ -0,0 +1,102 @@
+# test_kline_stream.py 🧪 Modo stream com fonte de replay local (sem WebSocket)
+import asyncio
+import json
+
+import numpy as np
+
+from candles import Candles
+from indicators.indicators import calcular_indicadores
+from indicators.momentum import rsi_janelado
+from indicators.supertrend import supertrend_arrays
+from kline_stream import KlineStream, replay_jsonl
+
+INTERVALO_MS = 300_000
+INICIO_MS = 1_700_000_000_000
+
+
+def gerar_klines(n, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.05, n))
+    klines = []
+    for i, c in enumerate(close):
+        t = INICIO_MS + i * INTERVALO_MS
+        klines.append([t, str(c), str(c + 0.04), str(c - 0.04), str(c), str(50 + i % 7),
+                       t + INTERVALO_MS - 1, "0", 1, "0", "0", "0"])
+    return klines
+
+
+def mensagem(kline, fechado=True, symbol="BTCUSDT"):
+    return {"stream": f"{symbol.lower()}@kline_5m", "data": {"e": "kline", "s": symbol, "k": {
+        "t": kline[0], "T": kline[6], "s": symbol, "i": "5m", "o": kline[1], "h": kline[2],
+        "l": kline[3], "c": kline[4], "v": kline[5], "x": fechado}}}
+
+
+def test_replay_atualiza_estado_e_bate_com_lote(tmp_path):
+    klines = gerar_klines(300)
+    historico, ao_vivo = klines[:201], klines[201:]
+    relogio = [(historico[-1][6] + 1) / 1000]
+
+    caminho = tmp_path / "replay.jsonl"
+    with open(caminho, "w") as f:
+        for k in ao_vivo:
+            f.write(json.dumps(mensagem(k, fechado=False)) + "\n")
+            f.write(json.dumps(mensagem(k, fechado=True)) + "\n")
+        f.write(json.dumps(mensagem(ao_vivo[-1], fechado=True)) + "\n")  # duplicado
+
+    sinais = []
+    stream = KlineStream(["BTCUSDT"], ["5m"], ao_sinal=lambda *a: sinais.append(a),
+                         fonte=replay_jsonl(caminho), buscar_klines=lambda **kw: historico,
+                         relogio=lambda: relogio[0])
+    stream.semear()
+    asyncio.run(stream.executar())
+
+    assert len(sinais) == len(ao_vivo)
+    candles = Candles.from_klines(klines)
+    rsi = rsi_janelado(candles.close, janela=200)   # a mesma janela do backtest e de analyze_indicators
+    direcao = supertrend_arrays(candles.high, candles.low, candles.close).direction
+    for (_, _, snap, _, _), i in zip(sinais, range(201, 300)):
+        assert abs(snap['rsi'] - rsi[i]) < 1e-8
+    _, _, snap, decisao, _ = sinais[-1]
+    assert abs(snap['rsi'] - calcular_indicadores(candles[-200:])['rsi']) < 1e-8
+    assert snap['supertrend'] == direcao[-1]
+    assert isinstance(decisao, str)
+
+
+def test_backfill_aplica_candles_perdidos():
+    klines = gerar_klines(260)
+    relogio = [(klines[200][6] + 1) / 1000]
+    fonte = {"klines": klines[:201]}
+
+    sinais = []
+    stream = KlineStream(["BTCUSDT"], ["5m"], ao_sinal=lambda *a: sinais.append(a),
+                         buscar_klines=lambda **kw: fonte["klines"][-kw["limit"]:], relogio=lambda: relogio[0])
+    stream.semear()
+    assert stream.ultimo_open[("BTCUSDT", "5m")] == klines[200][0]
+
+    fonte["klines"] = klines
+    relogio[0] = (klines[-1][6] + 1) / 1000
+    stream.backfill()
+
+    assert stream.ultimo_open[("BTCUSDT", "5m")] == klines[-1][0]
+    assert stream.estados[("BTCUSDT", "5m")].count == 260
+    assert sinais == []  # candles antigos não disparam alertas na reconexão
+
+
+def test_backfill_depois_de_queda_longa_semeia_de_novo():
+    klines = gerar_klines(700)
+    relogio = [(klines[200][6] + 1) / 1000]
+    fonte = {"klines": klines[:201]}
+
+    stream = KlineStream(["BTCUSDT"], ["5m"], buscar_klines=lambda **kw: fonte["klines"][-kw["limit"]:],
+                         relogio=lambda: relogio[0])
+    stream.semear()
+
+    fonte["klines"] = klines
+    relogio[0] = (klines[-1][6] + 1) / 1000
+    stream.backfill()
+
+    estado = stream.estados[("BTCUSDT", "5m")]
+    esperado = rsi_janelado(Candles.from_klines(klines[-201:]).close, janela=200)[-1]
+    assert estado.count == 201
+    assert stream.ultimo_open[("BTCUSDT", "5m")] == klines[-1][0]
+    assert abs(stream.rsi_recentes[("BTCUSDT", "5m")][-1] - esperado) < 1e-8
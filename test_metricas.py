@@ -0,0 +1,59 @@
+# test_metricas.py 🧪 Métricas: histogramas com tags, contexto por thread e exposição
+import json
+import urllib.request
+
+import pytest
+
+import metricas
+
+
+@pytest.fixture
+def ligado(monkeypatch):
+    monkeypatch.setattr(metricas, "ativo", True)
+    metricas.registro.limpar()
+    yield
+    metricas.registro.limpar()
+
+
+def test_desligado_nao_registra(monkeypatch):
+    monkeypatch.setattr(metricas, "ativo", False)
+    metricas.registro.limpar()
+    with metricas.contexto(symbol="BTCUSDT"), metricas.cronometro("kline_fetch"):
+        pass
+    metricas.contar("ordens")
+    assert metricas.snapshot() == []
+
+
+def test_percentis_e_tags_do_contexto(ligado):
+    with metricas.contexto(symbol="BTCUSDT", interval="15m"):
+        for i in range(1, 101):
+            metricas.observar("indicador", i / 1000, indicador="rsi")
+        with metricas.cronometro("candles_build"):
+            pass
+    metricas.contar("ordens", estado="FILLED")
+    metricas.contar("ordens", estado="FILLED")
+
+    itens = {(i['nome'], tuple(sorted(i['tags'].items()))): i for i in metricas.snapshot()}
+    rsi = itens[("indicador", (("indicador", "rsi"), ("interval", "15m"), ("symbol", "BTCUSDT")))]
+    assert rsi['contagem'] == 100 and rsi['p50'] == pytest.approx(0.050, abs=0.0011)
+    assert rsi['p99'] == pytest.approx(0.099, abs=0.0011)
+    assert ("candles_build", (("interval", "15m"), ("symbol", "BTCUSDT"))) in itens
+    assert itens[("ordens", (("estado", "FILLED"),))]['valor'] == 2
+
+
+def test_endpoint_prometheus_e_jsonl(ligado, tmp_path):
+    metricas.observar("discord_envio", 0.25, tipo="teste")
+    servidor = metricas.iniciar_servidor(porta=0, host="127.0.0.1")
+    try:
+        texto = urllib.request.urlopen(f"http://127.0.0.1:{servidor.server_port}/metrics").read().decode()
+    finally:
+        servidor.shutdown()
+
+    assert '# TYPE charlie_discord_envio_seconds summary' in texto
+    assert 'charlie_discord_envio_seconds{quantile="0.95",tipo="teste"} 0.250000' in texto
+    assert 'charlie_discord_envio_seconds_sum{tipo="teste"}' in texto
+
+    caminho = tmp_path / "metricas.jsonl"
+    assert metricas.despejar_jsonl(str(caminho)) >= 1
+    linhas = [json.loads(linha) for linha in caminho.read_text().splitlines()]
+    assert any(item['nome'] == "discord_envio" and item['p50'] == 0.25 for item in linhas)
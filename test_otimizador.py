@@ -0,0 +1,33 @@
+# test_otimizador.py 🧪 Otimizador paralelo vs backtest de referência
+from backtest import executar_backtest
+from candles import Candles
+from otimizador import otimizar, combinacoes_grade, avaliar_combinacao, preparar_dados
+from test_backtest import gerar_dados
+
+PARAMETROS_ATUAIS = {'st_window': 10, 'multiplier': 3.0, 'rsi_window': 14, 'limiar_long': 35, 'limiar_short': 65}
+
+
+def test_combinacao_atual_igual_backtest(tmp_path):
+    candles = Candles(gerar_dados(6000))
+    pasta = preparar_dados(candles, {'st_window': [10], 'rsi_window': [14]}, str(tmp_path / "BTC"))
+
+    rapido = avaliar_combinacao(pasta, PARAMETROS_ATUAIS)
+    referencia = executar_backtest(candles)
+
+    assert rapido['trades'] == referencia['trades']
+    assert abs(rapido['pnl'] - referencia['pnl']) < 1e-6
+    assert abs(rapido['hit_rate'] - referencia['hit_rate']) < 1e-12
+
+
+def test_paralelo_igual_um_nucleo():
+    datasets = {'BTCUSDT': Candles(gerar_dados(3000, seed=1)), 'ETHUSDT': Candles(gerar_dados(3000, seed=2))}
+    grade = {'st_window': [7, 10], 'multiplier': [2.5, 3.0], 'rsi_window': [14],
+             'limiar_long': [35, 40], 'limiar_short': [65]}
+    combinacoes = combinacoes_grade(grade)
+
+    serial = otimizar(datasets, combinacoes, workers=1)
+    paralelo = otimizar(datasets, combinacoes, workers=2)
+
+    assert len(serial) == len(combinacoes)
+    assert [r['pnl'] for r in serial] == [r['pnl'] for r in paralelo]
+    assert serial[0]['rank'] == 1 and serial[0]['pnl'] >= serial[-1]['pnl']
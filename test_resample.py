@@ -0,0 +1,105 @@
+# test_resample.py 🧪 Reamostragem 5m → 15m/1h/4h alinhada aos buckets UTC
+import os
+import sys
+
+import numpy as np
+
+from candles import Candles, CANDLE_DTYPE
+import metricas
+from resample import reamostrar, Reamostrador, INTERVALO_MS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+CINCO_MIN = INTERVALO_MS["5m"]
+
+
+def gerar_5m(n, inicio_ms, seed=9):
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.1, n))
+    data = np.empty(n, dtype=CANDLE_DTYPE)
+    data['open_time'] = inicio_ms + np.arange(n) * CINCO_MIN
+    data['close_time'] = data['open_time'] + CINCO_MIN - 1
+    data['open'] = close - rng.normal(0, 0.05, n)
+    data['close'] = close
+    data['high'] = np.maximum(data['open'], close) + 0.02
+    data['low'] = np.minimum(data['open'], close) - 0.02
+    data['volume'] = rng.uniform(1, 10, n)
+    return Candles(data)
+
+
+def test_buckets_4h_alinhados_em_utc():
+    # Começa 10 minutos depois de um bucket de 4h: o primeiro bucket parcial é descartado
+    inicio = 1_700_006_400_000 + 2 * CINCO_MIN
+    candles = gerar_5m(48 * 5 + 7, inicio)
+    h4 = reamostrar(candles, "5m", "4h")
+
+    assert np.all(h4.open_time % INTERVALO_MS["4h"] == 0)
+    assert len(h4) == 5  # 4 completos + 1 em formação
+    primeiro = np.flatnonzero(candles.open_time == h4.open_time[0])[0]
+    bloco = candles[primeiro:primeiro + 48]
+    assert h4.open[0] == bloco.open[0] and h4.close[0] == bloco.close[-1]
+    assert h4.high[0] == bloco.high.max() and h4.low[0] == bloco.low.min()
+    assert abs(h4.volume[0] - bloco.volume.sum()) < 1e-9
+
+    sem_parcial = reamostrar(candles, "5m", "4h", incluir_parcial=False)
+    assert len(sem_parcial) == 4
+
+
+def test_bucket_intermediario_incompleto_e_mantido(monkeypatch):
+    candles = gerar_5m(60, 1_700_006_400_000)                  # 5 buckets de 1h completos
+    faltando = Candles(np.delete(candles.data, 17))            # um candle 5m some no 2º bucket
+    monkeypatch.setattr(metricas, "ativo", True)
+    metricas.registro.limpar()
+    h1 = reamostrar(faltando, "5m", "1h", incluir_parcial=False)
+    contadores = {i['nome']: i['valor'] for i in metricas.snapshot() if i['tipo'] == 'contador'}
+    metricas.registro.limpar()
+
+    assert len(h1) == 5 and np.all(np.diff(h1.open_time) == INTERVALO_MS["1h"])
+    bloco = faltando[12:23]
+    assert h1.open[1] == bloco.open[0] and h1.close[1] == bloco.close[-1]
+    assert abs(h1.volume[1] - bloco.volume.sum()) < 1e-9
+    assert contadores == {'reamostragem_incompleta': 1}
+
+
+def test_reamostrador_incremental_igual_ao_lote():
+    candles = gerar_5m(48 * 6 + 19, 1_700_006_400_000 + 5 * CINCO_MIN)
+    reamostrador = Reamostrador("5m", "1h", max_len=1000)
+    for inicio in range(0, len(candles) - 1, 7):   # lotes que não coincidem com os buckets
+        reamostrador.adicionar(candles[inicio:min(inicio + 7, len(candles) - 1)])
+    incremental = reamostrador.candles(candles[-1:])
+
+    assert np.array_equal(incremental.data, reamostrar(candles, "5m", "1h").data)
+
+
+def test_segunda_varredura_so_le_o_delta(monkeypatch):
+    import indicators.indicators as ind
+    from fixtures import klines_brutos
+
+    candles = gerar_5m(48 * 202, 1_700_006_400_000)
+    brutos = klines_brutos(candles)
+    pedidos = []
+
+    def get_klines(symbol="BTCUSDT", interval="15m", limit=200, apos=None):
+        klines = brutos[:fim][-limit:]
+        if apos is not None:
+            klines = [k for k in klines[:-1] if k[0] > apos] + klines[-1:]
+        pedidos.append((apos, len(klines)))
+        return klines
+
+    monkeypatch.setattr(ind, "get_klines", get_klines)
+    monkeypatch.setattr(ind, "kline_cache", type("CacheNulo", (), {"set_max_len": lambda *a: None})())
+    monkeypatch.setattr(ind, "series_multi", {})
+
+    fim = len(brutos) - 3
+    ind.analyze_indicators_multi("BTCUSDT", ["15m", "1h", "4h"])
+    fim = len(brutos)
+    series = {}
+    resultados, candles_base = ind.analyze_indicators_multi("BTCUSDT", ["15m", "1h", "4h"], series=series)
+
+    assert pedidos[0] == (None, 48 * 201)
+    assert pedidos[1] == (int(candles.open_time[-5]), 4)   # 3 fechados novos + o em formação
+    for interval in ("15m", "1h", "4h"):
+        lote = reamostrar(candles[-48 * 201:], "5m", interval)[-200:]
+        assert np.array_equal(series[interval].data, lote.data)
+        assert resultados[interval] == ind.calcular_indicadores(lote)
+    assert candles_base.open_time[-1] == candles.open_time[-1]
@@ -0,0 +1,139 @@
+# test_scanner.py 🧪 Triagem do universo com tickers e candles locais
+import time
+
+import numpy as np
+
+import scanner
+from candles import Candles, CANDLE_DTYPE
+
+AGORA = 1_760_000_000_000
+CUSTO = scanner.peso_klines(scanner.HISTORICO)   # klines do spot: peso fixo por símbolo
+
+
+def _ticker(symbol, volume, alta, baixa, ultimo=100.0, variacao=1.0, fechamento=AGORA):
+    return {'symbol': symbol, 'quoteVolume': str(volume), 'highPrice': str(alta), 'lowPrice': str(baixa),
+            'lastPrice': str(ultimo), 'priceChangePercent': str(variacao), 'closeTime': fechamento}
+
+
+def _candles(close):
+    close = np.asarray(close, dtype=np.float64)
+    data = np.zeros(len(close), dtype=CANDLE_DTYPE)
+    data['open_time'] = np.arange(len(close)) * 900_000
+    data['close'] = close
+    data['high'] = close + 0.5
+    data['low'] = close - 0.5
+    return Candles(data)
+
+
+SUBINDO = np.linspace(100, 130, 60)
+VIRANDO = np.concatenate((np.linspace(130, 100, 57), [110, 120, 130]))  # queda longa e reversão no fim
+
+TICKERS = [
+    _ticker("AAAUSDT", 9e8, 110, 95),
+    _ticker("BBBUSDT", 5e7, 120, 100),
+    _ticker("CCCUSDT", 3e7, 120, 90),
+    _ticker("POUCOUSDT", 1e6, 150, 50),                               # volume baixo
+    _ticker("PARADOUSDT", 5e8, 100.5, 99.8),                          # sem amplitude
+    _ticker("VELHOUSDT", 9e9, 200, 10, fechamento=AGORA - 3 * 86_400_000),  # deslistado
+    _ticker("AAABUSD", 9e9, 200, 10),                                 # fora do sufixo
+]
+
+
+def test_triagem_vetorizada():
+    simbolos, volume, volatilidade, variacao = scanner.triar_tickers(TICKERS, 2e7, 0.03)
+
+    assert simbolos == ["AAAUSDT", "BBBUSDT", "CCCUSDT"]
+    np.testing.assert_allclose(volatilidade, [0.15, 0.20, 0.30])
+    assert variacao[0] == 0.01
+
+
+def test_virada_de_supertrend_promove_candidato():
+    candles = {"AAAUSDT": _candles(SUBINDO), "BBBUSDT": _candles(VIRANDO), "CCCUSDT": _candles(SUBINDO)}
+    pedidos = []
+
+    def buscar_candles(symbol, interval, limit):
+        pedidos.append((symbol, interval, limit))
+        return candles[symbol]
+
+    s = scanner.Scanner(lambda: TICKERS, buscar_candles, volume_minimo=2e7, volatilidade_minima=0.03,
+                        buscar_listados=None)
+    candidatos = s.varrer()
+
+    assert [c.symbol for c in candidatos][0] == "BBBUSDT"
+    assert candidatos[0].virada and candidatos[0].direcao == 1
+    assert not any(c.virada for c in candidatos[1:])
+    assert all(limit == scanner.HISTORICO for _, _, limit in pedidos)
+    assert s.ultima == {**s.ultima, 'universo': 7, 'aprovados': 3, 'com_candles': 3, 'peso': scanner.PESO_TICKERS + 3 * CUSTO}
+
+    assert scanner.promover(candidatos, ["AAAUSDT", "ETHUSDT"], 1) == ["AAAUSDT", "ETHUSDT", "BBBUSDT"]
+    linhas = scanner.resumo_varredura(candidatos, s, ["BBBUSDT"])
+    assert "3/7" in linhas[0] and "BBBUSDT" in linhas[1] and "virou" in linhas[1]
+
+
+def test_orcamento_de_peso_limita_candles():
+    pedidos = []
+
+    def buscar_candles(symbol, interval, limit):
+        pedidos.append(symbol)
+        return _candles(SUBINDO)
+
+    s = scanner.Scanner(lambda: TICKERS, buscar_candles, volume_minimo=2e7, volatilidade_minima=0.03,
+                        orcamento_peso=scanner.PESO_TICKERS + 2 * CUSTO, buscar_listados=None)
+    candidatos = s.varrer()
+
+    assert len(pedidos) == 2
+    assert len(candidatos) == 3 and s.ultima['peso'] == scanner.PESO_TICKERS + 2 * CUSTO
+
+
+def test_orcamento_de_tempo_descarta_lentos():
+    def buscar_candles(symbol, interval, limit):
+        if symbol == "AAAUSDT":
+            time.sleep(1.0)
+        return _candles(VIRANDO)
+
+    s = scanner.Scanner(lambda: TICKERS, buscar_candles, volume_minimo=2e7, volatilidade_minima=0.03,
+                        orcamento_segundos=0.3, buscar_listados=None)
+    inicio = time.perf_counter()
+    candidatos = s.varrer()
+
+    assert time.perf_counter() - inicio < 0.9
+    assert s.ultima['com_candles'] == 2
+    assert {c.symbol for c in candidatos if c.virada} == {"BBBUSDT", "CCCUSDT"}
+
+
+def test_so_pares_do_mercado_do_pipeline():
+    listagens = []
+
+    def buscar_listados():
+        listagens.append(1)
+        return {"AAAUSDT", "CCCUSDT", "ETHUSDT"}   # BBBUSDT só existe nos futuros
+
+    pedidos = []
+
+    def buscar_candles(symbol, interval, limit):
+        pedidos.append(symbol)
+        return _candles(SUBINDO)
+
+    s = scanner.Scanner(lambda: TICKERS, buscar_candles, volume_minimo=2e7, volatilidade_minima=0.03,
+                        buscar_listados=buscar_listados)
+    candidatos = s.varrer()
+    s.varrer()
+
+    assert {c.symbol for c in candidatos} == {"AAAUSDT", "CCCUSDT"}
+    assert "BBBUSDT" not in pedidos
+    assert len(listagens) == 1  # listagem em cache entre varreduras
+    assert s.ultima['universo'] == 7 and s.ultima['peso'] == scanner.PESO_TICKERS + 2 * CUSTO
+
+
+def test_carga_fria_da_promocao_entra_no_orcamento():
+    candles = {"AAAUSDT": _candles(SUBINDO), "BBBUSDT": _candles(VIRANDO), "CCCUSDT": _candles(SUBINDO)}
+    custos = {"AAAUSDT": 3, "BBBUSDT": 1000, "CCCUSDT": 3}   # BBBUSDT ainda não está em cache
+
+    s = scanner.Scanner(lambda: TICKERS, lambda symbol, interval, limit: candles[symbol],
+                        volume_minimo=2e7, volatilidade_minima=0.03, buscar_listados=None,
+                        promover=1, custo_promocao=custos.get)
+    candidatos = s.varrer()
+
+    assert "BBBUSDT" not in [c.symbol for c in candidatos]   # a virada não paga uma carga fora do orçamento
+    assert scanner.promover(candidatos, [], 1) == ["AAAUSDT"]
+    assert s.ultima['promocao'] == 3 and s.ultima['peso'] == scanner.PESO_TICKERS + 3 * CUSTO + 3
@@ -0,0 +1,49 @@
+# test_sentinel.py 🧪 Varredura concorrente com prazo único
+import contextlib
+import io
+import sys
+import time
+
+import sentinel
+
+sys.path.insert(0, "benchmarks")
+from bench_pipeline import fonte_local  # noqa: E402
+
+
+def test_prazo_unico_limita_a_varredura(monkeypatch):
+    original = sentinel._analisar_simbolo
+    iniciados, terminados = [], []
+
+    def lento(symbol, coleta=None):
+        iniciados.append(symbol)
+        try:
+            time.sleep(0.3)
+            return original(symbol, coleta)
+        finally:
+            terminados.append(symbol)
+
+    monkeypatch.setattr(sentinel, "_analisar_simbolo", lento)
+    monkeypatch.setattr(sentinel, "MAX_WORKERS", 1)
+    monkeypatch.setattr(sentinel, "TIMEOUT_VARREDURA_SEGUNDOS", 1.0)
+    with fonte_local(), contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.monotonic()
+        relatorio = sentinel.run_analysis(concorrente=True, reamostrar=True)
+        duracao = time.monotonic() - inicio
+        # O worker que passou do prazo termina ainda com a fonte local
+        while len(terminados) < len(iniciados):
+            time.sleep(0.05)
+
+    # 7 símbolos × 0,3 s num único worker: com prazo por par a varredura levaria ~2,1 s
+    assert duracao < 1.6
+    assert "🧠 Ativo Monitorado: BTCUSDT" in relatorio and "RSI:" in relatorio
+    assert "varredura excedeu o prazo de 1s" in relatorio
+
+
+def test_pares_fora_de_rotacao_liberam_o_cache(monkeypatch):
+    esquecidos = []
+    monkeypatch.setattr(sentinel.kline_cache, "esquecer", esquecidos.append)
+    monkeypatch.setattr(sentinel, "_vigiados", set())
+
+    sentinel.liberar_fora_de_rotacao(sentinel.SYMBOLS + ["AAAUSDT", "BBBUSDT"])
+    assert sentinel.liberar_fora_de_rotacao(sentinel.SYMBOLS + ["BBBUSDT", "CCCUSDT"]) == {"AAAUSDT"}
+    assert esquecidos == ["AAAUSDT"]
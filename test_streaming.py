@@ -0,0 +1,77 @@
+# test_streaming.py 🧪 Indicadores incrementais vs cálculo em lote
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.volume import OnBalanceVolumeIndicator
+
+from indicators.momentum import rsi_wilder, rsi_janelado, obv
+from indicators.streaming import IndicatorState
+from indicators.supertrend import supertrend_arrays
+
+
+def gerar_candles(n, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 50 + np.cumsum(rng.normal(0, 0.5, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    volume = rng.uniform(10, 1000, n)
+    return high, low, close, volume
+
+
+def test_lote_igual_ta():
+    high, low, close, volume = gerar_candles(400)
+    rsi_ta = RSIIndicator(close=pd.Series(close), window=14).rsi().to_numpy()
+    obv_ta = OnBalanceVolumeIndicator(close=pd.Series(close), volume=pd.Series(volume)).on_balance_volume().to_numpy()
+
+    np.testing.assert_allclose(rsi_wilder(close, 14), rsi_ta, rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(obv(close, volume), obv_ta, rtol=1e-10)
+
+
+def test_incremental_igual_lote():
+    high, low, close, volume = gerar_candles(500)
+    rsi = rsi_wilder(close, 14)
+    obv_lote = obv(close, volume)
+    st = supertrend_arrays(high, low, close, window=10, multiplier=3.0)
+
+    estado = IndicatorState()
+    estado.seed(high[:200], low[:200], close[:200], volume[:200])
+    for i in range(200, 500):
+        snap = estado.push(high[i], low[i], close[i], volume[i])
+        assert abs(snap['rsi'] - rsi[i]) < 1e-8
+        assert abs(snap['obv'] - obv_lote[i]) < 1e-6
+        assert abs(snap['atr'] - st.atr[i]) < 1e-9
+        assert abs(snap['upper_band'] - st.upper_band[i]) < 1e-9
+        assert abs(snap['lower_band'] - st.lower_band[i]) < 1e-9
+        assert snap['supertrend'] == st.direction[i]
+
+
+def test_obv_janelado_igual_lote():
+    high, low, close, volume = gerar_candles(400)
+    estado = IndicatorState(obv_window=200)
+    estado.seed(high[:250], low[:250], close[:250], volume[:250])
+    for i in range(250, 400):
+        snap = estado.push(high[i], low[i], close[i], volume[i])
+        esperado = obv(close[i - 199:i + 1], volume[i - 199:i + 1])[-1]
+        assert abs(snap['obv_janela'] - esperado) < 1e-6
+
+
+def test_rsi_janelado_igual_lote():
+    high, low, close, volume = gerar_candles(600)
+    esperado = rsi_janelado(close, window=14, janela=200)
+    estado = IndicatorState(rsi_janela=200)
+    estado.seed(high[:250], low[:250], close[:250], volume[:250])
+    for i in range(250, 600):
+        snap = estado.push(high[i], low[i], close[i], volume[i])
+        assert abs(snap['rsi'] - esperado[i]) < 1e-8
+    assert abs(snap['rsi_total'] - rsi_wilder(close, 14)[-1]) < 1e-8
+
+
+def test_peek_nao_altera_estado():
+    high, low, close, volume = gerar_candles(100)
+    estado = IndicatorState()
+    estado.seed(high[:99], low[:99], close[:99], volume[:99])
+
+    previa = estado.peek(high[99], low[99], close[99], volume[99])
+    assert estado.count == 99
+    confirmado = estado.push(high[99], low[99], close[99], volume[99])
+    assert previa == confirmado
@@ -0,0 +1,93 @@
+# test_supertrend.py 🧪 Paridade do motor vetorial com o Supertrend original
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators.supertrend import Supertrend, supertrend_arrays, supertrend_lote
+
+
+def supertrend_referencia(high, low, close, window=10, multiplier=3.0):
+    """Implementação original (loop com .loc), mantida aqui apenas como referência."""
+    df = pd.DataFrame({'high': high, 'low': low, 'close': close})
+    tr1 = df['high'] - df['low']
+    tr2 = (df['high'] - df['close'].shift()).abs()
+    tr3 = (df['low'] - df['close'].shift()).abs()
+    atr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1).rolling(window).mean()
+    hl2 = (df['high'] + df['low']) / 2
+    df['upper_band'] = hl2 + (multiplier * atr)
+    df['lower_band'] = hl2 - (multiplier * atr)
+    df['trend'] = True
+
+    for i in range(1, len(df)):
+        if df.loc[i, 'close'] > df.loc[i - 1, 'upper_band']:
+            df.loc[i, 'trend'] = True
+        elif df.loc[i, 'close'] < df.loc[i - 1, 'lower_band']:
+            df.loc[i, 'trend'] = False
+        else:
+            df.loc[i, 'trend'] = df.loc[i - 1, 'trend']
+            if df.loc[i, 'trend'] and df.loc[i, 'lower_band'] < df.loc[i - 1, 'lower_band']:
+                df.loc[i, 'lower_band'] = df.loc[i - 1, 'lower_band']
+            if not df.loc[i, 'trend'] and df.loc[i, 'upper_band'] > df.loc[i - 1, 'upper_band']:
+                df.loc[i, 'upper_band'] = df.loc[i - 1, 'upper_band']
+
+    df['supertrend'] = df['trend'].apply(lambda x: 1 if x else -1)
+    return df
+
+
+def gerar_candles(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    return pd.Series(high), pd.Series(low), pd.Series(close)
+
+
+def test_paridade_com_referencia():
+    for seed in (1, 2, 3):
+        high, low, close = gerar_candles(600, seed)
+        ref = supertrend_referencia(high, low, close)
+        res = supertrend_arrays(high, low, close)
+
+        np.testing.assert_allclose(res.upper_band, ref['upper_band'], rtol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(res.lower_band, ref['lower_band'], rtol=1e-12, equal_nan=True)
+        np.testing.assert_array_equal(res.trend, ref['trend'].astype(bool))
+        np.testing.assert_array_equal(res.direction, ref['supertrend'])
+
+
+def test_wrapper_compativel():
+    high, low, close = gerar_candles(300)
+    ref = supertrend_referencia(high, low, close)
+    direcao = Supertrend(high=high, low=low, close=close, window=10, multiplier=3.0).supertrend_direction()
+
+    assert isinstance(direcao, pd.Series)
+    assert direcao.iloc[-1] == ref['supertrend'].iloc[-1]
+    assert (direcao.values == ref['supertrend'].values).all()
+
+
+def test_lote_igual_serie_a_serie():
+    series = [gerar_candles(200, seed) for seed in range(1, 9)]
+    high, low, close = (np.stack([s[k].values for s in series]) for k in range(3))
+
+    direcao = supertrend_lote(high, low, close)
+
+    for i, (h, l, c) in enumerate(series):
+        np.testing.assert_array_equal(direcao[i], supertrend_arrays(h, l, c).direction)
+
+
+def test_historico_longo_rapido():
+    high, low, close = gerar_candles(100_000)
+    inicio = time.perf_counter()
+    res = supertrend_arrays(high.values, low.values, close.values)
+    decorrido = time.perf_counter() - inicio
+
+    assert len(res.direction) == 100_000
+    assert decorrido < 1.0
+
+
+if __name__ == "__main__":
+    test_paridade_com_referencia()
+    test_wrapper_compativel()
+    test_lote_igual_serie_a_serie()
+    test_historico_longo_rapido()
+    print("✅ Supertrend vetorial em paridade com a referência.")
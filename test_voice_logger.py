@@ -0,0 +1,78 @@
+# test_voice_logger.py 🧪 Armazém de eventos em JSONL com índice por tipo/emoção
+import json
+from datetime import datetime
+
+import voice_logger
+from voice_logger import RegistroEventos, FALA, SINAL, ALERTA
+
+
+def test_eventos_no_mesmo_segundo_nao_se_sobrescrevem(tmp_path):
+    registro = RegistroEventos(str(tmp_path))
+    for i in range(50):
+        registro.registrar(FALA, f"fala {i}", emocao="neutra")
+    registro.descarregar()
+
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    with open(tmp_path / f"{hoje}.jsonl", encoding="utf-8") as f:
+        linhas = [json.loads(linha) for linha in f]
+    assert [e['texto'] for e in linhas] == [f"fala {i}" for i in range(50)]
+
+
+def test_consulta_pelo_indice(tmp_path):
+    registro = RegistroEventos(str(tmp_path))
+    registro.registrar(FALA, "tudo calmo", emocao="neutra", audio="a.mp3")
+    registro.registrar(SINAL, "📈 Tendência de alta", symbol="BTCUSDT", interval="15m")
+    registro.registrar(FALA, "atenção", emocao="tensa")
+    registro.registrar(ALERTA, "🎯 BTCUSDT", emocao="confiante", symbol="BTCUSDT")
+    registro.registrar(FALA, "de novo calmo", emocao="neutra")
+    registro.descarregar()
+
+    neutras = registro.consultar(tipo=FALA, emocao="neutra")
+    assert [e['texto'] for e in neutras] == ["tudo calmo", "de novo calmo"]
+    assert neutras[0]['audio'] == "a.mp3"
+    assert [e['symbol'] for e in registro.consultar(tipo=SINAL)] == ["BTCUSDT"]
+    assert len(registro.consultar()) == 5
+    assert registro.consultar(data="2000-01-01") == []
+
+    # Uma nova instância (outro processo) usa o índice gravado em disco
+    outro = RegistroEventos(str(tmp_path))
+    assert [e['texto'] for e in outro.consultar(emocao="confiante")] == ["🎯 BTCUSDT"]
+
+
+def test_indice_so_com_appends_e_completado_apos_queda(tmp_path):
+    registro = RegistroEventos(str(tmp_path))
+    registro.registrar(FALA, "antes da queda", emocao="neutra")
+    registro.descarregar()
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    indice = tmp_path / f"{hoje}.idx.jsonl"
+    antes = indice.read_bytes()
+
+    registro.registrar(SINAL, "📉 Tendência de baixa", symbol="ETHUSDT")
+    registro.descarregar()
+    depois = indice.read_bytes()
+    assert depois.startswith(antes) and len(depois) > len(antes)  # só anexado, nunca reescrito
+
+    # Queda entre o append do log e o do índice, e uma linha parcial no fim do log
+    with open(tmp_path / f"{hoje}.jsonl", "ab") as f:
+        f.write(json.dumps({'ts': hoje, 'tipo': ALERTA, 'emocao': "confiante", 'texto': "🎯 ETHUSDT"}).encode() + b"\n")
+        f.write(b'{"ts": "parcial')
+
+    reiniciado = RegistroEventos(str(tmp_path))
+    assert [e['texto'] for e in reiniciado.consultar(tipo=ALERTA)] == ["🎯 ETHUSDT"]
+    reiniciado.registrar(FALA, "depois da queda", emocao="neutra")
+    reiniciado.descarregar()
+
+    outro = RegistroEventos(str(tmp_path))
+    assert [e['texto'] for e in outro.consultar(tipo=FALA)] == ["antes da queda", "depois da queda"]
+    assert len(outro.consultar()) == 4
+
+
+def test_replay_voz_sem_audio_mostra_texto(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(voice_logger, "_registro", RegistroEventos(str(tmp_path)))
+    voice_logger.log_fala("varredura concluída", emocao="confiante")
+    voice_logger.obter_registro().descarregar()
+
+    falas = voice_logger.replay_voz("confiante")
+
+    assert [f['texto'] for f in falas] == ["varredura concluída"]
+    assert "varredura concluída" in capsys.readouterr().out
@@ -1,43 +1,257 @@
-# voice_logger.py 📒 CharlieCore Voice Logger v2.1
+# voice_logger.py 📒 CharlieCore Voice Logger v3.0 — eventos em JSONL diário, gravados em segundo plano
+import atexit
+import json
 import os
+import queue
+import threading
 from datetime import datetime
-import glob
 
-PASTA_LOGS = "logs/falas"
+PASTA_LOGS = "logs/eventos"
+FILA_MAXIMA = 4096
+LOTE_MAXIMO = 256
+INTERVALO_FLUSH = 1.0   # segundos entre gravações quando há pouco movimento
 
-def log_fala(texto, emocao="neutra"):
-    try:
-        hoje = datetime.now().strftime("%Y-%m-%d")
-        pasta_emocao = os.path.join(PASTA_LOGS, emocao, hoje)
-        os.makedirs(pasta_emocao, exist_ok=True)
+# Tipos de evento no mesmo armazém
+FALA = "fala"
+SINAL = "sinal"
+ALERTA = "alerta"
+RELATORIO = "relatorio"
 
-        timestamp = datetime.now().strftime("%H-%M-%S")
-        nome_arquivo = f"{timestamp}.txt"
-        caminho_arquivo = os.path.join(pasta_emocao, nome_arquivo)
 
-        with open(caminho_arquivo, "w", encoding="utf-8") as f:
-            f.write(f"[{datetime.now()}] Emoção: {emocao}\n")
-            f.write(f"Texto:\n{texto}\n")
+def _chave(tipo, emocao):
+    return f"{tipo}:{emocao or '-'}"
+
+
+def _truncar(caminho, tamanho):
+    """Descarta o que houver depois de `tamanho` bytes (registro parcial de uma queda)."""
+    if os.path.getsize(caminho) > tamanho:
+        with open(caminho, "r+b") as f:
+            f.truncate(tamanho)
+
+
+class RegistroEventos:
+    """
+    Um arquivo JSONL por dia (`AAAA-MM-DD.jsonl`), só com appends, e um índice ao lado
+    (`AAAA-MM-DD.idx.jsonl`, também só com appends) com uma linha `[offset, "tipo:emoção"]`
+    por evento. `registrar` só enfileira; uma thread grava em lotes. Consultas leem o índice
+    e vão direto às linhas pedidas, sem varrer o dia inteiro.
+
+    Ao carregar o índice, as linhas do log depois do último offset indexado (queda entre os
+    dois appends) são indexadas de novo; uma linha parcial no fim de um dos arquivos é truncada.
+    """
+
+    def __init__(self, pasta=PASTA_LOGS, intervalo_flush=INTERVALO_FLUSH, fila_maxima=FILA_MAXIMA):
+        self.pasta = pasta
+        self.intervalo_flush = intervalo_flush
+        self._fila = queue.Queue(maxsize=fila_maxima)
+        self._lock = threading.Lock()        # arquivos e índices
+        self._indices = {}
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.descartados = 0
+
+    def registrar(self, tipo, texto, emocao=None, **campos):
+        agora = datetime.now()
+        evento = {'ts': agora.isoformat(timespec="milliseconds"), 'tipo': tipo, 'emocao': emocao, 'texto': texto}
+        evento.update(campos)
+        self._garantir_worker()
+        try:
+            self._fila.put_nowait(evento)
+        except queue.Full:
+            self.descartados += 1
+            print("⚠️ Fila de eventos cheia. Evento descartado.")
+
+    def descarregar(self):
+        """Grava agora tudo o que está na fila e espera o lote em andamento (encerramento, testes)."""
+        lote = []
+        while True:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        if lote:
+            self._gravar(lote)
+            for _ in lote:
+                self._fila.task_done()
+        self._fila.join()
+
+    def consultar(self, data=None, tipo=None, emocao=None):
+        """Eventos de um dia (`AAAA-MM-DD`), filtrados por tipo e/ou emoção, em ordem de gravação."""
+        data = data or datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            indice = self._indice(data)
+            offsets = sorted(
+                offset
+                for chave, lista in indice.items()
+                if (tipo is None or chave.split(":", 1)[0] == tipo)
+                and (emocao is None or chave.split(":", 1)[1] == emocao)
+                for offset in lista
+            )
+            if not offsets:
+                return []
+            eventos = []
+            with open(self._caminho(data), "rb") as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    eventos.append(json.loads(f.readline()))
+            return eventos
+
+    # --- internos ---
+
+    def _caminho(self, data, extensao=".jsonl"):
+        return os.path.join(self.pasta, f"{data}{extensao}")
+
+    def _indice(self, data):
+        """Índice do dia (com o lock). Carregado do disco — e completado pelo log — na primeira vez."""
+        if data not in self._indices:
+            indice, ultimo = self._ler_indice(data)
+            self._anexar_indice(data, self._reindexar(data, indice, ultimo))
+            self._indices[data] = indice
+        return self._indices[data]
+
+    def _ler_indice(self, data):
+        """(índice, maior offset indexado) a partir do `.idx.jsonl`."""
+        indice, ultimo = {}, None
+        caminho = self._caminho(data, ".idx.jsonl")
+        try:
+            with open(caminho, "rb") as f:
+                validos = 0
+                for linha in f:
+                    try:
+                        offset, chave = json.loads(linha) if linha.endswith(b"\n") else (None, None)
+                    except ValueError:
+                        offset = None
+                    if offset is None:
+                        break
+                    indice.setdefault(chave, []).append(offset)
+                    ultimo = offset if ultimo is None else max(ultimo, offset)
+                    validos += len(linha)
+            _truncar(caminho, validos)
+        except FileNotFoundError:
+            pass
+        return indice, ultimo
+
+    def _reindexar(self, data, indice, ultimo):
+        """Indexa as linhas do log depois de `ultimo`. Retorna as entradas novas [(offset, chave)]."""
+        caminho = self._caminho(data)
+        novas = []
+        try:
+            with open(caminho, "rb") as f:
+                if ultimo is not None:
+                    f.seek(ultimo)
+                    f.readline()
+                while True:
+                    offset = f.tell()
+                    linha = f.readline()
+                    if not linha:
+                        break
+                    if not linha.endswith(b"\n"):
+                        _truncar(caminho, offset)
+                        break
+                    try:
+                        evento = json.loads(linha)
+                    except ValueError:
+                        continue
+                    chave = _chave(evento.get('tipo'), evento.get('emocao'))
+                    indice.setdefault(chave, []).append(offset)
+                    novas.append((offset, chave))
+        except FileNotFoundError:
+            return []
+        if novas:
+            print(f"⚠️ {len(novas)} evento(s) de {data} fora do índice. Reindexados.")
+        return novas
+
+    def _anexar_indice(self, data, entradas):
+        if not entradas:
+            return
+        linhas = "".join(json.dumps([offset, chave], ensure_ascii=False) + "\n" for offset, chave in entradas)
+        with open(self._caminho(data, ".idx.jsonl"), "ab") as f:
+            f.write(linhas.encode("utf-8"))
+
+    def _gravar(self, lote):
+        por_dia = {}
+        for evento in lote:
+            por_dia.setdefault(evento['ts'][:10], []).append(evento)
+
+        with self._lock:
+            os.makedirs(self.pasta, exist_ok=True)
+            for data, eventos in por_dia.items():
+                indice = self._indice(data)
+                entradas = []
+                with open(self._caminho(data), "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    linhas = []
+                    for evento in eventos:
+                        linha = (json.dumps(evento, ensure_ascii=False) + "\n").encode("utf-8")
+                        chave = _chave(evento['tipo'], evento.get('emocao'))
+                        indice.setdefault(chave, []).append(offset)
+                        entradas.append((offset, chave))
+                        offset += len(linha)
+                        linhas.append(linha)
+                    f.write(b"".join(linhas))
+                self._anexar_indice(data, entradas)
+
+    def _garantir_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._loop, daemon=True, name="voice-logger")
+                self._worker.start()
+
+    def _loop(self):
+        while True:
+            lote = [self._fila.get()]
+            while len(lote) < LOTE_MAXIMO:
+                try:
+                    lote.append(self._fila.get(timeout=self.intervalo_flush))
+                except queue.Empty:
+                    break
+            try:
+                self._gravar(lote)
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar eventos: {e}")
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+
+_registro = None
+_registro_lock = threading.Lock()
+
+
+def obter_registro():
+    """Armazém de eventos compartilhado do processo (descarregado na saída)."""
+    global _registro
+    with _registro_lock:
+        if _registro is None:
+            _registro = RegistroEventos()
+            atexit.register(_registro.descarregar)
+        return _registro
+
+
+def registrar_evento(tipo, texto, emocao=None, **campos):
+    """Sinais, alertas e relatórios no mesmo armazém das falas."""
+    obter_registro().registrar(tipo, texto, emocao=emocao, **campos)
+
+
+def log_fala(texto, emocao="neutra", audio=None):
+    registrar_evento(FALA, texto, emocao=emocao, audio=audio)
 
-        print(f"📝 Fala registrada em: {caminho_arquivo}")
-    except Exception as e:
-        print(f"⚠️ Erro ao registrar fala: {e}")
 
 def replay_voz(emocao="neutra", data=None):
     if data is None:
         data = datetime.now().strftime("%Y-%m-%d")
 
-    caminho = os.path.join(PASTA_LOGS, emocao, data)
-    if not os.path.exists(caminho):
+    falas = obter_registro().consultar(data=data, tipo=FALA, emocao=emocao)
+    if not falas:
         print(f"⚠️ Nenhuma fala encontrada para '{emocao}' em {data}")
-        return
-
-    arquivos = sorted(glob.glob(os.path.join(caminho, "*.mp3")))
-    if not arquivos:
-        print(f"📁 Arquivos .mp3 não encontrados em {caminho}")
-        return
+        return falas
 
-    print(f"🔁 Reproduzindo {len(arquivos)} fala(s) de {emocao} em {data}")
-    for audio in arquivos:
-        print(f"🎧 {audio}")
-        os.system(f"mpg123 '{audio}'")
+    print(f"🔁 Reproduzindo {len(falas)} fala(s) de {emocao} em {data}")
+    for fala in falas:
+        audio = fala.get('audio')
+        if audio and os.path.exists(audio):
+            print(f"🎧 {audio}")
+            os.system(f"mpg123 '{audio}'")
+        else:
+            print(f"💬 [{fala['ts']}] {fala['texto']}")
+    return falas